@@ -10,8 +10,8 @@ def calculate_margin_error(x, confidence_level=0.99):
     return stats.sem(x) * stats.t.ppf((1 + confidence_level) / 2, n - 1)
 
 
-# Read the CSV file into a pandas DataFrame
-data = pd.read_csv('../consolidated_data2.csv')
+# Read the results of the sweep (script_simulator.py) into a pandas DataFrame
+data = pd.read_csv('../sweep/results.csv')
 
 # Group the data by the 'label' column
 grouped_data = data.groupby('label')
@@ -0,0 +1,55 @@
+from shared.sketches import BloomFilter, CountMinSketch
+
+
+class TinyLFUAdmissionFilter:
+    """
+    TinyLFU admission (Einziger et al., 2017) in front of a cache.
+
+    Every request is recorded: the first occurrence of a provider only sets the doorkeeper Bloom filter, the following
+    ones increment a Count-Min Sketch. A resource is admitted only if its estimated frequency is higher than the one of
+    the resource the cache would evict for it, so one-hit wonders cannot push out popular resources. After sample_size
+    records the sketch is halved and the doorkeeper cleared, so the memory is fixed and old popularity fades.
+
+    Attributes
+    ----------
+    doorkeeper : BloomFilter
+        The providers requested at least once in the current sample.
+    sketch : CountMinSketch
+        The frequency of the providers requested more than once.
+    sample_size : int
+        The number of records between two agings.
+    samples : int
+        The number of records since the last aging (halved on aging).
+    """
+
+    def __init__(self, width: int = 4096, sample_size: int = None):
+        self.doorkeeper = BloomFilter(width * 8)
+        self.sketch = CountMinSketch(width)
+        self.sample_size = 10 * width if sample_size is None else sample_size
+        self.samples = 0
+
+    def record(self, provider_id: str):
+        """
+        Records a request for the provider.
+        """
+        if provider_id in self.doorkeeper:
+            self.sketch.increment(provider_id)
+        else:
+            self.doorkeeper.add(provider_id)
+        self.samples += 1
+        if self.samples >= self.sample_size:
+            self.sketch.halve()
+            self.doorkeeper.clear()
+            self.samples //= 2
+
+    def estimate(self, provider_id: str) -> int:
+        """
+        Returns the estimated number of requests for the provider in the recent samples.
+        """
+        return self.sketch.estimate(provider_id) + (1 if provider_id in self.doorkeeper else 0)
+
+    def admit(self, candidate_provider_id: str, victim_provider_id: str) -> bool:
+        """
+        Returns True if the candidate is more popular than the victim it would replace.
+        """
+        return self.estimate(candidate_provider_id) > self.estimate(victim_provider_id)
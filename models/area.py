@@ -0,0 +1,104 @@
+import math
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+class Area:
+    def __init__(self, id,  x1, y1, x2, y2):
+        self.id = id
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        # indexes of the providers in popularity order
+        self.popularity: np.ndarray = None
+
+    def __str__(self):
+        return f"Area #{self.id} - X: ({self.x1}, {self.x2}) Y: ({self.y1}, {self.y2}) "
+
+
+class SubareaGrid:
+    """
+    A rectangular area divided into columns x rows subareas, numbered row by row.
+    The subarea of a position is found with an integer division per coordinate instead of a scan of the subareas.
+    Positions out of the area belong to the nearest border subarea.
+
+    Attributes
+    ----------
+    width : float
+        The width of the area.
+    height : float
+        The height of the area.
+    columns : int
+        The number of subareas along x.
+    rows : int
+        The number of subareas along y.
+    x_edges : np.ndarray
+        The x coordinates of the subarea borders, columns + 1 values.
+    y_edges : np.ndarray
+        The y coordinates of the subarea borders, rows + 1 values.
+    areas : List[Area]
+        The subareas, the id of an area is row * columns + column.
+    """
+
+    def __init__(self, width: float, height: float, columns: int, rows: int):
+        if columns <= 0 or rows <= 0:
+            raise ValueError(f"a subarea grid needs at least a column and a row, not {columns} x {rows}")
+        self.width = width
+        self.height = height
+        self.columns = columns
+        self.rows = rows
+        # integer borders when the area is divisible by the grid
+        self.x_edges = np.array([column * width / columns for column in range(columns + 1)])
+        self.y_edges = np.array([row * height / rows for row in range(rows + 1)])
+        self.areas: List[Area] = [
+            Area(row * columns + column, self._edge(self.x_edges[column]), self._edge(self.y_edges[row]),
+                 self._edge(self.x_edges[column + 1]), self._edge(self.y_edges[row + 1]))
+            for row in range(rows) for column in range(columns)]
+
+    @classmethod
+    def divide(cls, dimensions: float, portions: int) -> "SubareaGrid":
+        """
+        Divides a square area into the given number of subareas, as the grid closest to a square: rows is the largest
+        divisor of portions not above its square root (e.g. 4 -> 2 x 2, 5 -> 5 x 1, 6 -> 3 x 2).
+        """
+        rows = max(divisor for divisor in range(1, math.isqrt(portions) + 1) if portions % divisor == 0)
+        return cls(dimensions, dimensions, portions // rows, rows)
+
+    def __len__(self):
+        return len(self.areas)
+
+    def __getitem__(self, index) -> Area:
+        return self.areas[index]
+
+    def __iter__(self) -> Iterator[Area]:
+        return iter(self.areas)
+
+    def find(self, point: Tuple[float, float]) -> Area:
+        """
+        Returns the subarea of a position.
+        """
+        return self.areas[int(self.area_ids([point])[0])]
+
+    def area_ids(self, points: Sequence[Tuple[float, float]]) -> np.ndarray:
+        """
+        Returns the id of the subarea of each position.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        columns = self._indexes(points[:, 0], self.x_edges, self.width)
+        rows = self._indexes(points[:, 1], self.y_edges, self.height)
+        return rows * self.columns + columns
+
+    @staticmethod
+    def _indexes(coordinates: np.ndarray, edges: np.ndarray, length: float) -> np.ndarray:
+        cells = len(edges) - 1
+        indexes = np.clip(np.floor(coordinates * cells / length).astype(np.int64), 0, cells - 1)
+        # the division may round across a border, the borders decide
+        indexes -= (coordinates < edges[indexes]) & (indexes > 0)
+        indexes += (coordinates >= edges[indexes + 1]) & (indexes < cells - 1)
+        return indexes
+
+    @staticmethod
+    def _edge(value: float):
+        return int(value) if float(value).is_integer() else float(value)
@@ -1,33 +1,36 @@
+from typing import Dict, Tuple
+
 from models.enums.provider_type import ProviderType
 
 import pandas as pd
 
-from parameters import PATH_BYTES, PATH_TIME
 from shared.RandomGenerator import np_random
 
 
 class BytesAndTime:
     labels = [ProviderType.LOW.value,
               ProviderType.MEDIUM.value, ProviderType.HIGH.value]
-    bytes = {ProviderType.LOW.value: [],
-             ProviderType.MEDIUM.value: [], ProviderType.HIGH.value: []}
-    time = {ProviderType.LOW.value: [],
-            ProviderType.MEDIUM.value: [], ProviderType.HIGH.value: []}
-
-    def __init__(self):
-        # read lines
-        for label in self.labels:
-            self.bytes[label] = pd.read_csv(
-                f'{PATH_BYTES}{label}.csv', usecols=['sc-bytes'])
-            self.time[label] = pd.read_csv(
-                f'{PATH_TIME}{label}.csv',  usecols=['time-taken'])
-        return
-
-    # BytesAndTime is a singleton
-    def __new__(cls):
-        if not hasattr(cls, 'instance'):
-            cls.instance = super(BytesAndTime, cls).__new__(cls)
-        return cls.instance
+
+    def __init__(self, path_bytes: str, path_time: str):
+        self.path_bytes = path_bytes
+        self.path_time = path_time
+        # the traces are read on first use
+        self._bytes = None
+        self._time = None
+
+    @property
+    def bytes(self):
+        if self._bytes is None:
+            self._bytes = {label: pd.read_csv(f'{self.path_bytes}{label}.csv', usecols=['sc-bytes'])
+                           for label in self.labels}
+        return self._bytes
+
+    @property
+    def time(self):
+        if self._time is None:
+            self._time = {label: pd.read_csv(f'{self.path_time}{label}.csv', usecols=['time-taken'])
+                          for label in self.labels}
+        return self._time
 
     def get_bytes(self, workload: ProviderType) -> int:
         random_number = np_random.randint(
@@ -43,4 +46,14 @@ class BytesAndTime:
         return self.get_time(workload), self.get_bytes(workload)
 
 
-bytes_and_time = BytesAndTime()
+# one BytesAndTime per pair of trace paths, shared by the simulations of the process
+_bytes_and_time: Dict[Tuple[str, str], BytesAndTime] = {}
+
+
+def get_bytes_and_time(path_bytes: str, path_time: str) -> BytesAndTime:
+    """
+    Returns the BytesAndTime of the given trace paths, the traces are read once per process.
+    """
+    if (path_bytes, path_time) not in _bytes_and_time:
+        _bytes_and_time[(path_bytes, path_time)] = BytesAndTime(path_bytes, path_time)
+    return _bytes_and_time[(path_bytes, path_time)]
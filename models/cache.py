@@ -1,111 +1,182 @@
-
-from typing import List
+import heapq
+from typing import Dict, List, Tuple
 from models.resource import Resource
 from models.enums.cache_replacement_strategy import CacheReplacementStrategy
+from models.enums.gdsf_cost import GDSFCost
+from models.replacement_policies.replacement_policy import ReplacementPolicy
+from models.replacement_policies.lru_policy import LRUPolicy
+from models.replacement_policies.lfu_policy import LFUPolicy
+from models.replacement_policies.arc_policy import ARCPolicy
+from models.replacement_policies.two_queue_policy import TwoQueuePolicy
+from models.replacement_policies.s3_fifo_policy import S3FIFOPolicy
+from models.replacement_policies.lirs_policy import LIRSPolicy
+from models.replacement_policies.gdsf_policy import GDSFPolicy
 
 # note: I think this is not the right place to add cache hit rate and cache miss rate
 
+REPLACEMENT_POLICIES = {
+    CacheReplacementStrategy.LRU: LRUPolicy,
+    CacheReplacementStrategy.LFU: LFUPolicy,
+    CacheReplacementStrategy.ARC: ARCPolicy,
+    CacheReplacementStrategy.TWO_QUEUE: TwoQueuePolicy,
+    CacheReplacementStrategy.S3_FIFO: S3FIFOPolicy,
+    CacheReplacementStrategy.LIRS: LIRSPolicy,
+    CacheReplacementStrategy.GDSF: GDSFPolicy,
+}
+
 
 class Cache:
-    def __init__(self, max_size_bytes: int, replacement_strategy=CacheReplacementStrategy.LRU):
-        self.resources: List[Resource] = []
+    """
+    Byte-bounded cache of provider resources.
+
+    Resources are indexed by provider id, so lookups are O(1), and the eviction order is delegated to the
+    ReplacementPolicy registered for the replacement strategy in REPLACEMENT_POLICIES.
+    Expirations are tracked in a min-heap keyed on expiration_time, so each epoch only pops what actually expired.
+    The same provider may be stored more than once (e.g. a caching order executed while an older copy is
+    still valid): lookups return the oldest stored copy.
+    """
+
+    def __init__(
+            self, max_size_bytes: int, replacement_strategy=CacheReplacementStrategy.LRU,
+            gdsf_cost=GDSFCost.TIME_TAKEN):
+        # provider_id -> resources of that provider, in storage order
+        self._index: Dict[str, List[Resource]] = {}
+        # resource -> None, from the least to the most recently used
+        self._resources: Dict[Resource, None] = {}
+        # (expiration_time, storage order, resource), evicted resources are skipped when popped
+        self._expirations: List[Tuple[int, int, Resource]] = []
+        self._stored_resources = 0
         self.max_size_bytes = max_size_bytes
         self.current_size_bytes = 0
         self.replacement_strategy = replacement_strategy
+        if replacement_strategy == CacheReplacementStrategy.GDSF:
+            self.replacement_policy: ReplacementPolicy = GDSFPolicy(max_size_bytes, gdsf_cost)
+        else:
+            self.replacement_policy: ReplacementPolicy = REPLACEMENT_POLICIES[replacement_strategy](max_size_bytes)
         self.request_received = 0
         self.cache_hits = 0
         # a cache miss is a cached resource that is not used
         self.cache_misses = 0
 
+    def __contains__(self, provider_id: str):
+        """
+        Returns True if a resource of the provider is stored, without counting it as a request.
+        """
+        return provider_id in self._index
+
+    @property
+    def resources(self) -> List[Resource]:
+        """
+        The cached resources, from the least to the most recently used, whatever the replacement policy.
+        """
+        return list(self._resources)
+
     def add_resource(self, resource: Resource, current_time: int = None):
         if current_time != None:
             resource.storage_time = current_time
-         # check if there is space is cache
-        if self.current_size_bytes + resource.size <= self.max_size_bytes:
-            self.resources.append(resource)
-            self.current_size_bytes += resource.size
-            #print(f"Resource {resource.provider_id} stored in cache at {current_time} until {resource.expiration_time}.")
-        else:
-            # check if resource bytes is bigger than the maximum cache size
-            if resource.size > self.max_size_bytes:
-                print(
-                    f'impossible to cache {resource.provider_id} since its size is bigger then the cache size')
-                return
-            # If cache is full, apply replacement strategy
-            if self.replacement_strategy == CacheReplacementStrategy.LRU:
-                self._apply_lru_strategy()
-                self.add_resource(resource)
-            elif self.replacement_strategy == CacheReplacementStrategy.LFU:
-                self._apply_lfu_strategy()
-                self.add_resource(resource)
-            else:
-                print(f"Error: Invalid replacement strategy.")
+        # check resource bytes is bigger than the maximum cache size
+        if resource.size > self.max_size_bytes:
+            print(
+                f'impossible to cache {resource.provider_id} since its size is bigger then the cache size')
+            return
+        # If cache is full, apply replacement strategy until there is space for the resource
+        while self.current_size_bytes + resource.size > self.max_size_bytes:
+            if not self._apply_replacement_strategy(resource):
                 return
+        self._index.setdefault(resource.provider_id, []).append(resource)
+        self._resources[resource] = None
+        self.replacement_policy.add(resource)
+        if resource.expiration_time is not None:
+            heapq.heappush(self._expirations, (resource.expiration_time, self._stored_resources, resource))
+            self._stored_resources += 1
+        self.current_size_bytes += resource.size
+        #print(f"Resource {resource.provider_id} stored in cache at {current_time} until {resource.expiration_time}.")
 
-    def _apply_lru_strategy(self):
-        # Least Recently Used (LRU)
-        if len(self.resources) <= 0:
-            print("Cache already empty - not possible to perform LRU")
-            return
-        self.resources.sort(key=lambda x: x.last_time_retrieved)
-        # consider the case that the resource is great than the cache
-        resource_to_remove = self.resources.pop(0)
-        self.current_size_bytes -= resource_to_remove.size
+    def _discard_resource(self, resource: Resource):
+        """
+        Removes a stored resource from the index, releasing its bytes. The replacement policy is not notified.
+
+        Args:
+            resource (Resource): the resource to remove, it must be stored in the cache.
+        """
+        del self._resources[resource]
+        same_provider = self._index[resource.provider_id]
+        if len(same_provider) == 1:
+            del self._index[resource.provider_id]
+        else:
+            same_provider.remove(resource)
+        self.current_size_bytes -= resource.size
+
+    def _apply_replacement_strategy(self, incoming: Resource) -> bool:
+        """
+        Evicts the resource chosen by the replacement policy to make room for the incoming one.
+
+        Args:
+            incoming (Resource): the resource that is going to be stored.
+
+        Returns:
+            bool: False if the cache was already empty.
+        """
+        resource_to_remove = self.replacement_policy.evict(incoming)
+        if resource_to_remove is None:
+            print(f"Cache already empty - not possible to perform {self.replacement_strategy.value}")
+            return False
+        self._discard_resource(resource_to_remove)
         # check resource freq and if it 0, increment cache miss
         if resource_to_remove.frequency == 0:
             self.cache_misses += 1
         print(
-            f"Resource {resource_to_remove.provider_id} removed from cache due to LRU strategy.")
+            f"Resource {resource_to_remove.provider_id} removed from cache due to {self.replacement_strategy.value} strategy.")
+        return True
 
-    def _apply_lfu_strategy(self):
-        # Least Frequently Used (LFU)
-        if len(self.resources) <= 0:
-            print("Cache already empty - not possible to perform LFU")
-            return
-        # Find the minimum frequency among all resources in the cache
-        min_frequency = min(resource.frequency for resource in self.resources)
-
-        # Find all resources with the minimum frequency
-        least_frequent_resources = [
-            resource.provider_id for resource in self.resources if resource.frequency == min_frequency]
-        resource_to_remove = None
-        # Iterate through the resources in the cache
-        for resource in self.resources:
-            # Check if the current resource is one of the least frequent resources
-            if resource.provider_id in least_frequent_resources:
-                # Compare the storage times of the current resource and the resource to remove
-                if resource_to_remove is None or resource.storage_time < resource_to_remove.storage_time:
-                    resource_to_remove = resource
-        # If a resource to remove is found
-        if resource_to_remove is not None:
-            # Remove the resource from the cache
-            self.resources.remove(resource_to_remove)
-            # check resource freq and if it 0, increment cache miss
-            if resource_to_remove.frequency == 0:
-                self.cache_misses += 1
-            self.current_size_bytes -= resource_to_remove.size
-            print(
-                f"Resource {resource_to_remove.provider_id} removed from cache due to LFU strategy.")
+    def get_eviction_candidate(self, incoming: Resource):
+        """
+        Returns the first resource the replacement policy would evict to store the incoming one,
+        or None if the incoming resource fits without evictions.
+
+        Args:
+            incoming (Resource): the resource that may be stored.
+        """
+        if self.current_size_bytes + incoming.size <= self.max_size_bytes:
+            return None
+        return self.replacement_policy.victim(incoming)
+
+    def next_expiration_time(self):
+        """
+        Returns the earliest expiration time among the cached resources (possibly of an already evicted one),
+        None if no resource expires.
+        """
+        if len(self._expirations) == 0:
+            return None
+        return self._expirations[0][0]
 
     def remove_expired_resources(self, current_time: int):
-        #self.resources = [resource for resource in self.resources if current_time - resource.storage_time <= resource.expiration_time]
-        self.resources = [resource for resource in self.resources if current_time <= resource.expiration_time]
-        self.current_size_bytes = sum(
-            resource.size for resource in self.resources)
+        while len(self._expirations) > 0 and self._expirations[0][0] < current_time:
+            _, _, resource = heapq.heappop(self._expirations)
+            # the resource may have been evicted already
+            if resource in self._resources:
+                self._discard_resource(resource)
+                self.replacement_policy.remove(resource)
+        # drop the entries of evicted resources once they outnumber the stored ones
+        if len(self._expirations) > 2 * len(self._resources) + 16:
+            self._expirations = [entry for entry in self._expirations if entry[2] in self._resources]
+            heapq.heapify(self._expirations)
 
     def get_resource(self, provider_id: str, current_time: int):
         self.request_received += 1
-        for resource in self.resources:
-            if resource.provider_id == provider_id:
-                # if current_time - resource.storage_time <= resource.expiration_time:
-                #if current_time <= resource.expiration_time:
-                resource.frequency += 1
-                resource.last_time_retrieved = current_time
-                #print(f"Resource {provider_id} retrieved from cache.")
-                self.cache_hits += 1
-                return resource
-    #print(f"*** Resource {provider_id} NOT FOUND in cache at {current_time} ***")
-        return
+        same_provider = self._index.get(provider_id)
+        if same_provider is None:
+            #print(f"*** Resource {provider_id} NOT FOUND in cache at {current_time} ***")
+            return
+        resource = same_provider[0]
+        resource.frequency += 1
+        resource.last_time_retrieved = current_time
+        del self._resources[resource]
+        self._resources[resource] = None
+        self.replacement_policy.touch(resource)
+        #print(f"Resource {provider_id} retrieved from cache.")
+        self.cache_hits += 1
+        return resource
 
     def get_cache_hit_rate(self):
         if self.request_received == 0:
@@ -118,5 +189,4 @@ class Cache:
         return self.miss_rate / self.request_received
 
     def epoch_passed(self, current_time):
-        # TODO: optimize this operation
         self.remove_expired_resources(current_time)
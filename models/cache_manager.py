@@ -1,39 +1,140 @@
 
-from typing import List
+import bisect
+import itertools
+import math
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
 from models.cache_worker import CacheWorker
 from models.caching_order import CachingOrder
+from models.cooperative_order_index import CooperativeOrderIndex
 from models.enums.cache_manager_node import CacheManagerMode
 from models.enums.order_type import OrderType
 from models.queue_element import QueueElement
 from models.request import Request
 from models.simulation_queue import SIMULATION_QUEUE
 from models.user import User
-from parameters import DEFAULT_AVG_PRE_REQUEST_TIME, DEFAULT_STD_PRE_REQUEST_TIME, ACCURACY, DEFAULT_EXPIRATION_TIME, MODE
+from parameters import SimulationConfig, default_config
 from shared.RandomGenerator import regular_random
+from shared.spatial_index import SpatialIndex, index_cache_workers
 
 
 class CacheManager:
     def __init__(
-            self, accuracy=ACCURACY, average_pre_request_time=DEFAULT_AVG_PRE_REQUEST_TIME,
-            std_pre_request_time=DEFAULT_STD_PRE_REQUEST_TIME, default_expiration_time=DEFAULT_EXPIRATION_TIME,
-            mode=MODE):
-        self.accuracy = accuracy
-        self.average_pre_request_time = average_pre_request_time
-        self.std_pre_request_time = std_pre_request_time
-        self.default_expiration_time = default_expiration_time
-        self.mode = mode
+            self, accuracy=None, average_pre_request_time=None, std_pre_request_time=None,
+            default_expiration_time=None, mode=None, time_window_size=None, mobility_lookahead=None,
+            config: SimulationConfig = None):
+        config = default_config() if config is None else config
+        self.accuracy = config.accuracy if accuracy is None else accuracy
+        self.average_pre_request_time = config.default_avg_pre_request_time if average_pre_request_time is None else average_pre_request_time
+        self.std_pre_request_time = config.default_std_pre_request_time if std_pre_request_time is None else std_pre_request_time
+        self.default_expiration_time = config.default_expiration_time if default_expiration_time is None else default_expiration_time
+        self.mode = config.mode if mode is None else mode
+        # the caching orders are generated a window of time_window_size ms ahead, or for the whole run if 0
+        self.time_window_size = config.order_window if time_window_size is None else time_window_size
+        # a user about to hand over within mobility_lookahead ms is expected to request its providers again from the
+        # next cache worker, 0 to only place orders where the requests are made
+        self.mobility_lookahead = config.mobility_lookahead if mobility_lookahead is None else mobility_lookahead
+        # number of redundant orders removed by generate_caching_orders
+        self.collapsed_orders = 0
+        # number of requests predicted at the next cache worker of a user by generate_caching_orders
+        self.handover_requests = 0
         return
 
-    def epoch_passed(self, current_time):
-        if current_time % self.time_window_size != 0:
-            return
-        return self.generate_caching_orders()
+    def predict_requests(self, queue_elements: Iterable[QueueElement]) -> List[bool]:
+        """
+        Draws whether each request is predicted, with probability accuracy, in the order of queue_elements, as
+        generate_caching_orders draws it, and returns the draws in time order (ties in the order of queue_elements).
+
+        The whole-run orders draw over the requests in generation order, the windowed ones read them in time order:
+        passing the draws in generation order to rolling_caching_orders predicts the same requests.
+
+        Parameters:
+        -----------
+        queue_elements : Iterable[QueueElement]
+            The requests of the simulation, in the order generate_caching_orders sees them in the whole-run mode.
+        """
+        predictions = []
+        times = []
+        for queue_element in queue_elements:
+            predictions.append(regular_random.random() <= self.accuracy)
+            times.append(queue_element.time_epoch)
+        return [predictions[index] for index in sorted(range(len(times)), key=times.__getitem__)]
+
+    def rolling_caching_orders(
+            self, queue_elements: Iterable[QueueElement], cache_workers: List[CacheWorker],
+            dispatch: Callable[[List[List[CachingOrder]]], None],
+            spatial_index: SpatialIndex = None, predictions: Iterable[bool] = None) -> Iterator[QueueElement]:
+        """
+        Yields the requests of the simulation while generating their caching orders one time window ahead: when the
+        simulation reaches a window, the orders of the next one are generated and dispatched, so only two windows of
+        requests are in memory instead of the whole run.
+
+        Cooperative and redundant orders are only matched within a window, and orders prefetching more than a window
+        ahead of their request are executed late, at the first request after their dispatch.
+
+        Parameters:
+        -----------
+        queue_elements : Iterable[QueueElement]
+            The requests of the simulation in ascending time_epoch order.
+        cache_workers : List[CacheWorker]
+            A list of cache workers involved in the simulation.
+        dispatch : Callable[[List[List[CachingOrder]]], None]
+            Adds the caching orders of each cache worker to the running simulation, e.g.
+            SimulationKernel.add_caching_orders.
+        spatial_index : SpatialIndex, optional
+            The index of the positions of the cache workers, built if None.
+        predictions : Iterable[bool], optional
+            Whether each request is predicted, in the order of queue_elements (see predict_requests), drawn while
+            generating the orders if None.
+        """
+        spatial_index = index_cache_workers(cache_workers) if spatial_index is None else spatial_index
+        predictions = None if predictions is None else iter(predictions)
+        # the requests of each window, its orders are generated whatever the time of its first request
+        windows = (list(elements) for _, elements in itertools.groupby(
+            queue_elements, key=lambda queue_element: queue_element.time_epoch // self.time_window_size))
+        upcoming = next(windows, None)
+        if upcoming is not None:
+            dispatch(self.generate_caching_orders([], cache_workers, upcoming, spatial_index, predictions))
+        while upcoming is not None:
+            current, upcoming = upcoming, next(windows, None)
+            if upcoming is not None:
+                dispatch(self.generate_caching_orders([], cache_workers, upcoming, spatial_index, predictions))
+            yield from current
 
-    def generate_caching_orders(self, users: List[User], cache_workers: List[CacheWorker]):
+    def queue_elements(
+            self, user: User, requests: Iterable[Request], cache_workers: List[CacheWorker],
+            spatial_index: SpatialIndex = None) -> Iterator[QueueElement]:
+        """
+        Yields a QueueElement for each request of the user, assigned to the cache worker closest to the user at the
+        request time, looked up in the handover timeline of the user.
+
+        Parameters:
+        -----------
+        user : User
+            The user making the requests.
+        requests : Iterable[Request]
+            The requests of the user.
+        cache_workers : List[CacheWorker]
+            A list of cache workers involved in the simulation.
+        spatial_index : SpatialIndex, optional
+            The index of the positions of the cache workers, built if None.
+        """
+        spatial_index = index_cache_workers(cache_workers) if spatial_index is None else spatial_index
+        handover_timeline = user.handover_timeline(spatial_index)
+        for request in requests:
+            closest_cache_worker = handover_timeline.cache_worker_at(request.execution_time)
+            yield QueueElement(request, user, request.execution_time, cache_workers[closest_cache_worker])
+
+    def generate_caching_orders(
+            self, users: List[User], cache_workers: List[CacheWorker], queue_elements: Iterable[QueueElement] = None,
+            spatial_index: SpatialIndex = None, predictions: Iterator[bool] = None):
         """
         Generate a List of caching orders according to the accuracy. 
-        *** ALSO GENERATES QUEUE ELEMENTS AND ADDS THOSE TO THE SIMULATION QUEUE ***
+        *** WITHOUT queue_elements, ALSO GENERATES QUEUE ELEMENTS AND ADDS THOSE TO THE SIMULATION QUEUE ***
+
+        With a mobility_lookahead, a request made less than mobility_lookahead ms before the user hands over is also
+        expected again from the next cache worker of the user, when the user enters its area, whatever the accuracy.
+        Only the queue elements with a User (not a user id) have a path to look ahead on.
 
         Parameters:
         -----------
@@ -41,17 +142,31 @@ class CacheManager:
             The users with a list a requests.
         cache_workers : List[CacheWorker]
             A list of cache workers involved in the simulation.
+        queue_elements : Iterable[QueueElement], optional
+            The requests of the simulation (e.g. a merged stream), only their caching orders are kept in memory.
+        spatial_index : SpatialIndex, optional
+            The index of the positions of the cache workers, built if None.
+        predictions : Iterator[bool], optional
+            Whether each of the queue elements is predicted, see predict_requests, drawn with accuracy if None.
         """
+        spatial_index = index_cache_workers(cache_workers) if spatial_index is None else spatial_index
         # 1. get all users order and separate orders per edge_node
+        if queue_elements is None:
+            queue_elements = self.fill_simulation_queue(users, cache_workers, spatial_index)
+        cache_worker_indexes = {cache_worker: index for index, cache_worker in enumerate(cache_workers)}
         requests_per_cache_worker = [[] for cache_worker in cache_workers]
-        for user in users:
-            for request in user.requests:
-                closest_cache_worker = user.closest_cache_worker_by_index_in_time(cache_workers, request.execution_time)
-                queueElement = QueueElement(request, user, request.execution_time, cache_workers[closest_cache_worker])
-                SIMULATION_QUEUE.add_element(queueElement)
-                random_number = regular_random.random()
-                if random_number <= self.accuracy:
-                    requests_per_cache_worker[closest_cache_worker].append(request)
+        for queue_element in queue_elements:
+            predicted = regular_random.random() <= self.accuracy if predictions is None else next(predictions)
+            if predicted:
+                requests_per_cache_worker[cache_worker_indexes[queue_element.cache_worker]].append(queue_element.request)
+            if self.mobility_lookahead > 0 and isinstance(queue_element.user, User):
+                handover = queue_element.user.handover_timeline(spatial_index).next_handover(
+                    queue_element.time_epoch, self.mobility_lookahead)
+                if handover is not None:
+                    handover_time, next_cache_worker = handover
+                    requests_per_cache_worker[next_cache_worker].append(
+                        Request(math.ceil(handover_time), queue_element.request.provider))
+                    self.handover_requests += 1
 
         for i in range(len(requests_per_cache_worker)):
             requests_per_cache_worker[i] = sorted(requests_per_cache_worker[i], key=lambda x: x.execution_time)
@@ -76,23 +191,33 @@ class CacheManager:
                 key=lambda x: x.execution_time)
 
         if self.mode == CacheManagerMode.COOPERATIVE:
+            order_index = CooperativeOrderIndex(caching_orders_per_cache_worker)
             for cache_worker_index in range(len(caching_orders_per_cache_worker)):
                 for order in caching_orders_per_cache_worker[cache_worker_index]:
                     order = self.check_cooperative_cache_order(
-                        order, caching_orders_per_cache_worker, cache_worker_index, cache_workers)
+                        order, caching_orders_per_cache_worker, cache_worker_index, cache_workers, order_index)
 
         for index in range(len(caching_orders_per_cache_worker)):
-            clean_cache_worker_orders = []
-            for order in caching_orders_per_cache_worker[index]:
-                if not self.check_redundant_cache_order(order, clean_cache_worker_orders):
-                    clean_cache_worker_orders.append(order)
-            caching_orders_per_cache_worker[index] = clean_cache_worker_orders
+            caching_orders_per_cache_worker[index] = self.remove_redundant_cache_orders(
+                caching_orders_per_cache_worker[index])
 
         return caching_orders_per_cache_worker
 
+    def fill_simulation_queue(
+            self, users: List[User], cache_workers: List[CacheWorker],
+            spatial_index: SpatialIndex = None) -> Iterator[QueueElement]:
+        """
+        Adds the requests of all users to the SIMULATION_QUEUE, yielding each QueueElement once added.
+        """
+        spatial_index = index_cache_workers(cache_workers) if spatial_index is None else spatial_index
+        for user in users:
+            for queue_element in self.queue_elements(user, user.requests, cache_workers, spatial_index):
+                SIMULATION_QUEUE.add_element(queue_element)
+                yield queue_element
+
     def check_cooperative_cache_order(
             self, target_order: CachingOrder, caching_orders_per_cache_worker: List[List[CachingOrder]],
-            cache_worker_index: int, cache_workers: List[CacheWorker]):
+            cache_worker_index: int, cache_workers: List[CacheWorker], order_index: CooperativeOrderIndex = None):
         """
         Checks if a given caching order can be fulfilled cooperatively by any other cache worker. If so, the order is updated
         to a cooperative order, indicating the cooperating cache worker.
@@ -107,6 +232,9 @@ class CacheManager:
             The index of the cache worker that will try to execute the target_order.
         cache_workers : List[CacheWorker]
             The list of all cache workers.
+        order_index : CooperativeOrderIndex, optional
+            The index of the STANDARD orders of caching_orders_per_cache_worker, queried instead of scanning the
+            order lists. It is kept up to date when target_order becomes cooperative.
 
         Returns:
         --------
@@ -115,26 +243,64 @@ class CacheManager:
         """
         if (target_order.is_cooperator_pointer):
             return target_order
+        if order_index is not None:
+            found = order_index.find(target_order, cache_worker_index)
+            if found is not None:
+                self._cooperate(target_order, found[1], cache_workers[found[0]])
+                order_index.remove(target_order)
+            return target_order
         for i, cache_worker_orders in enumerate(caching_orders_per_cache_worker):
             if i != cache_worker_index:
                 for order in cache_worker_orders:
                     if order.execution_time >= target_order.request_execution_time:
                         break
                     if order.provider.id == target_order.provider.id and target_order.request_execution_time > order.execution_time and target_order.request_execution_time < order.expiration_time and order.type == OrderType.STANDARD:
-                        target_order.type = OrderType.COOPERATIVE
-                        target_order.cooperator_edge_node = cache_workers[i].edge_node
-                        target_order.expiration_time = order.expiration_time if target_order.expiration_time > order.expiration_time else target_order.expiration_time
-                        order.is_cooperator_pointer = True
+                        self._cooperate(target_order, order, cache_workers[i])
                         return target_order
         return target_order
 
+    @staticmethod
+    def _cooperate(target_order: CachingOrder, order: CachingOrder, cooperator: CacheWorker):
+        """
+        Turns target_order into a cooperative order served by the cooperator executing order.
+        """
+        target_order.type = OrderType.COOPERATIVE
+        target_order.cooperator_edge_node = cooperator.edge_node
+        target_order.expiration_time = order.expiration_time if target_order.expiration_time > order.expiration_time else target_order.expiration_time
+        order.is_cooperator_pointer = True
+
     def get_pre_fetch_time(self):
         random_pre_fetch_time = regular_random.gauss(
             self.average_pre_request_time, self.std_pre_request_time)
         return int(random_pre_fetch_time) if int(random_pre_fetch_time) > 0 else 1
 
-    def check_redundant_cache_order(self, order: CachingOrder, caching_orders: List[CachingOrder]):
-        for caching_order in caching_orders:
-            if order.provider.id == caching_order.provider.id and order.request_execution_time > caching_order.execution_time and order.request_execution_time < caching_order.expiration_time and not order.is_cooperator_pointer:
-                return True
-        return False
+    def remove_redundant_cache_orders(self, caching_orders: List[CachingOrder]) -> List[CachingOrder]:
+        """
+        Returns the caching orders of a cache worker without the redundant ones, and adds their number to
+        collapsed_orders. An order is redundant when its request is served by an order of the same provider kept
+        before it, executed before the request and expiring after it. The orders pointing to a cooperator are kept.
+
+        The orders are swept once in execution order: the kept orders of each provider have non-decreasing execution
+        times, so the ones executed before a request are a prefix of them, and the request is covered when the
+        largest expiration time of the prefix is after it.
+
+        Parameters:
+        -----------
+        caching_orders : List[CachingOrder]
+            The caching orders of a cache worker, sorted by execution time.
+        """
+        # provider id -> (execution times, running maximum of the expiration times) of the kept orders
+        kept_per_provider: Dict[str, Tuple[List[int], List[int]]] = {}
+        clean_cache_worker_orders = []
+        for order in caching_orders:
+            execution_times, expiration_times = kept_per_provider.setdefault(order.provider.id, ([], []))
+            if not order.is_cooperator_pointer:
+                executed_before = bisect.bisect_left(execution_times, order.request_execution_time)
+                if executed_before > 0 and expiration_times[executed_before - 1] > order.request_execution_time:
+                    self.collapsed_orders += 1
+                    continue
+            clean_cache_worker_orders.append(order)
+            execution_times.append(order.execution_time)
+            expiration_times.append(
+                max(expiration_times[-1], order.expiration_time) if expiration_times else order.expiration_time)
+        return clean_cache_worker_orders
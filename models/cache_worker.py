@@ -1,12 +1,18 @@
-from typing import List
+import heapq
+from collections import deque
+from typing import Deque, Dict, List, Tuple
 
 from models.resource import Resource
 from models.request import Request
 from models.enums.order_type import OrderType
 from models.edge_node import EdgeNode
 from models.caching_order import CachingOrder
-from parameters import CACHE_NOT_FOUND_RESOURCE, DEFAULT_EXPIRATION_TIME, NEIGHBOR_EDGE_NODES
-from shared.helper import calculate_distance
+from models.enums.admission_filter_type import AdmissionFilterType
+from models.admission_filter import TinyLFUAdmissionFilter
+from models.enums.prefetcher_type import PrefetcherType
+from models.prefetcher import SketchPrefetcher
+from parameters import SimulationConfig, default_config
+from shared.spatial_index import SpatialIndex, index_edge_nodes
 from models.network_latency import network_latency
 
 
@@ -18,8 +24,8 @@ class CacheWorker:
     ----------
     id : int
         The identifier of the CacheWorker.
-    cooperative_orders : List[CachingOrder]
-        The list of cooperative orders this CacheWorker has.
+    cooperative_orders : Dict[CachingOrder, None]
+        The valid cooperative orders this CacheWorker has, in arrival order.
     edge_node : EdgeNode
         The EdgeNode that is responsible for this CacheWorker.
     cache_nodes : List[EdgeNode]
@@ -32,13 +38,26 @@ class CacheWorker:
         The maximum number of resources that can be cached by this CacheWorker using classical caching.
     neighbor_resources : int
         The amount of resources that this CacheWorker can request from its neighbors.
-    pending_orders : List[CachingOrder]
-        The list of pending orders this CacheWorker has.
+    pending_orders : Deque[CachingOrder]
+        The pending orders this CacheWorker has, sorted by execution time.
+    admission_filter : TinyLFUAdmissionFilter
+        The filter deciding which provider responses are stored by classical caching, None to store all of them.
+    admitted_resources : int
+        The number of provider responses the admission filter let into the cache.
+    rejected_resources : int
+        The number of provider responses the admission filter kept out of the cache.
+    prefetcher : SketchPrefetcher
+        The predictor of the providers to prefetch from the traffic of the cache worker, None if the caching orders
+        come from the CacheManager oracle.
+    prefetched_bytes : int
+        The bytes fetched from the providers by the executed standard caching orders.
+    default_expiration_time : int
+        The validity in ms of the resources fetched from the providers.
 
     Methods
     -------
     get_ordered_cache_nodes_by_distance(edge_node: EdgeNode, cache_nodes: List[EdgeNode],
-                                          neighbor_edge_nodes=NEIGHBOR_EDGE_NODES) -> List[EdgeNode]:
+                                          neighbor_edge_nodes: int, spatial_index: SpatialIndex) -> List[EdgeNode]:
         Orders the cache nodes by distance from the given EdgeNode.
 
     check_cooperative_order(order: CachingOrder) -> bool:
@@ -62,20 +81,39 @@ class CacheWorker:
 
     def __init__(
             self, id: int, edge_node: EdgeNode, cache_nodes: List[EdgeNode],
-            neighbor_edge_nodes=NEIGHBOR_EDGE_NODES, classical_caching=CACHE_NOT_FOUND_RESOURCE):
+            neighbor_edge_nodes=None, classical_caching=None, admission_filter=None, config: SimulationConfig = None,
+            spatial_index: SpatialIndex = None, prefetcher=None):
+        config = default_config() if config is None else config
+        neighbor_edge_nodes = config.neighbor_edge_nodes if neighbor_edge_nodes is None else neighbor_edge_nodes
+        classical_caching = config.cache_not_found_resource if classical_caching is None else classical_caching
+        admission_filter = config.admission_filter if admission_filter is None else admission_filter
+        prefetcher = config.prefetcher if prefetcher is None else prefetcher
         self.id = id
-        self.cooperative_orders: List[CachingOrder] = []
+        self.default_expiration_time = config.default_expiration_time
+        self.cooperative_orders: Dict[CachingOrder, None] = {}
+        # (expiration_time, arrival order, order) of the valid cooperative orders
+        self._cooperative_expirations: List[Tuple[int, int, CachingOrder]] = []
+        self._received_cooperative_orders = 0
         self.edge_node = edge_node
-        self.cache_nodes = self.get_ordered_cache_nodes_by_distance(edge_node, cache_nodes, neighbor_edge_nodes)
+        self.cache_nodes = self.get_ordered_cache_nodes_by_distance(
+            edge_node, cache_nodes, neighbor_edge_nodes, spatial_index)
         self.total_requests = 0
         self.cached_requests = 0
         self.classical_caching = classical_caching
         self.neighbor_resources = 0
-        self.pending_orders: List[CachingOrder] = []
+        self.pending_orders: Deque[CachingOrder] = deque()
+        self.admission_filter = TinyLFUAdmissionFilter(
+            config.admission_sketch_width) if admission_filter == AdmissionFilterType.TINY_LFU else None
+        self.admitted_resources = 0
+        self.rejected_resources = 0
+        self.prefetcher = SketchPrefetcher(
+            config.prefetch_top_k, config.prefetch_interval,
+            config.admission_sketch_width) if prefetcher == PrefetcherType.SKETCH else None
+        self.prefetched_bytes = 0
 
     def get_ordered_cache_nodes_by_distance(
             self, edge_node: EdgeNode, cache_nodes: List[EdgeNode],
-            neighbor_edge_nodes: int) -> List[EdgeNode]:
+            neighbor_edge_nodes: int, spatial_index: SpatialIndex = None) -> List[EdgeNode]:
         """
         Returns a list of N CacheNode objects sorted by their distance from the passed EdgeNode object.
 
@@ -83,40 +121,49 @@ class CacheWorker:
         - edge_node (EdgeNode): The EdgeNode object for which the cache nodes need to be sorted by distance.
         - cache_nodes (List[EdgeNode]): The list of EdgeNode objects.
         - neighbor_edge_nodes (int): the list size
+        - spatial_index (SpatialIndex): the index of the positions of cache_nodes, built if None.
 
         Returns:
         - List[EdgeNode]: The list of EdgeNode objects sorted by their distance from the passed EdgeNode object.
         """
         if neighbor_edge_nodes <= 0:
             return []
-        # Calculate distances from the edge_node to each cache_node
-        distances = {}
-        for cache_node in cache_nodes:
-            if (cache_node.id != self.edge_node.id):
-                distance = calculate_distance(edge_node.get_position(), cache_node.get_position())
-                distances[cache_node] = distance
-        # Sort the cache_nodes by distance in ascending order
-        ordered_cache_nodes = sorted(distances.keys(), key=lambda x: distances[x])
-        limit_index = neighbor_edge_nodes
-        return ordered_cache_nodes[:limit_index]
+        spatial_index = index_edge_nodes(cache_nodes) if spatial_index is None else spatial_index
+        nearest = spatial_index.k_nearest(
+            edge_node.get_position(), neighbor_edge_nodes, lambda index: cache_nodes[index].id == self.edge_node.id)
+        return [cache_nodes[index] for index in nearest]
 
     def add_caching_orders(self, orders: List[CachingOrder]):
         """
         Add a list of CachingOrders to the cache worker. The orders are separated into two lists: 
         cooperative orders and standard orders. The standard orders are sorted by execution time.
 
+        The new standard orders are sorted and merged into the pending ones, appended when none is earlier than the
+        last pending order (e.g. the orders of the next time window), ties keep the pending orders first.
+
         Parameters:
         -----------
         orders : List[CachingOrder]
         The list of orders to be added to the cache worker.
         """
+        standard_orders = []
         for order in orders:
             if order.type == OrderType.STANDARD:
-                self.pending_orders.append(order)
+                standard_orders.append(order)
             else:
-                self.cooperative_orders.append(order)
-        self.pending_orders = sorted(
-            self.pending_orders, key=lambda x: x.execution_time)
+                self.cooperative_orders[order] = None
+                heapq.heappush(
+                    self._cooperative_expirations,
+                    (order.expiration_time, self._received_cooperative_orders, order))
+                self._received_cooperative_orders += 1
+        standard_orders.sort(key=lambda x: x.execution_time)
+        if len(standard_orders) == 0:
+            return
+        if len(self.pending_orders) == 0 or self.pending_orders[-1].execution_time <= standard_orders[0].execution_time:
+            self.pending_orders.extend(standard_orders)
+        else:
+            self.pending_orders = deque(heapq.merge(
+                self.pending_orders, standard_orders, key=lambda x: x.execution_time))
 
     def remove_expired_cooperative_orders(self, current_time):
         """
@@ -127,8 +174,9 @@ class CacheWorker:
         current_time : int
             The current time in epoch format.
         """
-        self.cooperative_orders = [
-            order for order in self.cooperative_orders if order.expiration_time > current_time]
+        while len(self._cooperative_expirations) > 0 and self._cooperative_expirations[0][0] <= current_time:
+            _, _, order = heapq.heappop(self._cooperative_expirations)
+            del self.cooperative_orders[order]
 
     def request_data(self, request: Request, time_epoch: int):
         """
@@ -147,6 +195,10 @@ class CacheWorker:
             The processed request, containing the retrieved resource and the network latency.
         """
         self.total_requests += 1
+        if self.admission_filter is not None:
+            self.admission_filter.record(request.provider.id)
+        if self.prefetcher is not None:
+            self._prefetch(request, time_epoch)
         request.network_latency += network_latency.random_wireless()
         request.resource = self.get_from_cache_node(self.edge_node, request.provider.id, time_epoch)
         # 1. check if req exists in local cache
@@ -168,10 +220,34 @@ class CacheWorker:
 
         # 4. finally, if the cache is not found, grab from the provider
         response = self.perform_request(request, time_epoch)
-        if self.classical_caching:
+        if self.classical_caching and self._admit(response.resource):
             self._store_data(response.resource, time_epoch)
         return response
 
+    def _admit(self, resource: Resource):
+        """
+        Checks if a provider response should be stored by classical caching. Without admission filter every response
+        is stored, otherwise the resource must be more popular than the one the cache would evict for it.
+
+        Parameters:
+        -----------
+        resource : Resource
+            The resource returned by the provider.
+
+        Returns:
+        --------
+        bool
+            True if the resource should be stored, False otherwise.
+        """
+        if self.admission_filter is None:
+            return True
+        victim = self.edge_node.cache.get_eviction_candidate(resource)
+        if victim is None or self.admission_filter.admit(resource.provider_id, victim.provider_id):
+            self.admitted_resources += 1
+            return True
+        self.rejected_resources += 1
+        return False
+
     def _is_resource(self, resource):
         """
         Checks if the given resource is not None and increments the number of cached requests if it is not.
@@ -280,10 +356,26 @@ class CacheWorker:
         request.network_latency += network_latency.random_cloud(request.provider.network_trace)
         resource_creation_time = current_time - (request.network_latency/2)
         request.resource = Resource(request.provider.id, size, current_time,
-                                    DEFAULT_EXPIRATION_TIME, resource_creation_time)
+                                    self.default_expiration_time, resource_creation_time, application_latency)
         request.application_latency += application_latency
         return request
 
+    def _prefetch(self, request: Request, time_epoch: int):
+        """
+        Records a request in the prefetcher and, once per prefetch interval, orders the most requested providers
+        that are not in the cache. The orders are executed after the request, at the next step of the simulation.
+
+        Parameters:
+        -----------
+            request (Request): the request received.
+            time_epoch (int): the current time epoch.
+        """
+        if self.prefetcher.due(time_epoch):
+            self.add_caching_orders([
+                CachingOrder(self.id, time_epoch, time_epoch + self.default_expiration_time, provider)
+                for provider in self.prefetcher.top_providers() if provider.id not in self.edge_node.cache])
+        self.prefetcher.record(request.provider)
+
     def _store_pending_order(self, order: CachingOrder, current_time: int):
         """
         Performs a Caching Order.It Simulates sending a request to the provider and stores in cache the corresponding response as a Request object.
@@ -297,10 +389,11 @@ class CacheWorker:
             None.
         """
         (application_latency, size) = order.provider.get_latency_and_bytes()
+        self.prefetched_bytes += size
         cloud_latency = network_latency.random_cloud(order.provider.network_trace)
         resource_creation_time = (current_time) - (cloud_latency/2)
         new_resource = Resource(order.provider.id, size, order.execution_time,
-                                order.expiration_time, resource_creation_time)
+                                order.expiration_time, resource_creation_time, application_latency)
         self._store_data(new_resource, order.execution_time)
 
     def epoch_passed(self, current_time: int):
@@ -316,16 +409,34 @@ class CacheWorker:
             None
         """
         self.remove_expired_cooperative_orders(current_time)
+        self.execute_pending_orders(current_time)
+
+    def execute_pending_orders(self, current_time: int):
+        """
+        Executes the pending caching orders whose execution time is before the current time.
+
+        Parameters:
+        -----------
+            current_time (int): the current time epoch.
+        """
+        while len(self.pending_orders) > 0 and self.pending_orders[0].execution_time < current_time:
+            self._store_pending_order(self.pending_orders.popleft(), current_time)
 
-        orders_to_be_removed = []
-        for pending_resource in self.pending_orders:
-            if pending_resource.execution_time >= current_time:
-                break
+    def next_pending_order_time(self):
+        """
+        Returns the execution time of the next pending caching order, None if there are no pending orders.
+        """
+        if len(self.pending_orders) == 0:
+            return None
+        return self.pending_orders[0].execution_time
 
-            self._store_pending_order(pending_resource, current_time)
-            orders_to_be_removed.append(pending_resource)
-        for order in orders_to_be_removed:
-            self.pending_orders.remove(order)
+    def next_cooperative_order_expiration(self):
+        """
+        Returns the earliest expiration time of the cooperative orders, None if there are no cooperative orders.
+        """
+        if len(self._cooperative_expirations) == 0:
+            return None
+        return self._cooperative_expirations[0][0]
 
     def get_cache_hit_rate(self) -> float:
         if self.total_requests == 0:
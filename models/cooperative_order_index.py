@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Tuple
+
+from models.caching_order import CachingOrder
+from models.enums.order_type import OrderType
+from shared.interval_index import IntervalIndex
+
+
+class CooperativeOrderIndex:
+    """
+    The STANDARD caching orders of all cache workers, grouped by provider and cache worker as IntervalIndex of their
+    (execution_time, expiration_time) intervals, to find the order another cache worker can cooperate with without
+    scanning every order list.
+
+    The orders that become COOPERATIVE are removed, as they cannot be cooperated with anymore.
+
+    Attributes
+    ----------
+    orders : Dict[str, List[Tuple[int, List[CachingOrder], IntervalIndex]]]
+        provider id -> (cache worker index, orders of the provider in execution order, their intervals), in cache
+        worker order.
+    """
+
+    def __init__(self, caching_orders_per_cache_worker: List[List[CachingOrder]]):
+        grouped: Dict[str, Dict[int, List[CachingOrder]]] = {}
+        for cache_worker_index, cache_worker_orders in enumerate(caching_orders_per_cache_worker):
+            for order in cache_worker_orders:
+                if order.type == OrderType.STANDARD:
+                    grouped.setdefault(order.provider.id, {}).setdefault(cache_worker_index, []).append(order)
+        self.orders: Dict[str, List[Tuple[int, List[CachingOrder], IntervalIndex]]] = {}
+        # order -> (interval index, position) to remove it
+        self._positions: Dict[CachingOrder, Tuple[IntervalIndex, int]] = {}
+        for provider_id, orders_per_cache_worker in grouped.items():
+            self.orders[provider_id] = []
+            for cache_worker_index in sorted(orders_per_cache_worker):
+                orders = orders_per_cache_worker[cache_worker_index]
+                intervals = IntervalIndex([order.execution_time for order in orders],
+                                          [order.expiration_time for order in orders])
+                self.orders[provider_id].append((cache_worker_index, orders, intervals))
+                for position, order in enumerate(orders):
+                    self._positions[order] = (intervals, position)
+
+    def find(self, target_order: CachingOrder, cache_worker_index: int) -> Optional[Tuple[int, CachingOrder]]:
+        """
+        Returns the first STANDARD order of another cache worker, in cache worker and then execution order, for the
+        provider of target_order and running when it is requested, with the index of its cache worker. None if there
+        is not any.
+
+        The cache workers with orders of the provider are queried one after the other, so a match costs
+        O(W_p log n), W_p the number of those cache workers and n their orders, instead of a scan of the orders.
+        """
+        time = target_order.request_execution_time
+        for other_index, orders, intervals in self.orders.get(target_order.provider.id, ()):
+            if other_index == cache_worker_index:
+                continue
+            position = intervals.first_open_at(time)
+            if position >= 0:
+                return other_index, orders[position]
+        return None
+
+    def remove(self, order: CachingOrder):
+        """
+        Removes an order, e.g. once it became COOPERATIVE.
+        """
+        position = self._positions.pop(order, None)
+        if position is not None:
+            position[0].remove(position[1])
@@ -1,4 +1,4 @@
-from parameters import CACHE_DEFAULT_SIZE
+from parameters import SimulationConfig, default_config
 from models.cache import Cache
 
 
@@ -7,16 +7,22 @@ class EdgeNode:
     Represents an edge node with a position defined as (x, y) coordinates.
     """
 
-    def __init__(self, id, cache_size=CACHE_DEFAULT_SIZE):
+    def __init__(self, id, cache_size=None, replacement_strategy=None, config: SimulationConfig = None):
         """
         Initializes an edge node with a randomly generated (x, y) position.
 
         Args:
             edge_nodes (list): The list of all edge nodes.
+            replacement_strategy (CacheReplacementStrategy): The replacement strategy of the edge node cache.
+            config (SimulationConfig): The parameters of the simulation, the command line ones if None.
         """
+        config = default_config() if config is None else config
         self.id = id
         self.x, self.y = (None, None)
-        self.cache = Cache(cache_size)
+        self.cache = Cache(
+            config.cache_default_size if cache_size is None else cache_size,
+            config.replacement_strategy if replacement_strategy is None else replacement_strategy,
+            config.gdsf_cost)
 
     def get_position(self):
         """
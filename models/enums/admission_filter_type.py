@@ -0,0 +1,5 @@
+from enum import Enum
+
+class AdmissionFilterType(Enum):
+    NONE = "none"
+    TINY_LFU = "tinylfu"
@@ -3,3 +3,8 @@ from enum import Enum
 class CacheReplacementStrategy(Enum):
     LFU = "LFU"
     LRU = "LRU"
+    ARC = "ARC"
+    TWO_QUEUE = "2Q"
+    S3_FIFO = "S3-FIFO"
+    LIRS = "LIRS"
+    GDSF = "GDSF"
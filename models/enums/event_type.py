@@ -0,0 +1,7 @@
+from enum import Enum
+
+class EventType(Enum):
+    COOPERATIVE_ORDER_EXPIRY = "cooperative-order-expiry"
+    REQUEST_ARRIVAL = "request-arrival"
+    CACHING_ORDER_EXECUTION = "caching-order-execution"
+    RESOURCE_EXPIRY = "resource-expiry"
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class GDSFCost(Enum):
+    TIME_TAKEN = "time-taken"
+    BYTES = "bytes"
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class PrefetcherType(Enum):
+    ORACLE = "oracle"
+    SKETCH = "sketch"
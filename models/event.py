@@ -0,0 +1,41 @@
+from models.enums.event_type import EventType
+
+# events at the same time are processed in this order: a cooperative order is no longer valid at its expiration time,
+# while caching orders and resources are only executed or expired after the requests made at their time
+EVENT_PRIORITY = {
+    EventType.COOPERATIVE_ORDER_EXPIRY: 0,
+    EventType.REQUEST_ARRIVAL: 1,
+    EventType.CACHING_ORDER_EXECUTION: 2,
+    EventType.RESOURCE_EXPIRY: 3,
+}
+
+
+class Event:
+    """
+    An event of the simulation kernel.
+
+    Attributes
+    ----------
+    time : int
+        The epoch time of the event.
+    type : EventType
+        What happens at that time.
+    target : object
+        The component the event concerns: a QueueElement for request arrivals, a CacheWorker for caching order
+        executions and cooperative order expiries, a Cache for resource expiries.
+    sequence : int
+        The scheduling order, it breaks ties between events of the same time and type.
+    """
+
+    def __init__(self, time: int, type: EventType, target, sequence: int):
+        self.time = time
+        self.type = type
+        self.target = target
+        self.sequence = sequence
+        self.key = (time, EVENT_PRIORITY[type], sequence)
+
+    def __lt__(self, other: "Event"):
+        return self.key < other.key
+
+    def __str__(self):
+        return f"Event(Type: {self.type}, Time: {self.time})"
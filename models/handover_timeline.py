@@ -0,0 +1,134 @@
+import bisect
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.trajectory import Trajectory
+from shared.spatial_index import SpatialIndex
+
+# requests closer than this (ms) to a handover are resolved with a geometric search, the handover times are exact up to
+# the floating point rounding
+HANDOVER_GUARD_TIME = 1e-3
+
+
+class HandoverTimeline:
+    """
+    The sequence of cache workers serving a user along its path, as (enter_time, cache_worker_index) segments.
+
+    The handovers are found by intersecting each straight piece of the path with the bisectors between the cache
+    worker serving the user and the other ones (the edges of their Voronoi cells). The timeline is computed lazily, up
+    to the latest time looked up, and covers the first pass of the path: later times are mapped back on it as the
+    path loops through the waypoints.
+
+    Attributes
+    ----------
+    trajectory : Trajectory
+        The path of the user.
+    spatial_index : SpatialIndex
+        The index of the positions of the cache workers, the serving one is the nearest.
+    enter_times : List[float]
+        The path time (ms) when the user enters each segment, ascending.
+    cache_worker_indexes : List[int]
+        The index of the cache worker serving each segment.
+    """
+
+    def __init__(self, trajectory: Trajectory, spatial_index: SpatialIndex):
+        self.trajectory = trajectory
+        self.spatial_index = spatial_index
+        self.enter_times: List[float] = [0.0]
+        self.cache_worker_indexes: List[int] = [spatial_index.nearest(trajectory.position_at(0))]
+        self._sites = spatial_index.points
+        self._squared_sites = np.square(self._sites).sum(axis=1)
+        # the timeline is complete up to path time _time, which is in the path piece _piece
+        self._time = 0.0
+        self._piece = 0
+
+    def cache_worker_at(self, time: float) -> int:
+        """
+        Returns the index of the cache worker serving the user at a time (ms), the nearest one to the user.
+        """
+        path_time = self.trajectory.path_time(time)
+        self._extend(path_time)
+        segment = bisect.bisect_right(self.enter_times, path_time) - 1
+        if (path_time - self.enter_times[segment] < HANDOVER_GUARD_TIME and segment > 0) or (
+                segment + 1 < len(self.enter_times) and self.enter_times[segment + 1] - path_time < HANDOVER_GUARD_TIME):
+            return self.spatial_index.nearest(self.trajectory.position_at(time))
+        return self.cache_worker_indexes[segment]
+
+    def next_handover(self, time: float, horizon: float) -> Optional[Tuple[float, int]]:
+        """
+        Returns the time (ms) of the first handover after time and up to time + horizon, with the index of the cache
+        worker serving the user after it. None if the user does not hand over within the horizon.
+        """
+        path_time = self.trajectory.path_time(time)
+        end_time = float(self.trajectory.times[-1])
+        self._extend(min(path_time + horizon, end_time))
+        segment = bisect.bisect_right(self.enter_times, path_time)
+        if segment < len(self.enter_times) and self.enter_times[segment] <= path_time + horizon:
+            return time + self.enter_times[segment] - path_time, self.cache_worker_indexes[segment]
+        remaining = horizon - (end_time - path_time)
+        if remaining <= 0 or self.trajectory.loop_time <= 0:
+            return None
+        # the path goes on from the start of the loop, whose position is the one at the end of the path
+        loop_start_time = self.trajectory.loop_start_time
+        self._extend(min(loop_start_time + remaining, end_time))
+        segment = bisect.bisect_right(self.enter_times, loop_start_time)
+        if segment < len(self.enter_times) and self.enter_times[segment] <= min(loop_start_time + remaining, path_time):
+            return (time + end_time - path_time + self.enter_times[segment] - loop_start_time,
+                    self.cache_worker_indexes[segment])
+        return None
+
+    def handovers(self, until: float) -> int:
+        """
+        Returns the number of times the serving cache worker changes between time 0 and until (ms).
+        """
+        end_time = float(self.trajectory.times[-1])
+        if until <= end_time or self.trajectory.loop_time <= 0:
+            return self._handovers_between(0, min(until, end_time))
+        loop_start_time = self.trajectory.loop_start_time
+        loops, remainder = divmod(until - end_time, self.trajectory.loop_time)
+        return (self._handovers_between(0, end_time)
+                + int(loops) * self._handovers_between(loop_start_time, end_time)
+                + self._handovers_between(loop_start_time, loop_start_time + remainder))
+
+    def _handovers_between(self, start: float, end: float) -> int:
+        """
+        Returns the number of handovers with path time in (start, end].
+        """
+        self._extend(end)
+        return bisect.bisect_right(self.enter_times, end, lo=1) - bisect.bisect_right(self.enter_times, start, lo=1)
+
+    def _extend(self, until: float):
+        """
+        Computes the handovers up to path time until.
+        """
+        if len(self._sites) == 0:
+            return
+        times, points = self.trajectory.times, self.trajectory.points
+        while self._time <= until and self._piece < len(times) - 1:
+            start_time, end_time = times[self._piece], times[self._piece + 1]
+            if end_time <= start_time:
+                self._piece += 1
+                continue
+            start, direction = points[self._piece], points[self._piece + 1] - points[self._piece]
+            current = self.cache_worker_indexes[-1]
+            fraction = (self._time - start_time) / (end_time - start_time) if self._time > start_time else 0.0
+            # d(P, current)^2 - d(P, j)^2 = offsets[j] + slopes[j] * u along the piece P = start + u * direction,
+            # j is nearer than the current cache worker where it is positive
+            differences = self._sites - self._sites[current]
+            offsets = 2 * differences @ start + self._squared_sites[current] - self._squared_sites
+            slopes = 2 * differences @ direction
+            approaching = slopes > 0
+            crossings = np.full(len(self._sites), np.inf)
+            crossings[approaching] = np.maximum(-offsets[approaching] / slopes[approaching], fraction)
+            crossing = crossings.min()
+            if crossing >= 1:
+                self._time = end_time
+                self._piece += 1
+                continue
+            # at a vertex of the Voronoi cells the nearest after the crossing is the one approaching the fastest
+            tied = crossings <= crossing + 1e-12
+            following = int(np.argmax(np.where(tied, slopes, -np.inf)))
+            self._time = start_time + crossing * (end_time - start_time)
+            self.enter_times.append(self._time)
+            self.cache_worker_indexes.append(following)
@@ -8,12 +8,40 @@ from typing import List
 from models.cache_worker import CacheWorker
 from models.provider import Provider
 from models.request import Request
-from parameters import *
+from models.user import User
+from models.enums.provider_type import ProviderType
+from models.enums.user_category import UserCategory
+from parameters import SimulationConfig, default_config
+from shared.spatial_index import SpatialIndex
+
+
+class Results:
+    """
+    The results of a simulation.
+
+    Attributes
+    ----------
+    config : SimulationConfig
+        The parameters of the simulation.
+    replications : List[dict]
+        The metrics of each replication, as written in data.csv, in replication order.
+    """
+
+    def __init__(self, config: SimulationConfig, replications: List[dict]):
+        self.config = config
+        self.replications = replications
+
+    def mean(self, metric: str) -> float:
+        """
+        Returns the mean of a metric (e.g. hit_rate) over the replications.
+        """
+        return statistics.mean(replication[metric] for replication in self.replications)
 
 
 class MetricsCalculator:
-    def __init__(self, write_in_file: bool = WRITE_IN_FILE):
-        self.write_in_file = write_in_file
+    def __init__(self, write_in_file: bool = None, config: SimulationConfig = None):
+        self.config = default_config() if config is None else config
+        self.write_in_file = self.config.write_in_file if write_in_file is None else write_in_file
         self.metrics = {
             "latency": {
                 "total": [],
@@ -29,10 +57,12 @@ class MetricsCalculator:
             "std_total_latency": None,
             "number_of_requests_to_provider": None,
             "hit_rate": None,
+            "handovers": None,
+            "std_handovers": None,
         }
         if self.write_in_file:
             self.experiment_start_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            self.experiment_dir_path = os.path.join("experiments", f"{EXPERIMENT_LABEL}_{self.experiment_start_time}")
+            self.experiment_dir_path = os.path.join("experiments", f"{self.config.experiment_label}_{self.experiment_start_time}")
             self.experiment_root_folder = os.path.join("experiments")
             os.makedirs(self.experiment_dir_path)
 
@@ -44,6 +74,8 @@ class MetricsCalculator:
             "std_total_latency": None,
             "number_of_requests_to_provider": None,
             "hit_rate": None,
+            "handovers": None,
+            "std_handovers": None,
         }
         self.metrics = {
             "latency": {
@@ -63,21 +95,30 @@ class MetricsCalculator:
             'NEIGHBOR_EDGE_NODES', 'DEFAULT_EXPIRATION_TIME', 'CACHE_NOT_FOUND_RESOURCE', 'CACHE_DEFAULT_SIZE',
             'ACCURACY', 'MODE', 'RATE_OF_EVENT', 'POPULARITY_DISTRIBUTION', 'NUMBER_OF_PROVIDERS', 'CLOUD_TRACE_PATH',
             'USER_CATEGORY_DISTRIBUTION_ID', 'USER_CATEGORY_DISTRIBUTION_TYPE', 'USER_CATEGORY_DISTRIBUTION_LOCATION',
-            'PROVIDER_DISTRIBUTION_LOW', 'PROVIDER_DISTRIBUTION_MEDIUM', 'PROVIDER_DISTRIBUTION_HIGH']
+            'PROVIDER_DISTRIBUTION_LOW', 'PROVIDER_DISTRIBUTION_MEDIUM', 'PROVIDER_DISTRIBUTION_HIGH',
+            'REPLACEMENT_STRATEGY', 'GDSF_COST', 'ADMISSION_FILTER', 'ADMISSION_SKETCH_WIDTH', 'STREAMING_QUEUE',
+            'BATCHED_REQUESTS', 'TRACE_PATH', 'SCENARIO_PATH', 'ORDER_WINDOW',
+            'PREFETCHER', 'PREFETCH_TOP_K', 'PREFETCH_INTERVAL', 'MOBILITY_LOOKAHEAD']
 
         # Define the values to store
+        config = self.config
         values_row = [
-            EXPERIMENT_DURATION, NUMBER_OF_EDGE_NODES, NUMBER_OF_USERS, USER_SPEED,
-            NUMBER_OF_PROVIDERS, AREA_DIMENSIONS, SUBAREAS, EDGE_NODE_MIN_DISTANCE, USER_WAYPOINTS,
-            NUMBER_OF_USER_TYPES, DEFAULT_AVG_PRE_REQUEST_TIME, DEFAULT_STD_PRE_REQUEST_TIME, NEIGHBOR_EDGE_NODES,
-            DEFAULT_EXPIRATION_TIME, CACHE_NOT_FOUND_RESOURCE, CACHE_DEFAULT_SIZE, ACCURACY, MODE,
-            RATE_OF_EVENT, POPULARITY_DISTRIBUTION, NUMBER_OF_PROVIDERS, CLOUD_TRACE_PATH,
-            USER_CATEGORY_DISTRIBUTION[UserCategory.ID],
-            USER_CATEGORY_DISTRIBUTION[UserCategory.TYPE],
-            USER_CATEGORY_DISTRIBUTION[UserCategory.LOCATION],
-            PROVIDER_DISTRIBUTION[ProviderType.LOW],
-            PROVIDER_DISTRIBUTION[ProviderType.MEDIUM],
-            PROVIDER_DISTRIBUTION[ProviderType.HIGH]]
+            config.experiment_duration, config.number_of_edge_nodes, config.number_of_users, config.user_speed,
+            config.number_of_providers, config.area_dimensions, config.subareas, config.edge_node_min_distance,
+            config.user_waypoints, config.number_of_user_types, config.default_avg_pre_request_time,
+            config.default_std_pre_request_time, config.neighbor_edge_nodes, config.default_expiration_time,
+            config.cache_not_found_resource, config.cache_default_size, config.accuracy, config.mode,
+            config.rate_of_event, config.popularity_distribution, config.number_of_providers, config.cloud_trace_path,
+            config.user_category_distribution[UserCategory.ID],
+            config.user_category_distribution[UserCategory.TYPE],
+            config.user_category_distribution[UserCategory.LOCATION],
+            config.provider_distribution[ProviderType.LOW],
+            config.provider_distribution[ProviderType.MEDIUM],
+            config.provider_distribution[ProviderType.HIGH],
+            config.replacement_strategy.value, config.gdsf_cost.value, config.admission_filter.value,
+            config.admission_sketch_width, config.streaming_queue, config.batched_requests,
+            config.trace_path, config.scenario_path, config.order_window,
+            config.prefetcher.value, config.prefetch_top_k, config.prefetch_interval, config.mobility_lookahead]
 
         # Store the header row and values in a dictionary
         self.metrics['file_header'] = dict(zip(header_row, values_row))
@@ -101,8 +142,17 @@ class MetricsCalculator:
             hit_rates.append(hit_rate)
             print(
                 f"Cache Worker #{cache_worker.id} received {cache_worker.total_requests} requests and its hit rate was {hit_rate}")
+            if cache_worker.admission_filter is not None:
+                print(
+                    f"Cache Worker #{cache_worker.id} admitted {cache_worker.admitted_resources} resources and rejected {cache_worker.rejected_resources}")
         hit_rate = acc_cached_requests/acc_total_requests
         self.to_store["hit_rate"] = hit_rate
+        self.to_store["prefetched_bytes"] = sum(cache_worker.prefetched_bytes for cache_worker in cache_workers)
+        print(f"bytes prefetched by the caching orders: {self.to_store['prefetched_bytes']}")
+        self.to_store["admitted_resources"] = sum(cache_worker.admitted_resources for cache_worker in cache_workers)
+        self.to_store["rejected_resources"] = sum(cache_worker.rejected_resources for cache_worker in cache_workers)
+        print(f"resources admitted: {self.to_store['admitted_resources']}, "
+              f"rejected by the admission filters: {self.to_store['rejected_resources']}")
         print(f"total requests: {acc_total_requests}")
         print(f"Average Hit Rate: {acc_cached_requests/acc_total_requests}")
         print(f"Standard Deviation of Hit Rate: {statistics.stdev(hit_rates)}")
@@ -126,6 +176,16 @@ class MetricsCalculator:
         print(f"average latency: {avg_latency}")
         print(f"std latency: {std_latency}")
 
+    def calculate_handover_metrics(self, handovers: List[int]):
+        """
+        Calculates the average and the standard deviation of the number of handovers between cache workers of each
+        user during the experiment.
+        """
+        self.to_store["handovers"] = statistics.mean(handovers)
+        self.to_store["std_handovers"] = statistics.stdev(handovers) if len(handovers) > 1 else 0
+        print(f"average handovers per user: {self.to_store['handovers']}")
+        print(f"std handovers per user: {self.to_store['std_handovers']}")
+
     def calculate_requests_to_providers(self, providers: List[Provider]):
         providers_requests = 0
         for provider in providers:
@@ -140,17 +200,29 @@ class MetricsCalculator:
         with open(file_path, "a", newline="") as csv_file:
             to_store = self.to_store.copy()
             if (consolidated_data):
-                to_store["label"] = EXPERIMENT_LABEL
+                to_store["label"] = self.config.experiment_label
             headers = list(to_store.keys())
             writer = csv.DictWriter(csv_file, fieldnames=headers)
             if not file_exists or os.stat(file_path).st_size == 0:
                 writer.writeheader()
             writer.writerow(to_store)
 
-    def calculate_metrics(self, cache_workers: List[CacheWorker], providers: List[Provider]):
+    def calculate_metrics(self, cache_workers: List[CacheWorker], providers: List[Provider],
+                          users: List[User] = None, spatial_index: SpatialIndex = None, handovers: List[int] = None):
         self.calculate_latency_metrics()
         self.calculate_requests_to_providers(providers)
         self.calculate_cache_worker_metrics(cache_workers)
+        if handovers is None and users is not None and spatial_index is not None:
+            handovers = [user.handover_timeline(spatial_index).handovers(self.config.experiment_duration)
+                         for user in users]
+        if handovers is not None:
+            self.calculate_handover_metrics(handovers)
+        self.write_results()
+
+    def write_results(self):
+        """
+        Appends the calculated metrics of a replication to data.csv and consolidated_data.csv, if write_in_file.
+        """
         if self.write_in_file:
             self.write_parameter_file()
             self.write_file("data.csv")
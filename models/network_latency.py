@@ -8,10 +8,23 @@ PATH_NETWORK = './data/network_traces'
 class NetworkLatency:
     def __init__(self):
         self.cloud = {}
-        self.wireless = pd.read_csv(f'{PATH_NETWORK}/LAN/filtered_ping_wireless.csv')
-        self.ethernet = pd.read_csv(f'{PATH_NETWORK}/LAN/filtered_ping_ethernet.csv')
+        # the LAN traces are read on first use
+        self._wireless = None
+        self._ethernet = None
         return
 
+    @property
+    def wireless(self):
+        if self._wireless is None:
+            self._wireless = pd.read_csv(f'{PATH_NETWORK}/LAN/filtered_ping_wireless.csv')
+        return self._wireless
+
+    @property
+    def ethernet(self):
+        if self._ethernet is None:
+            self._ethernet = pd.read_csv(f'{PATH_NETWORK}/LAN/filtered_ping_ethernet.csv')
+        return self._ethernet
+
     # NetworkLatency is a singleton
     def __new__(cls):
         if not hasattr(cls, 'instance'):
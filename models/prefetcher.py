@@ -0,0 +1,87 @@
+from typing import Dict, List
+
+from models.provider import Provider
+from shared.sketches import CountMinSketch
+
+# the largest count of the prefetcher sketch, one byte counters
+PREFETCHER_MAX_COUNT = 255
+
+
+class SketchPrefetcher:
+    """
+    Predicts the providers a cache worker is going to be asked for from its own recent traffic, instead of reading
+    the future requests as the oracle caching orders do.
+
+    Every request is counted in a Count-Min Sketch, and the providers with the highest estimates are kept as heavy
+    hitter candidates, at most 4 x top_k of them: a provider replaces the candidate with the lowest estimate when its
+    estimate is higher. After sample_size records the sketch and the candidate estimates are halved, so the memory is
+    fixed and old popularity fades. Once per interval the top_k candidates are the providers to prefetch.
+
+    Attributes
+    ----------
+    sketch : CountMinSketch
+        The frequency of the requested providers.
+    top_k : int
+        The number of providers prefetched each interval.
+    interval : int
+        The time in ms between two prefetches.
+    sample_size : int
+        The number of records between two agings.
+    samples : int
+        The number of records since the last aging (halved on aging).
+    candidates : Dict[str, List]
+        provider id -> [estimate, provider] of the heavy hitter candidates.
+    """
+
+    def __init__(self, top_k: int, interval: int, width: int = 4096, sample_size: int = None):
+        self.sketch = CountMinSketch(width, max_count=PREFETCHER_MAX_COUNT)
+        self.top_k = top_k
+        self.interval = interval
+        self.sample_size = 10 * width if sample_size is None else sample_size
+        self.samples = 0
+        self.candidates: Dict[str, List] = {}
+        self._capacity = 4 * top_k
+        self._next_prefetch_time = None
+
+    def record(self, provider: Provider):
+        """
+        Records a request for the provider.
+        """
+        self.sketch.increment(provider.id)
+        estimate = self.sketch.estimate(provider.id)
+        candidate = self.candidates.get(provider.id)
+        if candidate is not None:
+            candidate[0] = estimate
+        elif len(self.candidates) < self._capacity:
+            self.candidates[provider.id] = [estimate, provider]
+        else:
+            least_popular = min(self.candidates, key=lambda provider_id: self.candidates[provider_id][0])
+            if estimate > self.candidates[least_popular][0]:
+                del self.candidates[least_popular]
+                self.candidates[provider.id] = [estimate, provider]
+        self.samples += 1
+        if self.samples >= self.sample_size:
+            self.sketch.halve()
+            for candidate in self.candidates.values():
+                candidate[0] >>= 1
+            self.samples //= 2
+
+    def top_providers(self) -> List[Provider]:
+        """
+        Returns the top_k candidates, the most requested first.
+        """
+        ranked = sorted(self.candidates.values(), key=lambda candidate: candidate[0], reverse=True)
+        return [provider for _, provider in ranked[:self.top_k]]
+
+    def due(self, current_time: int) -> bool:
+        """
+        Returns True at the first call of each interval, when the providers are to be prefetched. The first interval
+        starts at the first call, so there is some traffic to learn from.
+        """
+        if self._next_prefetch_time is None:
+            self._next_prefetch_time = current_time + self.interval
+            return False
+        if current_time < self._next_prefetch_time:
+            return False
+        self._next_prefetch_time = current_time + self.interval
+        return True
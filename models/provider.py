@@ -1,20 +1,25 @@
-from models.bytes_and_time import bytes_and_time
+from models.bytes_and_time import get_bytes_and_time
 from models.enums.provider_type import ProviderType
 from shared.RandomGenerator import regular_random
 import string
 import os
 
-from parameters import CLOUD_TRACE_PATH, PROVIDER_DISTRIBUTION
+from parameters import SimulationConfig, default_config
 
 class Provider:
     def __init__(
-            self, index: int, provider_type: ProviderType = None, provider_distribution=PROVIDER_DISTRIBUTION,
-            path=CLOUD_TRACE_PATH):
+            self, index: int, provider_type: ProviderType = None, provider_distribution=None,
+            path=None, config: SimulationConfig = None, id: str = None, network_trace: str = None):
+        """
+        Creates a provider with a random id, cloud trace and type, unless they are given (e.g. by a saved scenario).
+        """
+        config = default_config() if config is None else config
         self.index = index
-        self.path = path
-        self.id = self.generate_random_string()
-        self.provider_distribution = provider_distribution
-        self.network_trace = self.assign_random_cloud_trace()
+        self.path = config.cloud_trace_path if path is None else path
+        self.bytes_and_time = get_bytes_and_time(config.path_bytes, config.path_time)
+        self.id = self.generate_random_string() if id is None else id
+        self.provider_distribution = config.provider_distribution if provider_distribution is None else provider_distribution
+        self.network_trace = self.assign_random_cloud_trace() if network_trace is None else network_trace
         self.number_of_requests = 0
         self.provider_type = provider_type if provider_type != None else self.choose_random_provider_type()
 
@@ -74,10 +79,10 @@ class Provider:
         return ''.join(regular_random.choice(letters) for _ in range(length))
 
     def get_latency(self):
-        return bytes_and_time.get_time(self.provider_type)
+        return self.bytes_and_time.get_time(self.provider_type)
 
     def get_bytes(self):
-        return bytes_and_time.get_bytes(self.provider_type)
+        return self.bytes_and_time.get_bytes(self.provider_type)
 
     def get_latency_and_bytes(self):
         self.number_of_requests += 1
@@ -0,0 +1,86 @@
+from typing import Optional
+
+from models.replacement_policies.replacement_policy import GhostList, ReplacementPolicy, ResourceQueue
+from models.resource import Resource
+
+
+class ARCPolicy(ReplacementPolicy):
+    """
+    Adaptive Replacement Cache (Megiddo and Modha, 2003), with every list measured in bytes.
+
+    T1 holds the resources not retrieved since they were stored, T2 the ones retrieved at least once; both are LRU
+    ordered. The ghost lists B1 and B2 remember the providers recently evicted from T1 and T2. Storing a provider
+    remembered in B1 (B2) grows (shrinks) the byte target of T1, so the split between recency and frequency adapts
+    to the workload, and the resource goes straight to T2.
+    """
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        self.target_t1_bytes = 0
+        self._t1 = ResourceQueue()
+        self._t2 = ResourceQueue()
+        self._b1 = GhostList()
+        self._b2 = GhostList()
+        # the incoming resource the target has already been adapted to
+        self._adapted_to: Optional[Resource] = None
+
+    def add(self, resource: Resource):
+        self._adapt(resource)
+        self._adapted_to = None
+        if self._b1.pop(resource.provider_id) is not None or self._b2.pop(resource.provider_id) is not None:
+            self._t2.add(resource)
+        else:
+            self._t1.add(resource)
+        # T1 + B1 cannot exceed the cache size, the whole directory cannot exceed twice the cache size
+        self._b1.trim(self.max_size_bytes - self._t1.bytes)
+        self._b2.trim(2 * self.max_size_bytes - self._t1.bytes - self._t2.bytes - self._b1.bytes)
+
+    def touch(self, resource: Resource):
+        if resource in self._t1:
+            self._t1.remove(resource)
+            self._t2.add(resource)
+        else:
+            self._t2.move_to_end(resource)
+
+    def remove(self, resource: Resource):
+        if resource in self._t1:
+            self._t1.remove(resource)
+        else:
+            self._t2.remove(resource)
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        self._adapt(incoming)
+        if len(self._t1) == 0 and len(self._t2) == 0:
+            return None
+        if self._evicts_from_t1(incoming):
+            resource = self._t1.pop_oldest()
+            self._b1.add(resource)
+        else:
+            resource = self._t2.pop_oldest()
+            self._b2.add(resource)
+        return resource
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._t1) == 0 and len(self._t2) == 0:
+            return None
+        return self._t1.oldest() if self._evicts_from_t1(incoming) else self._t2.oldest()
+
+    def _evicts_from_t1(self, incoming: Resource) -> bool:
+        t1_over_target = self._t1.bytes > self.target_t1_bytes or (
+            incoming.provider_id in self._b2 and self._t1.bytes == self.target_t1_bytes)
+        return len(self._t1) > 0 and (t1_over_target or len(self._t2) == 0)
+
+    def _adapt(self, incoming: Resource):
+        """
+        Moves the T1 target towards the ghost list that remembers the incoming provider.
+        It is applied once per stored resource, even if several evictions are needed to make room for it.
+        """
+        if self._adapted_to is incoming:
+            return
+        self._adapted_to = incoming
+        if incoming.provider_id in self._b1:
+            delta = max(1, self._b2.bytes / max(self._b1.bytes, 1)) * incoming.size
+            self.target_t1_bytes = min(self.max_size_bytes, self.target_t1_bytes + delta)
+        elif incoming.provider_id in self._b2:
+            delta = max(1, self._b1.bytes / max(self._b2.bytes, 1)) * incoming.size
+            self.target_t1_bytes = max(0, self.target_t1_bytes - delta)
@@ -0,0 +1,136 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from models.resource import Resource
+
+
+class FrequencyBucket:
+    """
+    The resources sharing the same frequency, ordered by (storage_time, storage order).
+
+    Removed resources are discarded lazily from the heap, which is compacted once stale entries
+    outnumber the live ones.
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[Tuple[int, int], Resource]] = []
+        self.live: Dict[Resource, Tuple[int, int]] = {}
+
+    def __len__(self):
+        return len(self.live)
+
+    def push(self, resource: Resource, key: Tuple[int, int]):
+        self.live[resource] = key
+        heapq.heappush(self.heap, (key, resource))
+
+    def discard(self, resource: Resource):
+        del self.live[resource]
+        if len(self.heap) > 2 * len(self.live) + 16:
+            self.heap = [(key, live_resource) for live_resource, key in self.live.items()]
+            heapq.heapify(self.heap)
+
+    def first(self) -> Resource:
+        while True:
+            key, resource = self.heap[0]
+            if self.live.get(resource) == key:
+                return resource
+            heapq.heappop(self.heap)
+
+
+class FrequencyBuckets:
+    """
+    Least Frequently Used bookkeeping for a cache.
+
+    Resources are grouped in buckets by frequency and, inside a bucket, ordered by storage time
+    (ties broken by storage order). The LFU victim is the first resource of the lowest frequency bucket,
+    so neither eviction nor a frequency bump needs to scan the cache.
+
+    The frequencies of the non-empty buckets are linked in ascending order, the lowest one is the head: a new
+    resource (frequency 0) goes in the head bucket or before it, a bumped one in the bucket right after its own,
+    and an emptied bucket is unlinked, so the lowest frequency is always known without a scan.
+
+    Methods
+    -------
+    add(resource: Resource) -> None:
+        Starts tracking a stored resource with its current frequency.
+    touch(resource: Resource) -> None:
+        Moves a resource to the bucket of its (already incremented) frequency.
+    remove(resource: Resource) -> None:
+        Stops tracking a resource.
+    victim() -> Resource:
+        Returns the least frequently used resource, the oldest stored one on ties.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, FrequencyBucket] = {}
+        # frequency of a bucket -> frequency of the next and of the previous non-empty bucket, None at the ends
+        self._next: Dict[int, Optional[int]] = {}
+        self._previous: Dict[int, Optional[int]] = {}
+        # resource -> (tracked frequency, ordering key)
+        self._entries: Dict[Resource, Tuple[int, Tuple[int, int]]] = {}
+        self._min_frequency: Optional[int] = None
+        self._stored_resources = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, resource: Resource):
+        key = (resource.storage_time, self._stored_resources)
+        self._stored_resources += 1
+        self._push(resource, resource.frequency, key, None)
+
+    def touch(self, resource: Resource):
+        frequency, key = self._entries[resource]
+        # the new bucket follows the current one, which is still linked
+        self._push(resource, resource.frequency, key, frequency)
+        self._discard(resource, frequency)
+
+    def remove(self, resource: Resource):
+        frequency, _ = self._entries.pop(resource)
+        self._discard(resource, frequency)
+
+    def victim(self) -> Resource:
+        return self._buckets[self._min_frequency].first()
+
+    def _push(self, resource: Resource, frequency: int, key: Tuple[int, int], after: Optional[int]):
+        """
+        Puts a resource in the bucket of its frequency, linking the bucket when new, searched from the bucket of
+        frequency after (from the lowest one if None): one step for a new resource or a frequency bump.
+        """
+        self._entries[resource] = (frequency, key)
+        bucket = self._buckets.get(frequency)
+        if bucket is None:
+            bucket = self._buckets[frequency] = FrequencyBucket()
+            previous = after if after is not None and after < frequency else None
+            following = self._min_frequency if previous is None else self._next[previous]
+            while following is not None and following < frequency:
+                previous, following = following, self._next[following]
+            self._link(frequency, previous, following)
+        bucket.push(resource, key)
+
+    def _discard(self, resource: Resource, frequency: int):
+        bucket = self._buckets[frequency]
+        bucket.discard(resource)
+        if len(bucket) == 0:
+            del self._buckets[frequency]
+            self._unlink(frequency)
+
+    def _link(self, frequency: int, previous: Optional[int], following: Optional[int]):
+        self._previous[frequency] = previous
+        self._next[frequency] = following
+        if previous is None:
+            self._min_frequency = frequency
+        else:
+            self._next[previous] = frequency
+        if following is not None:
+            self._previous[following] = frequency
+
+    def _unlink(self, frequency: int):
+        previous = self._previous.pop(frequency)
+        following = self._next.pop(frequency)
+        if previous is None:
+            self._min_frequency = following
+        else:
+            self._next[previous] = following
+        if following is not None:
+            self._previous[following] = previous
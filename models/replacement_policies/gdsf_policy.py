@@ -0,0 +1,75 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from models.enums.gdsf_cost import GDSFCost
+from models.replacement_policies.replacement_policy import ReplacementPolicy
+from models.resource import Resource
+
+
+class GDSFPolicy(ReplacementPolicy):
+    """
+    GreedyDual-Size-Frequency (Cherkasova, 1998): evicts the resource with the lowest priority
+    H = L + frequency * cost / size, where L is an inflation clock set to the priority of the last evicted resource.
+
+    Small, popular and expensive resources are kept, so one huge resource cannot flush many small hot ones, and the
+    clock lets resources that were popular long ago age out. The cost is the provider latency (time-taken), to
+    optimize latency, or the resource bytes, to optimize the backhaul bytes.
+    """
+
+    def __init__(self, max_size_bytes: int, cost: GDSFCost = GDSFCost.TIME_TAKEN):
+        super().__init__(max_size_bytes)
+        self.cost = cost
+        self.inflation = 0
+        # (priority, storage order, resource), outdated priorities are skipped when popped
+        self._priorities: List[Tuple[float, int, Resource]] = []
+        # resource -> its current (priority, storage order)
+        self._entries: Dict[Resource, Tuple[float, int]] = {}
+        self._stored_resources = 0
+
+    def add(self, resource: Resource):
+        self._push(resource, self._stored_resources)
+        self._stored_resources += 1
+
+    def touch(self, resource: Resource):
+        _, order = self._entries[resource]
+        self._push(resource, order)
+
+    def remove(self, resource: Resource):
+        del self._entries[resource]
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        while len(self._priorities) > 0:
+            priority, order, resource = heapq.heappop(self._priorities)
+            if self._entries.get(resource) == (priority, order):
+                del self._entries[resource]
+                self.inflation = priority
+                return resource
+        return None
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        while len(self._priorities) > 0:
+            priority, order, resource = self._priorities[0]
+            if self._entries.get(resource) == (priority, order):
+                return resource
+            heapq.heappop(self._priorities)
+        return None
+
+    def get_priority(self, resource: Resource) -> float:
+        """
+        Returns the GDSF priority of the resource with the current inflation clock.
+        The frequency counts the store as a reference, the size is at least one byte.
+        """
+        if self.cost == GDSFCost.BYTES:
+            cost = resource.size
+        else:
+            cost = 1 if resource.application_latency is None else resource.application_latency
+        return self.inflation + (resource.frequency + 1) * cost / max(resource.size, 1)
+
+    def _push(self, resource: Resource, order: int):
+        priority = self.get_priority(resource)
+        self._entries[resource] = (priority, order)
+        heapq.heappush(self._priorities, (priority, order, resource))
+        # drop outdated priorities once they outnumber the stored resources
+        if len(self._priorities) > 2 * len(self._entries) + 16:
+            self._priorities = [(priority, order, resource) for resource, (priority, order) in self._entries.items()]
+            heapq.heapify(self._priorities)
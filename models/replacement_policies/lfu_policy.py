@@ -0,0 +1,37 @@
+from typing import Optional
+
+from models.replacement_policies.frequency_buckets import FrequencyBuckets
+from models.replacement_policies.replacement_policy import ReplacementPolicy
+from models.resource import Resource
+
+
+class LFUPolicy(ReplacementPolicy):
+    """
+    Least Frequently Used: evicts the least retrieved resource, the one stored first on ties.
+    Resources are kept in frequency buckets (see FrequencyBuckets), so no operation scans the cache.
+    """
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        self._frequency_buckets = FrequencyBuckets()
+
+    def add(self, resource: Resource):
+        self._frequency_buckets.add(resource)
+
+    def touch(self, resource: Resource):
+        self._frequency_buckets.touch(resource)
+
+    def remove(self, resource: Resource):
+        self._frequency_buckets.remove(resource)
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._frequency_buckets) == 0:
+            return None
+        resource = self._frequency_buckets.victim()
+        self._frequency_buckets.remove(resource)
+        return resource
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._frequency_buckets) == 0:
+            return None
+        return self._frequency_buckets.victim()
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from models.replacement_policies.replacement_policy import ReplacementPolicy, ResourceQueue
+from models.resource import Resource
+
+
+class LIRSPolicy(ReplacementPolicy):
+    """
+    Low Inter-reference Recency Set (Jiang and Zhang, 2002), measured in bytes.
+
+    Resources with a low inter-reference recency (LIR) fill most of the cache and are never evicted while a HIR
+    resource is resident. HIR resources live in a small FIFO queue Q and are the eviction candidates. The recency
+    stack S orders LIR resources, recently seen HIR resources and recently evicted HIR resources (non-resident):
+    a HIR resource retrieved, or a provider stored again, while still in S becomes LIR and the LIR resource at the
+    bottom of S is demoted to Q. The stack is pruned so that its bottom is always a LIR resource.
+    """
+
+    # share of the cache bytes for resident HIR resources
+    hir_fraction = 0.01
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        self.lir_capacity_bytes = (1 - self.hir_fraction) * max_size_bytes
+        # resource -> None, from the bottom (least recent) to the top of the stack
+        self._stack: "OrderedDict[Resource, None]" = OrderedDict()
+        self._lir: Dict[Resource, None] = {}
+        self._lir_bytes = 0
+        self._hir = ResourceQueue()
+        # provider_id -> evicted HIR resource still in the stack, oldest first
+        self._non_resident: "OrderedDict[str, Resource]" = OrderedDict()
+        self._non_resident_bytes = 0
+
+    def add(self, resource: Resource):
+        non_resident = self._non_resident.pop(resource.provider_id, None)
+        if non_resident is not None:
+            self._non_resident_bytes -= non_resident.size
+            del self._stack[non_resident]
+        self._stack[resource] = None
+        if non_resident is not None or self._lir_bytes + resource.size <= self.lir_capacity_bytes:
+            self._make_lir(resource)
+            self._demote_lir_overflow()
+        else:
+            self._hir.add(resource)
+        self._prune()
+
+    def touch(self, resource: Resource):
+        if resource in self._lir:
+            self._stack.move_to_end(resource)
+            self._prune()
+        elif resource in self._stack:
+            self._hir.remove(resource)
+            self._stack.move_to_end(resource)
+            self._make_lir(resource)
+            self._demote_lir_overflow()
+        else:
+            self._stack[resource] = None
+            self._hir.move_to_end(resource)
+
+    def remove(self, resource: Resource):
+        if resource in self._lir:
+            del self._lir[resource]
+            self._lir_bytes -= resource.size
+            del self._stack[resource]
+            self._prune()
+        else:
+            self._hir.remove(resource)
+            self._stack.pop(resource, None)
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._hir) > 0:
+            resource = self._hir.pop_oldest()
+            if resource in self._stack:
+                self._remember(resource)
+            return resource
+        if len(self._lir) > 0:
+            # only LIR resources are resident, the least recent one goes
+            resource = next(iter(self._stack))
+            del self._stack[resource]
+            del self._lir[resource]
+            self._lir_bytes -= resource.size
+            self._prune()
+            return resource
+        return None
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._hir) > 0:
+            return self._hir.oldest()
+        if len(self._lir) > 0:
+            return next(iter(self._stack))
+        return None
+
+    def _make_lir(self, resource: Resource):
+        self._lir[resource] = None
+        self._lir_bytes += resource.size
+
+    def _demote_lir_overflow(self):
+        """
+        Moves the LIR resources at the bottom of the stack to Q until the LIR set fits its bytes.
+        """
+        while self._lir_bytes > self.lir_capacity_bytes and len(self._lir) > 0:
+            self._prune()
+            resource = next(iter(self._stack))
+            del self._stack[resource]
+            del self._lir[resource]
+            self._lir_bytes -= resource.size
+            self._hir.add(resource)
+        self._prune()
+
+    def _prune(self):
+        """
+        Removes the HIR entries at the bottom of the stack, resident HIR resources stay in Q.
+        """
+        while len(self._stack) > 0:
+            resource = next(iter(self._stack))
+            if resource in self._lir:
+                return
+            del self._stack[resource]
+            if self._non_resident.get(resource.provider_id) is resource:
+                del self._non_resident[resource.provider_id]
+                self._non_resident_bytes -= resource.size
+
+    def _remember(self, resource: Resource):
+        """
+        Keeps an evicted HIR resource in the stack as non-resident, the history is bounded to the cache size.
+        """
+        previous = self._non_resident.pop(resource.provider_id, None)
+        if previous is not None:
+            self._non_resident_bytes -= previous.size
+            del self._stack[previous]
+        self._non_resident[resource.provider_id] = resource
+        self._non_resident_bytes += resource.size
+        while self._non_resident_bytes > self.max_size_bytes:
+            _, oldest = self._non_resident.popitem(last=False)
+            self._non_resident_bytes -= oldest.size
+            del self._stack[oldest]
@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from typing import Optional
+
+from models.replacement_policies.replacement_policy import ReplacementPolicy
+from models.resource import Resource
+
+
+class LRUPolicy(ReplacementPolicy):
+    """
+    Least Recently Used: evicts the resource retrieved, or stored, the longest time ago.
+    Every operation is O(1) on a recency-ordered dictionary.
+    """
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        # resource -> None, ordered from least to most recently used
+        self._recency: "OrderedDict[Resource, None]" = OrderedDict()
+
+    def add(self, resource: Resource):
+        self._recency[resource] = None
+
+    def touch(self, resource: Resource):
+        self._recency.move_to_end(resource)
+
+    def remove(self, resource: Resource):
+        del self._recency[resource]
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._recency) == 0:
+            return None
+        resource, _ = self._recency.popitem(last=False)
+        return resource
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        if len(self._recency) == 0:
+            return None
+        return next(iter(self._recency))
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from typing import Optional
+
+from models.resource import Resource
+
+
+class ReplacementPolicy:
+    """
+    Base class of the cache replacement policies.
+
+    A Cache notifies its policy of every resource it stores, retrieves or drops, and asks the policy for a victim
+    whenever a new resource does not fit. Policies only decide the eviction order: the Cache keeps the provider index,
+    the expirations and the byte count.
+
+    Methods
+    -------
+    add(resource: Resource) -> None:
+        A resource has been stored in the cache.
+    touch(resource: Resource) -> None:
+        A stored resource has been retrieved, its frequency is already incremented.
+    remove(resource: Resource) -> None:
+        A stored resource has left the cache without being evicted (e.g. it expired).
+    evict(incoming: Resource) -> Optional[Resource]:
+        Chooses, and stops tracking, the resource to evict to make room for the incoming one.
+        Returns None if there is nothing left to evict.
+    victim(incoming: Resource) -> Optional[Resource]:
+        Returns the resource evict would choose now, without evicting it (e.g. for admission filters).
+    """
+
+    def __init__(self, max_size_bytes: int):
+        self.max_size_bytes = max_size_bytes
+
+    def add(self, resource: Resource):
+        raise NotImplementedError
+
+    def touch(self, resource: Resource):
+        raise NotImplementedError
+
+    def remove(self, resource: Resource):
+        raise NotImplementedError
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        raise NotImplementedError
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        raise NotImplementedError
+
+
+class ResourceQueue:
+    """
+    Resident resources in insertion order (oldest first), with their total size in bytes.
+    """
+
+    def __init__(self):
+        self._resources: "OrderedDict[Resource, None]" = OrderedDict()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._resources)
+
+    def __contains__(self, resource: Resource):
+        return resource in self._resources
+
+    def add(self, resource: Resource):
+        self._resources[resource] = None
+        self.bytes += resource.size
+
+    def remove(self, resource: Resource):
+        del self._resources[resource]
+        self.bytes -= resource.size
+
+    def move_to_end(self, resource: Resource):
+        self._resources.move_to_end(resource)
+
+    def oldest(self) -> Resource:
+        return next(iter(self._resources))
+
+    def pop_oldest(self) -> Resource:
+        resource, _ = self._resources.popitem(last=False)
+        self.bytes -= resource.size
+        return resource
+
+
+class GhostList:
+    """
+    Providers of recently evicted resources in eviction order (oldest first), with the size of the evicted resource.
+    It keeps no resource, only the history used by the adaptive policies.
+    """
+
+    def __init__(self):
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __contains__(self, provider_id: str):
+        return provider_id in self._sizes
+
+    def add(self, resource: Resource):
+        self.pop(resource.provider_id)
+        self._sizes[resource.provider_id] = resource.size
+        self.bytes += resource.size
+
+    def pop(self, provider_id: str) -> Optional[int]:
+        size = self._sizes.pop(provider_id, None)
+        if size is not None:
+            self.bytes -= size
+        return size
+
+    def trim(self, max_bytes: float):
+        """
+        Forgets the oldest providers until the list is within max_bytes.
+        """
+        while len(self._sizes) > 0 and self.bytes > max_bytes:
+            _, size = self._sizes.popitem(last=False)
+            self.bytes -= size
@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+
+from models.replacement_policies.replacement_policy import GhostList, ReplacementPolicy, ResourceQueue
+from models.resource import Resource
+
+
+class S3FIFOPolicy(ReplacementPolicy):
+    """
+    S3-FIFO (Yang et al., 2023): a small FIFO queue S, a main FIFO queue M and a ghost FIFO queue G.
+
+    New resources enter S. When S is evicted, the resources retrieved while in S move to M, the others leave the cache
+    and their provider is remembered in G; a provider stored again while remembered in G enters M directly. M is
+    evicted with reinsertion: a resource retrieved since its last pass gets another round. Only FIFO operations are
+    needed, and one-hit wonders leave the cache quickly.
+    """
+
+    # share of the cache bytes for S, M takes the rest and G remembers as many bytes as M holds
+    small_fraction = 0.1
+    max_frequency = 3
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        self._small = ResourceQueue()
+        self._main = ResourceQueue()
+        self._ghost = GhostList()
+        self._frequency: Dict[Resource, int] = {}
+
+    def add(self, resource: Resource):
+        self._frequency[resource] = 0
+        if self._ghost.pop(resource.provider_id) is not None:
+            self._main.add(resource)
+        else:
+            self._small.add(resource)
+
+    def touch(self, resource: Resource):
+        self._frequency[resource] = min(self._frequency[resource] + 1, self.max_frequency)
+
+    def remove(self, resource: Resource):
+        del self._frequency[resource]
+        if resource in self._small:
+            self._small.remove(resource)
+        else:
+            self._main.remove(resource)
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        while len(self._small) > 0 or len(self._main) > 0:
+            if len(self._small) > 0 and (
+                    self._small.bytes >= self.small_fraction * self.max_size_bytes or len(self._main) == 0):
+                resource = self._small.pop_oldest()
+                if self._frequency[resource] > 0:
+                    self._main.add(resource)
+                    continue
+                self._ghost.add(resource)
+                self._ghost.trim((1 - self.small_fraction) * self.max_size_bytes)
+            else:
+                resource = self._main.pop_oldest()
+                if self._frequency[resource] > 0:
+                    self._frequency[resource] -= 1
+                    self._main.add(resource)
+                    continue
+            del self._frequency[resource]
+            return resource
+        return None
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        # the head of the queue evict starts from, reinsertions may make evict go further
+        if len(self._small) > 0 and (
+                self._small.bytes >= self.small_fraction * self.max_size_bytes or len(self._main) == 0):
+            return self._small.oldest()
+        if len(self._main) > 0:
+            return self._main.oldest()
+        return None
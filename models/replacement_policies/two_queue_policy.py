@@ -0,0 +1,62 @@
+from typing import Optional
+
+from models.replacement_policies.replacement_policy import GhostList, ReplacementPolicy, ResourceQueue
+from models.resource import Resource
+
+
+class TwoQueuePolicy(ReplacementPolicy):
+    """
+    2Q (Johnson and Shasha, 1994), full version with queues measured in bytes.
+
+    New resources enter the A1in FIFO. When they leave it their provider is remembered in the A1out ghost FIFO, and
+    only a provider stored again while remembered there enters the Am LRU queue. Resources requested in a single burst
+    (e.g. a scan over the Zipf tail) therefore never displace the frequently used ones.
+    """
+
+    # share of the cache bytes for A1in and for the providers remembered by A1out
+    in_fraction = 0.25
+    out_fraction = 0.5
+
+    def __init__(self, max_size_bytes: int):
+        super().__init__(max_size_bytes)
+        self._a1_in = ResourceQueue()
+        self._a1_out = GhostList()
+        self._am = ResourceQueue()
+
+    def add(self, resource: Resource):
+        if self._a1_out.pop(resource.provider_id) is not None:
+            self._am.add(resource)
+        else:
+            self._a1_in.add(resource)
+
+    def touch(self, resource: Resource):
+        # retrievals while in A1in are correlated references and are not counted
+        if resource in self._am:
+            self._am.move_to_end(resource)
+
+    def remove(self, resource: Resource):
+        if resource in self._am:
+            self._am.remove(resource)
+        else:
+            self._a1_in.remove(resource)
+
+    def evict(self, incoming: Resource) -> Optional[Resource]:
+        if self._evicts_from_a1_in():
+            resource = self._a1_in.pop_oldest()
+            self._a1_out.add(resource)
+            self._a1_out.trim(self.out_fraction * self.max_size_bytes)
+            return resource
+        if len(self._am) > 0:
+            return self._am.pop_oldest()
+        return None
+
+    def victim(self, incoming: Resource) -> Optional[Resource]:
+        if self._evicts_from_a1_in():
+            return self._a1_in.oldest()
+        if len(self._am) > 0:
+            return self._am.oldest()
+        return None
+
+    def _evicts_from_a1_in(self) -> bool:
+        return len(self._a1_in) > 0 and (
+            self._a1_in.bytes > self.in_fraction * self.max_size_bytes or len(self._am) == 0)
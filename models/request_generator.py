@@ -1,32 +1,21 @@
-from shared.RandomGenerator import regular_random, np_random
+import numpy as np
+
+from shared.RandomGenerator import random_generator, regular_random, np_random
 import math
 import hashlib
-import sys
 
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+from models.area import Area, SubareaGrid
 from models.enums.provider_type import ProviderType
 from models.enums.user_category import UserCategory
 from models.provider import Provider
 from models.user import User
 from models.request import Request
 
-from parameters import AREA_DIMENSIONS, EXPERIMENT_DURATION, NUMBER_OF_USER_TYPES, NUMBER_OF_USERS, POPULARITY_DISTRIBUTION, RATE_OF_EVENT, SUBAREAS
-
-# TODO: move Area class to a dedicated class file
-
-
-class Area:
-    def __init__(self, id,  x1, y1, x2, y2):
-        self.id = id
-        self.x1 = x1
-        self.y1 = y1
-        self.x2 = x2
-        self.y2 = y2
-        self.popularity: List[Provider] = []
-
-    def __str__(self):
-        return f"Area #{self.id} - X: ({self.x1}, {self.x2}) Y: ({self.y1}, {self.y2}) "
+from parameters import SimulationConfig, default_config
 
+# number of requests of a user drawn at once by the batched generator
+REQUEST_BATCH_SIZE = 256
 
 class RequestGenerator:
     """
@@ -36,21 +25,36 @@ class RequestGenerator:
     def __init__(
             self, users: List[User],
             providers: List[Provider],
-            popularity_distribution=POPULARITY_DISTRIBUTION, experiment_duration=EXPERIMENT_DURATION, number_of_users = NUMBER_OF_USERS,number_of_types=NUMBER_OF_USER_TYPES):
+            popularity_distribution=None, experiment_duration=None, number_of_users=None, number_of_types=None,
+            streaming=None, batched=None, config: SimulationConfig = None):
+        config = default_config() if config is None else config
+        popularity_distribution = config.popularity_distribution if popularity_distribution is None else popularity_distribution
+        experiment_duration = config.experiment_duration if experiment_duration is None else experiment_duration
+        number_of_users = config.number_of_users if number_of_users is None else number_of_users
+        number_of_types = config.number_of_user_types if number_of_types is None else number_of_types
+        streaming = config.streaming_queue if streaming is None else streaming
+        self.batched = config.batched_requests if batched is None else batched
+        self.rate_of_event = config.rate_of_event
+        self.area_dimensions = config.area_dimensions
+        self.subareas = config.subareas
         self.providers = providers
         self.experiment_duration = experiment_duration
         self.users = users
         self.popularity_distribution = popularity_distribution
         self.number_of_types = number_of_types
         self.number_of_users = number_of_users
+        # the popularity rankings are int32 arrays of provider indexes, only built for the categories of the users
+        categories = {user.category for user in users}
         self.popularity = {
-            UserCategory.TYPE.value: self.generate_popularity_per_type(),
-            UserCategory.LOCATION.value: self.generate_popularity_per_location(),
-            UserCategory.ID.value: self.generate_popularity_per_user()
+            UserCategory.TYPE.value: self.generate_popularity_per_type() if UserCategory.TYPE in categories else None,
+            UserCategory.LOCATION.value: self.generate_popularity_per_location() if UserCategory.LOCATION in categories else None,
+            UserCategory.ID.value: self.generate_popularity_per_user() if UserCategory.ID in categories else None
         }
+        self.provider_cdf = self.truncated_zipf_cdf() if self.batched else None
 
-
-        self.generate_requests()
+        # when streaming, the requests are drawn lazily through request_streams instead of stored in the users
+        if not streaming:
+            self.generate_requests()
 
     def generate_requests(self):
         """
@@ -59,102 +63,205 @@ class RequestGenerator:
         The popularity of each provider is given by a Zipf distribution  with popularity given by POPULARITY_DISTRIBUTION and truncate according to the NUMBER OF PROVIDER PER TYPE
         """
         for user in self.users:
-            current_time = 0
-            while current_time <= self.experiment_duration:
-                next_request_in_ms = self.next_event_time()
-                next_request_execution_time = next_request_in_ms + current_time
-                if next_request_execution_time >= self.experiment_duration:
-                    break
-                current_time += (next_request_in_ms)
-                provider = self.choose_provider_id(user, current_time)
-                new_request = Request(
-                    next_request_execution_time, provider)
-                user.requests.append(new_request)
-
-    def next_event_time(self, rate: float = RATE_OF_EVENT):
+            if self.batched:
+                user.requests.extend(self.batched_user_requests(user, self.user_generator(user)))
+            else:
+                user.requests.extend(self.user_requests(user))
+
+    def user_requests(self, user: User, generator=None) -> Iterator[Request]:
+        """
+        Yields the requests of a user for the EXPERIMENT_DURATION, in time order.
+
+        Args:
+            user (User): The user making the requests.
+            generator: The random generator of the inter-arrival times and of the providers,
+                the shared regular_random and np_random if None.
+
+        Returns:
+            Iterator[Request]: The requests of the user.
+        """
+        current_time = 0
+        while current_time <= self.experiment_duration:
+            next_request_in_ms = self.next_event_time(generator=generator)
+            next_request_execution_time = next_request_in_ms + current_time
+            if next_request_execution_time >= self.experiment_duration:
+                break
+            current_time += (next_request_in_ms)
+            provider = self.choose_provider_id(user, current_time, generator)
+            new_request = Request(
+                next_request_execution_time, provider)
+            yield new_request
+
+    def batched_user_requests(self, user: User, generator: np.random.Generator) -> Iterator[Request]:
+        """
+        Yields the requests of a user for the EXPERIMENT_DURATION, in time order, drawn REQUEST_BATCH_SIZE at a time:
+        the arrival times as the cumulative sum of a batch of inter-arrival times, the providers from the truncated
+        Zipf CDF.
+
+        Args:
+            user (User): The user making the requests.
+            generator (np.random.Generator): The random generator of the user.
+
+        Returns:
+            Iterator[Request]: The requests of the user.
+        """
+        current_time = 0
+        while True:
+            # the inter-arrival times of at least 1 ms of next_event_time: by memorylessness 1 + floor(Exp(rate))
+            inter_arrival_times = 1 + np.floor(
+                generator.exponential(1 / self.rate_of_event, REQUEST_BATCH_SIZE)).astype(np.int64)
+            times = current_time + np.cumsum(inter_arrival_times)
+            times = times[times < self.experiment_duration]
+            providers = self.providers_for(user, times, self.sample_provider_indexes(len(times), generator))
+            for request_time, provider in zip(times.tolist(), providers):
+                yield Request(request_time, provider)
+            if len(times) < REQUEST_BATCH_SIZE:
+                return
+            current_time = int(times[-1])
+
+    def user_generator(self, user: User) -> np.random.Generator:
+        """
+        Returns the random generator of a user, seeded with the replication seed and the user id.
+        """
+        return np.random.default_rng([random_generator.seed, user.id])
+
+    def request_streams(self) -> List[Iterator[Request]]:
+        """
+        Returns a lazy request iterator per user, in the order of the users.
+        Each user draws from its own generator seeded with the replication seed and the user id, so the streams can
+        be consumed in any interleaving and every call replays the same requests.
+
+        Returns:
+            List[Iterator[Request]]: The time-ordered requests of each user.
+        """
+        if self.batched:
+            return [self.batched_user_requests(user, self.user_generator(user)) for user in self.users]
+        return [self.user_requests(user, self.user_generator(user)) for user in self.users]
+
+    def truncated_zipf_cdf(self) -> np.ndarray:
+        """
+        Returns the CDF of the provider indexes drawn by choose_provider_id: a Zipf distribution with exponent
+        POPULARITY_DISTRIBUTION truncated to the indexes 1 to len(providers) - 1.
+        """
+        weights = np.arange(1, len(self.providers), dtype=np.float64) ** -self.popularity_distribution
+        cdf = np.cumsum(weights)
+        return cdf / cdf[-1]
+
+    def sample_provider_indexes(self, size: int, generator: np.random.Generator) -> np.ndarray:
+        """
+        Draws size provider indexes from the truncated Zipf CDF.
+        """
+        return np.searchsorted(self.provider_cdf, generator.random(size), side="right") + 1
+
+    def providers_for(self, user: User, times: np.ndarray, provider_indexes: np.ndarray) -> List[Provider]:
+        """
+        Returns the providers at the given popularity indexes for the requests of a user made at the given times.
+        """
+        if user.category == UserCategory.TYPE:
+            ranking = self.popularity[UserCategory.TYPE.value][user.type - 1][provider_indexes]
+        elif user.category == UserCategory.ID:
+            ranking = self.popularity[UserCategory.ID.value][user.id][provider_indexes]
+        elif user.category == UserCategory.LOCATION:
+            subareas: SubareaGrid = self.popularity[UserCategory.LOCATION.value]
+            area_ids = subareas.area_ids(user.get_positions_at_times(times))
+            ranking = [subareas[area_id].popularity[index] for area_id, index in zip(
+                area_ids.tolist(), provider_indexes.tolist())]
+        else:
+            print(f"Invalid user category {user.category} - cannot choose provider id")
+            return [None] * len(provider_indexes)
+        return [self.providers[index] for index in np.asarray(ranking).tolist()]
+
+    def next_event_time(self, rate: float = None, generator=None):
         """
         Generates the time of the next event according to an exponential distribution.
 
         Args:
-            rate (float): The average rate of events per unit of time (ms).
+            rate (float): The average rate of events per unit of time (ms), RATE_OF_EVENT if None.
+            generator: The random generator to draw from, regular_random if None.
 
         Returns:
             int: The time of the next event in ms.
         """
+        rate = self.rate_of_event if rate is None else rate
         # Generate a random value from a uniform distribution between 0 and 1
-        u = regular_random.random()
+        u = regular_random.random() if generator is None else generator.random()
 
         # Calculate the time of the next event using the inverse of the cumulative distribution function (CDF) of the exponential distribution
         time = -math.log(1 - u) / rate
         discrete_time = int(time)
         if (discrete_time <= 0):
-            return self.next_event_time(rate)
+            return self.next_event_time(rate, generator)
         return int(time)
 
     # solve time problem = user in s and rest in ms
 
-    def choose_provider_id(self, user: User, request_time: int) -> Provider:
-        provider_index = np_random.zipf(a=self.popularity_distribution)
+    def choose_provider_id(self, user: User, request_time: int, generator=None) -> Provider:
+        provider_index = (np_random if generator is None else generator).zipf(a=self.popularity_distribution)
         if provider_index >= len(self.providers):
-            return self.choose_provider_id(user, request_time)
+            return self.choose_provider_id(user, request_time, generator)
         if user.category == UserCategory.TYPE:
-            return self.popularity[UserCategory.TYPE.value][user.type - 1][provider_index]
+            return self.providers[self.popularity[UserCategory.TYPE.value][user.type - 1][provider_index]]
         elif user.category == UserCategory.ID:
-            return self.popularity[UserCategory.ID.value][user.id][provider_index]
+            return self.providers[self.popularity[UserCategory.ID.value][user.id][provider_index]]
         elif user.category == UserCategory.LOCATION:
             user_location = user.get_position_at_time(request_time)
-            
-            user_subarea = self.find_subarea(user_location, self.popularity[UserCategory.LOCATION.value])
-            if(user_subarea == -1):
-                print("error in user position")
-                print(user_location)
-                sys.exit()
-            return user_subarea.popularity[provider_index]
+            return self.providers[self.location_popularity(user_location)[provider_index]]
         else:
             print(f"Invalid user category {user.category} - cannot choose provider id")
             return
 
+    def location_popularity(self, user_location: Tuple[float, float]) -> np.ndarray:
+        """
+        Returns the provider popularity ranking of the subarea of a user location.
+        """
+        return self.popularity[UserCategory.LOCATION.value].find(user_location).popularity
+
     @staticmethod
     def generate_request_id(provider_id: int, provider_type: ProviderType):
         plain_id = f"{provider_type}/{provider_id}"
         return hashlib.sha256(plain_id.encode())
 
-    def generate_popularity_per_type(self) -> List[List[Provider]]:
-        return [regular_random.sample(self.providers, len(self.providers)) for i in range(self.number_of_types)]
-        
+    def random_ranking(self) -> np.ndarray:
+        """
+        Returns a random popularity ranking of the providers, as the int32 array of their indexes in self.providers.
+        It draws the same random numbers as sampling the providers list, so the rankings do not change.
+        """
+        return np.array(regular_random.sample(range(len(self.providers)), len(self.providers)), dtype=np.int32)
+
+    def generate_rankings(self, number_of_rankings: int) -> np.ndarray:
+        rankings = np.empty((number_of_rankings, len(self.providers)), dtype=np.int32)
+        for i in range(number_of_rankings):
+            rankings[i] = self.random_ranking()
+        return rankings
 
-    def generate_popularity_per_location(self) -> List[Area]:
+    def generate_popularity_per_type(self) -> np.ndarray:
+        return self.generate_rankings(self.number_of_types)
+
+    def generate_popularity_per_location(self) -> SubareaGrid:
         subareas = self.divide_square_area()
         for subarea in subareas:
-            subarea.popularity = regular_random.sample(
-                self.providers, len(self.providers))
+            subarea.popularity = self.random_ranking()
         return subareas
 
-    def generate_popularity_per_user(self) -> List[List[Provider]]:
-        return [regular_random.sample(self.providers, len(self.providers)) for i in range(self.number_of_users)]
+    def generate_popularity_per_user(self) -> np.ndarray:
+        return self.generate_rankings(self.number_of_users)
 
-    def divide_square_area(self, dimensions: int = AREA_DIMENSIONS, portions: int = SUBAREAS) -> List[Area]:
+    def divide_square_area(self, dimensions: int = None, portions: int = None) -> SubareaGrid:
         """
-        Divides a square area of given dimensions into N square portions of equal size.
-        Each portion is assigned an id and its dimensions are returned as a tuple.
+        Divides a square area of given dimensions into N rectangular portions of equal size, as the grid closest to a
+        square (e.g. 4 -> 2 x 2, 5 -> 5 x 1, 6 -> 3 x 2).
+        Each portion is assigned an id, row by row.
 
         Args:
-            dimensions (int): The dimensions of the square area.
-            portions (int): The number of portions to divide the area into.
+            dimensions (int): The dimensions of the square area, AREA_DIMENSIONS if None.
+            portions (int): The number of portions to divide the area into, SUBAREAS if None.
 
         Returns:
-            List[Area]: The list of subareas, where each subarea is a tuple containing an id and its dimensions.
-        """
-        subarea_dimensions = dimensions // int(portions ** 0.5)
-        subareas = []
-        for i in range(portions):
-            row = i // int(portions ** 0.5)
-            col = i % int(portions ** 0.5)
-            x1, y1 = col * subarea_dimensions, row * subarea_dimensions
-            x2, y2 = x1 + subarea_dimensions, y1 + subarea_dimensions
-            subarea = Area(i, x1, y1, x2, y2)
-            subareas.append(subarea)
-        return subareas
+            SubareaGrid: The grid of the subareas, a sequence of Area indexed by id.
+        """
+        dimensions = self.area_dimensions if dimensions is None else dimensions
+        portions = self.subareas if portions is None else portions
+        return SubareaGrid.divide(dimensions, portions)
 
     def find_subarea(self, point: Tuple[int, int], subareas: List[Area]) -> Area:
         """
@@ -162,11 +269,13 @@ class RequestGenerator:
 
         Args:
             point (Tuple[int, int]): The point to find the subarea for.
-            subareas (List[Area]): The list of subareas to search.
+            subareas (List[Area]): The list of subareas to search, a SubareaGrid is looked up by integer division.
 
         Returns:
             int: The id of the subarea that the point belongs to.
         """
+        if isinstance(subareas, SubareaGrid):
+            return subareas.find(point)
         for subarea in subareas:
             if subarea.x1 <= point[0] < subarea.x2 and subarea.y1 <= point[1] < subarea.y2:
                 return subarea
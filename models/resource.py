@@ -1,9 +1,11 @@
 class Resource:
-    def __init__(self, provider_id, size, storage_time=None, expiration_time=None, creation_time=None):
+    def __init__(self, provider_id, size, storage_time=None, expiration_time=None, creation_time=None, application_latency=None):
         self.provider_id = provider_id
         self.size = size
         self.creation_time = creation_time
         self.storage_time = storage_time
         self.expiration_time = expiration_time
+        # time taken by the provider to produce the resource, in ms
+        self.application_latency = application_latency
         self.frequency = 0
         self.last_time_retrieved = None
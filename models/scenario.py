@@ -0,0 +1,240 @@
+import json
+import os
+import random
+from typing import Iterable, Iterator, List
+
+import numpy as np
+
+from models.cache_worker import CacheWorker
+from models.edge_node import EdgeNode
+from models.enums.provider_type import ProviderType
+from models.provider import Provider
+from models.queue_element import QueueElement
+from models.request import Request
+from models.user import User
+from parameters import SimulationConfig
+from shared.RandomGenerator import replication_seed
+from shared.spatial_index import SpatialIndex
+
+# parameters that change the generated scenario, a scenario is only loaded with the same values
+SCENARIO_PARAMETERS = [
+    "experiment_duration", "number_of_edge_nodes", "number_of_users", "user_speed", "area_dimensions", "subareas",
+    "edge_node_min_distance", "user_category_distribution", "user_waypoints", "number_of_user_types",
+    "provider_distribution", "rate_of_event", "number_of_providers", "popularity_distribution", "cloud_trace_path",
+    "streaming_queue", "batched_requests"]
+
+
+def scenario_parameters(config: SimulationConfig, replication: int) -> dict:
+    """
+    Returns the parameters of a config that change the generated scenario of a replication, as JSON values.
+    """
+    parameters = {}
+    for name in SCENARIO_PARAMETERS:
+        value = getattr(config, name)
+        if isinstance(value, dict):
+            value = {key.value: item for key, item in value.items()}
+        parameters[name] = value
+    parameters["seed"] = replication_seed(replication)
+    return parameters
+
+
+def scenario_file(directory: str, replication: int) -> str:
+    """
+    Returns the path of the scenario of a replication in a scenario directory.
+    """
+    return os.path.join(directory, f"replication_{replication}.npz")
+
+
+class Scenario:
+    """
+    A generated replication saved as NumPy columns: the requests (time, user, provider index, position and cache
+    worker index, in generation order, user by user), the edge node positions, the providers, the handovers of each
+    user and the state of the shared random generators after the generation.
+
+    Loading a scenario skips the generation of the users, the providers, the requests and the edge nodes, and the
+    rest of the replication draws the same random numbers, so a loaded run has the same results as the run that saved
+    it.
+
+    Attributes
+    ----------
+    parameters : dict
+        The parameters the scenario was generated with, see scenario_parameters.
+    request_times : np.ndarray
+        The execution time (ms) of each request, int64.
+    request_users : np.ndarray
+        The id of the user of each request, int32.
+    request_providers : np.ndarray
+        The index of the provider of each request, int32.
+    request_positions : np.ndarray
+        The position of the user at each request, shape (n, 2).
+    request_cache_workers : np.ndarray
+        The index of the cache worker serving each request, int32.
+    edge_node_positions : np.ndarray
+        The (x, y) position of each edge node, int64.
+    provider_ids : np.ndarray
+        The id of each provider.
+    provider_traces : np.ndarray
+        The cloud trace of each provider.
+    provider_types : np.ndarray
+        The ProviderType value of each provider.
+    handovers : np.ndarray
+        The number of handovers of each user during the experiment.
+    """
+
+    def __init__(self, parameters: dict, arrays: dict):
+        self.parameters = parameters
+        self.request_times: np.ndarray = arrays["request_times"]
+        self.request_users: np.ndarray = arrays["request_users"]
+        self.request_providers: np.ndarray = arrays["request_providers"]
+        self.request_positions: np.ndarray = arrays["request_positions"]
+        self.request_cache_workers: np.ndarray = arrays["request_cache_workers"]
+        self.edge_node_positions: np.ndarray = arrays["edge_node_positions"]
+        self.provider_ids: np.ndarray = arrays["provider_ids"]
+        self.provider_traces: np.ndarray = arrays["provider_traces"]
+        self.provider_types: np.ndarray = arrays["provider_types"]
+        self.handovers: np.ndarray = arrays["handovers"]
+        self._random_state: np.ndarray = arrays["random_state"]
+        self._np_random_state: np.ndarray = arrays["np_random_state"]
+
+    @classmethod
+    def capture(
+            cls, parameters: dict, users: List[User], user_requests: Iterable[Iterable[Request]],
+            providers: List[Provider], edge_nodes: List[EdgeNode], spatial_index: SpatialIndex,
+            experiment_duration: int) -> "Scenario":
+        """
+        Captures a generated replication, once its edge nodes are placed.
+
+        Parameters:
+        -----------
+        parameters : dict
+            The parameters of the replication, see scenario_parameters.
+        users : List[User]
+            The users of the replication.
+        user_requests : Iterable[Iterable[Request]]
+            The requests of each user, in the order of users.
+        providers : List[Provider]
+            The providers of the replication.
+        edge_nodes : List[EdgeNode]
+            The placed edge nodes of the replication.
+        spatial_index : SpatialIndex
+            The index of the positions of the edge nodes, the requests are served by the nearest one.
+        experiment_duration : int
+            The duration of the experiment (ms), the handovers are counted until then.
+        """
+        columns = {name: [] for name in ["request_times", "request_users", "request_providers",
+                                         "request_positions", "request_cache_workers"]}
+        for user, requests in zip(users, user_requests):
+            requests = list(requests)
+            times = np.array([request.execution_time for request in requests], dtype=np.int64)
+            handover_timeline = user.handover_timeline(spatial_index)
+            columns["request_times"].append(times)
+            columns["request_users"].append(np.full(len(requests), user.id, dtype=np.int32))
+            columns["request_providers"].append(
+                np.array([request.provider.index for request in requests], dtype=np.int32))
+            columns["request_positions"].append(user.get_positions_at_times(times).reshape(-1, 2))
+            columns["request_cache_workers"].append(np.array(
+                [handover_timeline.cache_worker_at(time) for time in times.tolist()], dtype=np.int32))
+        empty = {"request_times": np.int64, "request_users": np.int32, "request_providers": np.int32,
+                 "request_positions": np.float64, "request_cache_workers": np.int32}
+        arrays = {name: np.concatenate(values) if len(values) > 0 else np.zeros(
+            (0, 2) if name == "request_positions" else 0, dtype=empty[name]) for name, values in columns.items()}
+        arrays["edge_node_positions"] = np.array(
+            [edge_node.get_position() for edge_node in edge_nodes], dtype=np.int64).reshape(-1, 2)
+        arrays["provider_ids"] = np.array([provider.id for provider in providers], dtype=str)
+        arrays["provider_traces"] = np.array([provider.network_trace for provider in providers], dtype=str)
+        arrays["provider_types"] = np.array([provider.provider_type.value for provider in providers], dtype=str)
+        arrays["handovers"] = np.array(
+            [user.handover_timeline(spatial_index).handovers(experiment_duration) for user in users], dtype=np.int64)
+        version, internal_state, gauss_next = random.getstate()
+        arrays["random_state"] = np.array(
+            list(internal_state) + [version, np.nan if gauss_next is None else gauss_next], dtype=np.float64)
+        _, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+        arrays["np_random_state"] = np.array(
+            list(keys) + [position, has_gauss, cached_gaussian], dtype=np.float64)
+        return cls(parameters, arrays)
+
+    @classmethod
+    def load(cls, path: str, parameters: dict = None) -> "Scenario":
+        """
+        Loads a saved scenario, checking that it was generated with the given parameters, if any.
+        """
+        with np.load(path, allow_pickle=False) as file:
+            arrays = {name: file[name] for name in file.files}
+        saved_parameters = json.loads(str(arrays.pop("parameters")))
+        if parameters is not None and saved_parameters != parameters:
+            different = sorted(name for name in parameters if saved_parameters.get(name) != parameters[name])
+            raise ValueError(f"the scenario {path} was generated with different parameters: {', '.join(different)}")
+        return cls(saved_parameters, arrays)
+
+    def save(self, path: str):
+        """
+        Saves the scenario as a compressed .npz file, written to a temporary file first so that a concurrent run
+        never reads a partial scenario.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            temporary_path, parameters=np.array(json.dumps(self.parameters, sort_keys=True)),
+            request_times=self.request_times, request_users=self.request_users,
+            request_providers=self.request_providers, request_positions=self.request_positions,
+            request_cache_workers=self.request_cache_workers, edge_node_positions=self.edge_node_positions,
+            provider_ids=self.provider_ids, provider_traces=self.provider_traces, provider_types=self.provider_types,
+            handovers=self.handovers, random_state=self._random_state,
+            np_random_state=self._np_random_state)
+        os.replace(temporary_path, path)
+
+    def providers(self, config: SimulationConfig = None) -> List[Provider]:
+        """
+        Returns the providers of the scenario, without drawing random numbers.
+        """
+        return [Provider(index, ProviderType(provider_type), config=config, id=str(provider_id),
+                         network_trace=str(network_trace))
+                for index, (provider_id, network_trace, provider_type) in enumerate(
+                    zip(self.provider_ids, self.provider_traces, self.provider_types))]
+
+    def edge_nodes(self, config: SimulationConfig = None) -> List[EdgeNode]:
+        """
+        Returns the edge nodes of the scenario, at their saved positions.
+        """
+        edge_nodes = []
+        for i, (x, y) in enumerate(self.edge_node_positions.tolist()):
+            edge_node = EdgeNode(i, config=config)
+            edge_node.set_position(x, y)
+            edge_nodes.append(edge_node)
+        return edge_nodes
+
+    def restore_random_state(self):
+        """
+        Sets the shared random generators to their state after the generation of the scenario.
+        """
+        # the generator states are saved as float64, exact for their 32 bit words
+        random_state = self._random_state
+        gauss_next = None if np.isnan(random_state[-1]) else float(random_state[-1])
+        random.setstate((int(random_state[-2]), tuple(int(value) for value in random_state[:-2]), gauss_next))
+        np_random_state = self._np_random_state
+        np.random.set_state(("MT19937", np_random_state[:-3].astype(np.uint32), int(np_random_state[-3]),
+                             int(np_random_state[-2]), float(np_random_state[-1])))
+
+    def queue_elements(
+            self, providers: List[Provider], cache_workers: List[CacheWorker],
+            time_order: bool = True) -> Iterator[QueueElement]:
+        """
+        Yields a QueueElement for each request of the scenario, the user of a queue element is the user id.
+
+        Parameters:
+        -----------
+        providers : List[Provider]
+            The providers of the scenario.
+        cache_workers : List[CacheWorker]
+            The cache workers of the scenario, in edge node order.
+        time_order : bool
+            Yields the requests in time order, ties in generation order, as the sorted or merged simulation queue.
+            Otherwise in generation order, as the requests are added to the simulation queue.
+        """
+        order = np.argsort(self.request_times, kind="stable") if time_order else np.arange(len(self.request_times))
+        columns = zip(self.request_times[order].tolist(), self.request_users[order].tolist(),
+                      self.request_providers[order].tolist(), self.request_cache_workers[order].tolist())
+        for time, user, provider, cache_worker in columns:
+            yield QueueElement(Request(time, providers[provider]), user, time, cache_workers[cache_worker])
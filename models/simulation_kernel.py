@@ -0,0 +1,145 @@
+import heapq
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from models.cache import Cache
+from models.cache_worker import CacheWorker
+from models.caching_order import CachingOrder
+from models.edge_node import EdgeNode
+from models.enums.event_type import EventType
+from models.event import Event
+from models.queue_element import QueueElement
+from models.request import Request
+
+
+class SimulationKernel:
+    """
+    Discrete-event simulation kernel.
+
+    A single priority queue holds the typed events of the simulation: request arrivals, caching order executions,
+    cooperative order expiries and resource expiries. Each CacheWorker and each Cache has at most one scheduled event,
+    at the time of its next pending work, so a request only touches the components that actually have something to do
+    instead of sweeping every cache worker and every cache.
+
+    The work due before a request is applied when the request arrives, with the request time as current time and in
+    the same order as shared.helper.pass_time (cooperative expiries, then caching orders worker by worker, then
+    resource expiries), so the simulation results do not change.
+
+    Attributes
+    ----------
+    events : List[Event]
+        The priority queue of the scheduled events.
+    cache_workers : List[CacheWorker]
+        The cache workers of the simulation.
+    edge_nodes : List[EdgeNode]
+        The edge nodes of the simulation.
+    """
+
+    def __init__(self, cache_workers: List[CacheWorker], edge_nodes: List[EdgeNode]):
+        self.events: List[Event] = []
+        self.cache_workers = cache_workers
+        self.edge_nodes = edge_nodes
+        self._worker_index: Dict[CacheWorker, int] = {cache_worker: index for index, cache_worker in enumerate(cache_workers)}
+        # (event type, component) -> time of its scheduled event, older events of the component are stale
+        self._scheduled: Dict[Tuple[EventType, object], int] = {}
+        self._sequence = 0
+
+    def run(self, queue_elements: Iterable[QueueElement]) -> Iterator[Tuple[QueueElement, Request]]:
+        """
+        Runs the simulation.
+
+        Parameters:
+        -----------
+        queue_elements : Iterable[QueueElement]
+            The requests of the simulation in ascending time_epoch order. They are consumed one at a time.
+
+        Returns:
+        --------
+        Iterator[Tuple[QueueElement, Request]]
+            Each queue element with its response, in time order.
+        """
+        arrivals = iter(queue_elements)
+        self._schedule_next_arrival(arrivals)
+        for cache_worker in self.cache_workers:
+            self._schedule_cache_worker(cache_worker)
+        for edge_node in self.edge_nodes:
+            self._schedule(EventType.RESOURCE_EXPIRY, edge_node.cache, edge_node.cache.next_expiration_time())
+
+        due_events: List[Event] = []
+        while len(self.events) > 0:
+            event = heapq.heappop(self.events)
+            if event.type != EventType.REQUEST_ARRIVAL:
+                if self._scheduled.get((event.type, event.target)) == event.time:
+                    del self._scheduled[(event.type, event.target)]
+                    due_events.append(event)
+                continue
+            self._apply_due_events(due_events, event.time)
+            due_events = []
+            queue_element: QueueElement = event.target
+            response = queue_element.cache_worker.request_data(queue_element.request, queue_element.time_epoch)
+            cache = queue_element.cache_worker.edge_node.cache
+            if queue_element.cache_worker.prefetcher is not None:
+                # the request may have issued prefetch orders
+                self._schedule_cache_worker(queue_element.cache_worker)
+            self._schedule(EventType.RESOURCE_EXPIRY, cache, cache.next_expiration_time())
+            yield queue_element, response
+            self._schedule_next_arrival(arrivals)
+
+    def add_caching_orders(self, caching_orders_per_cache_worker: List[List[CachingOrder]]):
+        """
+        Adds caching orders to the cache workers, also while the simulation runs, and schedules their execution.
+
+        Parameters:
+        -----------
+        caching_orders_per_cache_worker : List[List[CachingOrder]]
+            The caching orders of each cache worker, in the order of cache_workers.
+        """
+        for cache_worker, orders in zip(self.cache_workers, caching_orders_per_cache_worker):
+            cache_worker.add_caching_orders(orders)
+            self._schedule_cache_worker(cache_worker)
+
+    def _apply_due_events(self, due_events: List[Event], current_time: int):
+        """
+        Applies the events due before a request made at current_time.
+        """
+        cooperative_expiries = [event.target for event in due_events if event.type == EventType.COOPERATIVE_ORDER_EXPIRY]
+        order_executions = [event.target for event in due_events if event.type == EventType.CACHING_ORDER_EXECUTION]
+        caches_to_expire: Dict[Cache, None] = {
+            event.target: None for event in due_events if event.type == EventType.RESOURCE_EXPIRY}
+
+        for cache_worker in cooperative_expiries:
+            cache_worker.remove_expired_cooperative_orders(current_time)
+        for cache_worker in sorted(order_executions, key=lambda x: self._worker_index[x]):
+            cache_worker.execute_pending_orders(current_time)
+            # the stored resources may be already expired
+            caches_to_expire[cache_worker.edge_node.cache] = None
+        for cache_worker in cooperative_expiries + order_executions:
+            self._schedule_cache_worker(cache_worker)
+        for cache in caches_to_expire:
+            cache.epoch_passed(current_time)
+            self._schedule(EventType.RESOURCE_EXPIRY, cache, cache.next_expiration_time())
+
+    def _schedule_cache_worker(self, cache_worker: CacheWorker):
+        self._schedule(EventType.CACHING_ORDER_EXECUTION, cache_worker, cache_worker.next_pending_order_time())
+        self._schedule(
+            EventType.COOPERATIVE_ORDER_EXPIRY, cache_worker, cache_worker.next_cooperative_order_expiration())
+
+    def _schedule_next_arrival(self, arrivals: Iterator[QueueElement]):
+        queue_element = next(arrivals, None)
+        if queue_element is not None:
+            self._push(Event(queue_element.time_epoch, EventType.REQUEST_ARRIVAL, queue_element, self._sequence))
+
+    def _schedule(self, event_type: EventType, component, time):
+        """
+        Schedules the next event of a component, unless an event at the same time or earlier is already scheduled.
+        """
+        if time is None:
+            return
+        scheduled_time = self._scheduled.get((event_type, component))
+        if scheduled_time is not None and scheduled_time <= time:
+            return
+        self._scheduled[(event_type, component)] = time
+        self._push(Event(time, event_type, component, self._sequence))
+
+    def _push(self, event: Event):
+        heapq.heappush(self.events, event)
+        self._sequence += 1
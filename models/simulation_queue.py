@@ -1,4 +1,5 @@
-from typing import List
+import heapq
+from typing import Iterable, Iterator, List
 
 from models.queue_element import QueueElement
 
@@ -22,6 +23,9 @@ class SimulationQueue:
 
     sort_queue() -> None:
         Sorts the queue in ascending order of the time_epoch attribute of each element.
+
+    merge(streams: List[Iterable[QueueElement]]) -> Iterator[QueueElement]:
+        Lazily merges time-ordered streams of elements in ascending order of time_epoch.
     """
 
     def __init__(self):
@@ -60,6 +64,24 @@ class SimulationQueue:
         """
         self.queue.sort(key=lambda x: x.time_epoch)
 
+    def merge(self, streams: List[Iterable[QueueElement]]) -> Iterator[QueueElement]:
+        """
+        Lazily merges time-ordered streams of elements (e.g. one per user) in ascending order of time_epoch, without
+        building the queue: a heap keeps only the next element of each stream. Elements with the same time_epoch
+        follow the order of their streams, as in a sorted queue.
+
+        Parameters:
+        -----------
+        streams : List[Iterable[QueueElement]]
+            The streams to merge, each one in ascending order of time_epoch.
+
+        Returns:
+        --------
+        Iterator[QueueElement]
+            The elements of all the streams in ascending order of time_epoch.
+        """
+        return heapq.merge(*streams, key=lambda x: x.time_epoch)
+
     def reset(self) -> None:
         """
         Empty the queue.
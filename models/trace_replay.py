@@ -0,0 +1,145 @@
+import csv
+import itertools
+import json
+import os
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+
+from models.cache_worker import CacheWorker
+from models.provider import Provider
+from models.queue_element import QueueElement
+from models.request import Request
+from shared.spatial_index import SpatialIndex
+
+# number of trace records read and resolved at once
+TRACE_CHUNK_SIZE = 10000
+
+
+class TraceReplay:
+    """
+    Replays a request log as the simulation queue, instead of the synthetic requests of the RequestGenerator.
+
+    The log is a JSONL file, one JSON object per line, or a CSV file with a header. Each record has the time of the
+    request in ms, the user id, the provider index and where the request was made: the index of the edge node, or
+    the x and y position of the user, served by the nearest edge node. For example:
+
+        {"time": 1200, "user": 3, "provider": 17, "x": 5120.5, "y": 870}
+        {"time": 1350, "user": 8, "provider": 2, "edge_node": 4}
+
+    The records must be in time order. The log is read lazily, chunk_size records at a time, so traces larger than
+    the memory can be replayed, and every call of queue_elements reads it again from the start.
+
+    Attributes
+    ----------
+    path : str
+        The path of the .jsonl or .csv log.
+    chunk_size : int
+        The number of records read at once.
+    """
+
+    def __init__(self, path: str, chunk_size: int = TRACE_CHUNK_SIZE):
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in (".jsonl", ".csv"):
+            raise ValueError(f"unsupported trace format {extension}, the trace must be a .jsonl or a .csv file")
+        self.path = path
+        self.chunk_size = chunk_size
+        self._format = extension
+
+    def records(self) -> Iterator[Dict[str, object]]:
+        """
+        Yields the records of the log, with the line number of the record under "line".
+        """
+        with open(self.path, newline="") as file:
+            if self._format == ".csv":
+                # the header is line 1
+                for line, row in enumerate(csv.DictReader(file), 2):
+                    yield {**{name: value for name, value in row.items() if value not in (None, "")}, "line": line}
+            else:
+                for line, text in enumerate(file, 1):
+                    if text.strip():
+                        try:
+                            record = json.loads(text)
+                        except json.JSONDecodeError as error:
+                            raise ValueError(f"{self.path}:{line}: the record is not valid JSON, {error}") from None
+                        yield {**record, "line": line}
+
+    def chunks(self) -> Iterator[List[Dict[str, object]]]:
+        """
+        Yields the records of the log, chunk_size at a time.
+        """
+        records = self.records()
+        while True:
+            chunk = list(itertools.islice(records, self.chunk_size))
+            if len(chunk) == 0:
+                return
+            yield chunk
+
+    def queue_elements(
+            self, providers: List[Provider], cache_workers: List[CacheWorker],
+            spatial_index: SpatialIndex) -> Iterator[QueueElement]:
+        """
+        Yields a QueueElement for each record of the log, in time order. The user of the queue element is the user id
+        of the record.
+
+        Parameters:
+        -----------
+        providers : List[Provider]
+            The providers of the simulation, the provider of a record is its index in the list.
+        cache_workers : List[CacheWorker]
+            The cache workers of the simulation, the edge node of a record is the index of its cache worker.
+        spatial_index : SpatialIndex
+            The index of the positions of the cache workers, for the records with a position.
+        """
+        previous_time = None
+        for chunk in self.chunks():
+            cache_worker_indexes = self._cache_worker_indexes(chunk, len(cache_workers), spatial_index)
+            for record, cache_worker_index in zip(chunk, cache_worker_indexes):
+                time = self._field(record, "time", int)
+                if previous_time is not None and time < previous_time:
+                    raise ValueError(f"{self.path}:{record['line']}: the records of the trace must be in time order")
+                previous_time = time
+                provider = self._field(record, "provider", int)
+                if not 0 <= provider < len(providers):
+                    raise ValueError(f"{self.path}:{record['line']}: provider {provider} out of the "
+                                     f"{len(providers)} providers of the simulation")
+                yield QueueElement(
+                    Request(time, providers[provider]), record.get("user"), time, cache_workers[cache_worker_index])
+
+    def _field(self, record: Dict[str, object], name: str, convert: Callable[[object], object]):
+        """
+        Returns a field of a record converted to a number, raising a ValueError with the line of the record if the
+        field is missing or not a number.
+        """
+        if name not in record:
+            raise ValueError(f"{self.path}:{record['line']}: missing '{name}'")
+        try:
+            return convert(record[name])
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.path}:{record['line']}: '{name}' is not a number: {record[name]!r}") from None
+
+    def _cache_worker_indexes(
+            self, chunk: List[Dict[str, object]], number_of_cache_workers: int,
+            spatial_index: SpatialIndex) -> List[int]:
+        """
+        Returns the cache worker of each record of a chunk, the positions are resolved together.
+        """
+        cache_worker_indexes = [None] * len(chunk)
+        located = []
+        for i, record in enumerate(chunk):
+            if "edge_node" in record:
+                edge_node = self._field(record, "edge_node", int)
+                if not 0 <= edge_node < number_of_cache_workers:
+                    raise ValueError(f"{self.path}:{record['line']}: edge node {edge_node} out of the "
+                                     f"{number_of_cache_workers} edge nodes of the simulation")
+                cache_worker_indexes[i] = edge_node
+            elif "x" in record and "y" in record:
+                located.append(i)
+            else:
+                raise ValueError(f"{self.path}:{record['line']}: a record needs an edge_node or an x and y position")
+        if len(located) > 0:
+            positions = np.array([(self._field(chunk[i], "x", float), self._field(chunk[i], "y", float))
+                                  for i in located])
+            for i, cache_worker_index in zip(located, spatial_index.nearest_many(positions).tolist()):
+                cache_worker_indexes[i] = cache_worker_index
+        return cache_worker_indexes
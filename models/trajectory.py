@@ -0,0 +1,87 @@
+import bisect
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+class Trajectory:
+    """
+    The path of a user moving at constant speed from its start position to the first waypoint, then looping through
+    the waypoints forever.
+
+    The path is precomputed as the cumulative distance and the timestamp of each of its points, so the position at a
+    time is a binary search on the timestamps plus one linear interpolation, in float64.
+
+    Attributes
+    ----------
+    points : np.ndarray
+        The points of the path, start position, waypoints and first waypoint again, shape (n, 2).
+    distances : np.ndarray
+        The distance travelled when reaching each point.
+    times : np.ndarray
+        The time (ms) when each point is reached.
+    loop_start_time : float
+        The time when the first waypoint is reached, the loop through the waypoints starts there.
+    loop_time : float
+        The time to travel once through the loop of waypoints.
+    """
+
+    def __init__(self, start_position: Tuple[float, float], waypoints: Sequence[Tuple[float, float]], speed: float):
+        points = [start_position] + list(waypoints) + list(waypoints[:1])
+        self.points = np.array(points, dtype=np.float64).reshape(-1, 2)
+        segment_lengths = np.hypot(*np.diff(self.points, axis=0).T)
+        self.distances = np.concatenate(([0.0], np.cumsum(segment_lengths)))
+        speed = float(speed)
+        self.times = self.distances / speed if speed > 0 else np.zeros_like(self.distances)
+        self.loop_start_time = float(self.times[min(1, len(self.times) - 1)])
+        self.loop_time = float(self.times[-1]) - self.loop_start_time
+        # python copies for the scalar queries, numpy indexing is slow on single elements
+        self._times: List[float] = self.times.tolist()
+        self._points: List[Tuple[float, float]] = [tuple(point) for point in self.points.tolist()]
+
+    def position_at(self, time: float) -> Tuple[float, float]:
+        """
+        Returns the position at a time (ms) since the start of the path.
+        """
+        time = self.path_time(time)
+        index = min(max(bisect.bisect_right(self._times, time) - 1, 0), len(self._times) - 2)
+        if index < 0:
+            return self._points[0]
+        start_time = self._times[index]
+        duration = self._times[index + 1] - start_time
+        fraction = (time - start_time) / duration if duration > 0 else 0.0
+        x0, y0 = self._points[index]
+        x1, y1 = self._points[index + 1]
+        return x0 + (x1 - x0) * fraction, y0 + (y1 - y0) * fraction
+
+    def positions_at(self, times: Sequence[float]) -> np.ndarray:
+        """
+        Vectorized position_at, returns the positions at each time as an array of shape (len(times), 2).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self._times) < 2:
+            return np.repeat(self.points, len(times), axis=0)
+        if self.loop_time > 0:
+            wrapped = self.loop_start_time + np.fmod(times - self.loop_start_time, self.loop_time)
+            times = np.where(times > self.times[-1], wrapped, times)
+        else:
+            times = np.minimum(times, self.times[-1])
+        indexes = np.clip(np.searchsorted(self.times, times, side="right") - 1, 0, len(self.times) - 2)
+        start_times = self.times[indexes]
+        durations = self.times[indexes + 1] - start_times
+        safe_durations = np.where(durations > 0, durations, 1.0)
+        fractions = np.where(durations > 0, (times - start_times) / safe_durations, 0.0)
+        starts = self.points[indexes]
+        return starts + (self.points[indexes + 1] - starts) * fractions[:, None]
+
+    def path_time(self, time: float) -> float:
+        """
+        Returns the time in the first pass of the path when the position is the same as at the given time.
+        """
+        time = float(time)
+        if time <= self._times[-1]:
+            return time
+        if self.loop_time <= 0:
+            return self._times[-1]
+        return self.loop_start_time + math.fmod(time - self.loop_start_time, self.loop_time)
@@ -1,6 +1,11 @@
 import argparse
+import copy
 
+from models.enums.admission_filter_type import AdmissionFilterType
 from models.enums.cache_manager_node import CacheManagerMode
+from models.enums.cache_replacement_strategy import CacheReplacementStrategy
+from models.enums.gdsf_cost import GDSFCost
+from models.enums.prefetcher_type import PrefetcherType
 from models.enums.provider_type import ProviderType
 from models.enums.user_category import UserCategory
 
@@ -12,7 +17,7 @@ parser.add_argument('--edge-nodes', type=int, default=10, help='Number of edge n
 parser.add_argument('--users', type=int, default=500, help='Number of users (default: 500)')
 parser.add_argument('--user-speed', type=float, default=10, help='Average speed of the users in m/s (default: 10)')
 parser.add_argument('--area-dimensions', type=int, default=100000000, help='Area dimensions in square meters (default: 100000000)')
-parser.add_argument('--subareas', type=int, default=5, help='Number of subareas (default: 5)')
+parser.add_argument('--subareas', type=int, default=5, help='Number of subareas of the location-based popularity, in the grid closest to a square, e.g. 6 -> 3 x 2 (default: 5)')
 parser.add_argument('--edge-node-distance', type=int, default=1000, help='Minimum distance between edge nodes in meters (default: 1000)')
 parser.add_argument('--user-waypoints', type=int, default=10, help='Number of waypoints for each user (default: 10)')
 parser.add_argument('--user-types', type=int, default=5, help='Number of user types (default: 5)')
@@ -22,8 +27,17 @@ parser.add_argument('--neighbor-edge-nodes', type=int, default=0, help='Number o
 parser.add_argument('--cache-expiration-time', type=int, default=600000, help='Default expiration time for cached resources in milliseconds (default: 600000)')
 parser.add_argument('--cache-not-found-resource', type=bool, default=False, help='Whether to cache not found resources (default: False)')
 parser.add_argument('--cache-size', type=float, default=4e+9, help='Maximum size of the cache in bytes (default: 4e+9)')
+parser.add_argument('--replacement-strategy', type=str, default=CacheReplacementStrategy.LRU.value, choices=[strategy.value for strategy in CacheReplacementStrategy], help='Cache replacement strategy of the edge nodes (default: LRU)')
+parser.add_argument('--gdsf-cost', type=str, default=GDSFCost.TIME_TAKEN.value, choices=[cost.value for cost in GDSFCost], help='Cost of a resource for the GDSF replacement strategy, provider latency or bytes (default: time-taken)')
+parser.add_argument('--admission-filter', type=str, default=AdmissionFilterType.NONE.value, choices=[admission_filter.value for admission_filter in AdmissionFilterType], help='Admission filter for resources cached when not found (default: none)')
+parser.add_argument('--admission-sketch-width', type=int, default=4096, help='Counters per row of the admission filter and sketch prefetcher sketches, they are aged every 10 x width requests (default: 4096)')
 parser.add_argument('--accuracy', type=float, default=0.2,  help='Initial hit rate of the cache (default: 0)')
 parser.add_argument('--cache-mode', type=str, default="standard", help='Cache manager mode (default: standard)')
+parser.add_argument('--order-window', type=int, default=0, help='Generate and dispatch the caching orders one time window of this many ms ahead of the simulation instead of for the whole run, 0 for the whole run. With --streaming only a window of requests is held in memory, orders prefetching earlier than their window are executed late (default: 0)')
+parser.add_argument('--mobility-lookahead', type=int, default=0, help='Also place the orders of a user request at the next cache worker of the user when it hands over within this many ms, pre-warming the cache it is about to enter, 0 to disable. Users are needed, not with --trace or --scenario, and the oracle prefetcher (default: 0)')
+parser.add_argument('--prefetcher', type=str, default=PrefetcherType.ORACLE.value, choices=[prefetcher.value for prefetcher in PrefetcherType], help='Source of the caching orders: the oracle reading the future requests with the given accuracy, or a sketch of the recent traffic of each cache worker prefetching its most requested providers (default: oracle)')
+parser.add_argument('--prefetch-top-k', type=int, default=10, help='Providers prefetched by each cache worker every prefetch interval with the sketch prefetcher (default: 10)')
+parser.add_argument('--prefetch-interval', type=int, default=60000, help='Time in ms between two prefetches of the sketch prefetcher (default: 60000)')
 parser.add_argument('--provider-high', type=float, default=0.333, help='Fraction of high-capacity providers (default: 0.333)')
 parser.add_argument('--provider-medium', type=float, default=0.333, help='Fraction of medium-capacity providers (default: 0.333)')
 parser.add_argument('--provider-low', type=float, default=0.334, help='Fraction of low-capacity providers (default: 0.334)')
@@ -37,52 +51,130 @@ parser.add_argument('--cloud-trace-path', type=str, default='./data/network_trac
 parser.add_argument('--path-bytes', type=str, default='./data/bytes/', help='Path for bytes')
 parser.add_argument('--path-time', type=str, default='./data/waiting-time/', help='Path for waiting time')
 parser.add_argument('--write-in-file', type=bool, default=False, help='Write results to file')
+parser.add_argument('--streaming', type=bool, default=False, help='Generate the requests lazily and merge them by time instead of building the whole simulation queue, each user draws from its own seeded generator (default: False)')
+parser.add_argument('--batched-requests', type=bool, default=False, help='Draw the requests of each user in NumPy batches from its own seeded generator, the providers from a truncated Zipf CDF (default: False)')
+parser.add_argument('--trace', type=str, default=None, help='Replay the requests of a .jsonl or .csv request log instead of generating them, see models/trace_replay.py for the record format (default: None)')
+parser.add_argument('--scenario', type=str, default=None, help='Directory of the saved scenarios of the replications: a replication loads its .npz scenario from there and skips the generation of users, providers, requests and edge nodes, or generates and saves it when missing (default: None)')
 parser.add_argument('--replications', type=int, default=1, help='Number of replications to execute of a single experiment (default: 1)')
+parser.add_argument('--workers', type=int, default=1, help='Number of processes running the replications in parallel, each replication is seeded with its own good seed (default: 1)')
 
-args = parser.parse_args()
-
-EXPERIMENT_DURATION = args.duration
-EXPERIMENT_LABEL = args.label
-REPLICATIONS = args.replications
-NUMBER_OF_EDGE_NODES = args.edge_nodes
-NUMBER_OF_USERS = args.users  # 100
-USER_SPEED = args.user_speed  # 1.42  # avg walking speed in m/s
-AREA_DIMENSIONS = args.area_dimensions
-SUBAREAS = args.subareas
-EDGE_NODE_MIN_DISTANCE = args.edge_node_distance
-USER_CATEGORY_DISTRIBUTION = {
-    UserCategory.ID: args.user_distribution_id,
-    UserCategory.TYPE: args.user_distribution_type,
-    UserCategory.LOCATION: args.user_distribution_location,
-}
-USER_WAYPOINTS = args.user_waypoints
-# only when user from the category TYPE are deployed
-NUMBER_OF_USER_TYPES = args.user_types
-DEFAULT_AVG_PRE_REQUEST_TIME = args.pre_req_time_avg
-DEFAULT_STD_PRE_REQUEST_TIME = args.pre_req_time_std
-
-
-# CACHE WORKER METRICS
-NEIGHBOR_EDGE_NODES = args.neighbor_edge_nodes
-DEFAULT_EXPIRATION_TIME = args.cache_expiration_time  # 1000000  # in ms
-CACHE_NOT_FOUND_RESOURCE = args.cache_not_found_resource
-CACHE_DEFAULT_SIZE = args.cache_size
-
-# CACHE MANAGER METRICS
-ACCURACY = args.accuracy
-MODE = CacheManagerMode.STANDARD_ONLY if args.cache_mode == CacheManagerMode.STANDARD_ONLY.value else CacheManagerMode.COOPERATIVE
-
-# Request Generator
-PROVIDER_DISTRIBUTION = {
-    ProviderType.HIGH: args.provider_high,
-    ProviderType.MEDIUM: args.provider_medium,
-    ProviderType.LOW: args.provider_low,
-}
-
-RATE_OF_EVENT = args.rate_of_event
-NUMBER_OF_PROVIDERS = args.number_of_providers
-POPULARITY_DISTRIBUTION = args.popularity_distribution
-CLOUD_TRACE_PATH = args.cloud_trace_path
-PATH_BYTES = args.path_bytes
-PATH_TIME = args.path_time
-WRITE_IN_FILE = args.write_in_file
+
+class SimulationConfig:
+    """
+    The parameters of a simulation, passed to the models instead of reading module globals.
+
+    A config starts from the command line defaults, or from parsed command line arguments, and any parameter can be
+    overridden by keyword with its lowercase name, e.g. SimulationConfig(accuracy=0.4, number_of_users=50).
+    The attributes are the lowercase names of the module level parameters (ACCURACY -> accuracy).
+    """
+
+    def __init__(self, args: argparse.Namespace = None, **overrides):
+        args = parser.parse_args([]) if args is None else args
+        self.experiment_duration = args.duration
+        self.experiment_label = args.label
+        self.replications = args.replications
+        self.workers = args.workers
+        self.number_of_edge_nodes = args.edge_nodes
+        self.number_of_users = args.users  # 100
+        self.user_speed = args.user_speed  # 1.42  # avg walking speed in m/s
+        self.area_dimensions = args.area_dimensions
+        self.subareas = args.subareas
+        self.edge_node_min_distance = args.edge_node_distance
+        self.user_category_distribution = {
+            UserCategory.ID: args.user_distribution_id,
+            UserCategory.TYPE: args.user_distribution_type,
+            UserCategory.LOCATION: args.user_distribution_location,
+        }
+        self.user_waypoints = args.user_waypoints
+        # only when user from the category TYPE are deployed
+        self.number_of_user_types = args.user_types
+        self.default_avg_pre_request_time = args.pre_req_time_avg
+        self.default_std_pre_request_time = args.pre_req_time_std
+
+        # CACHE WORKER METRICS
+        self.neighbor_edge_nodes = args.neighbor_edge_nodes
+        self.default_expiration_time = args.cache_expiration_time  # 1000000  # in ms
+        self.cache_not_found_resource = args.cache_not_found_resource
+        self.cache_default_size = args.cache_size
+        self.replacement_strategy = CacheReplacementStrategy(args.replacement_strategy)
+        self.gdsf_cost = GDSFCost(args.gdsf_cost)
+        self.admission_filter = AdmissionFilterType(args.admission_filter)
+        self.admission_sketch_width = args.admission_sketch_width
+
+        # CACHE MANAGER METRICS
+        self.accuracy = args.accuracy
+        self.mode = CacheManagerMode.STANDARD_ONLY if args.cache_mode == CacheManagerMode.STANDARD_ONLY.value else CacheManagerMode.COOPERATIVE
+        self.order_window = args.order_window
+        self.mobility_lookahead = args.mobility_lookahead
+        self.prefetcher = PrefetcherType(args.prefetcher)
+        self.prefetch_top_k = args.prefetch_top_k
+        self.prefetch_interval = args.prefetch_interval
+
+        # Request Generator
+        self.provider_distribution = {
+            ProviderType.HIGH: args.provider_high,
+            ProviderType.MEDIUM: args.provider_medium,
+            ProviderType.LOW: args.provider_low,
+        }
+        self.rate_of_event = args.rate_of_event
+        self.number_of_providers = args.number_of_providers
+        self.popularity_distribution = args.popularity_distribution
+        self.cloud_trace_path = args.cloud_trace_path
+        self.path_bytes = args.path_bytes
+        self.path_time = args.path_time
+        self.write_in_file = args.write_in_file
+        self.streaming_queue = args.streaming
+        self.batched_requests = args.batched_requests
+        self.trace_path = args.trace
+        self.scenario_path = args.scenario
+        self._override(overrides)
+        self._validate()
+
+    @classmethod
+    def from_args(cls, argv=None) -> "SimulationConfig":
+        """
+        Builds a config from command line arguments, sys.argv if argv is None.
+        """
+        return cls(parser.parse_args(argv))
+
+    def replace(self, **overrides) -> "SimulationConfig":
+        """
+        Returns a copy of the config with the given parameters overridden.
+        """
+        config = copy.deepcopy(self)
+        config._override(overrides)
+        config._validate()
+        return config
+
+    def _override(self, overrides: dict):
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise TypeError(f"unknown simulation parameter {name}")
+            setattr(self, name, value)
+
+    def _validate(self):
+        # the pre-warm of the next cache worker adds to the oracle requests, the sketch prefetcher reads none
+        if self.mobility_lookahead > 0 and self.prefetcher != PrefetcherType.ORACLE:
+            raise ValueError("the mobility lookahead pre-warms the caching orders of the oracle prefetcher, "
+                             f"it cannot be used with the {self.prefetcher.value} prefetcher")
+
+
+_default_config: SimulationConfig = None
+
+
+def default_config() -> SimulationConfig:
+    """
+    Returns the config with the command line defaults, used by the models built without a config.
+    The command line is only parsed by SimulationConfig.from_args, so importing the models has no side effects.
+    """
+    global _default_config
+    if _default_config is None:
+        _default_config = SimulationConfig()
+    return _default_config
+
+
+def __getattr__(name: str):
+    # the module level parameters (e.g. ACCURACY) are the ones of the default config
+    if name.isupper() and hasattr(default_config(), name.lower()):
+        return getattr(default_config(), name.lower())
+    raise AttributeError(f"module {__name__} has no attribute {name}")
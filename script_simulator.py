@@ -1,61 +1,41 @@
-import subprocess
+from shared.sweep import Sweep
+
 replications = 30
-labels_of_already_done_experiments = ["accuracy-0-N0-standard-cache-mode-mix",
-                                      "accuracy-0-N1-standard-cache-mode-mix",
-                                      "accuracy-0-N2-standard-cache-mode-mix",
-                                      "accuracy-20-N0-standard-mix",
-                                      "accuracy-20-N1-standard-mix",
-                                      "accuracy-20-N2-standard-mix",
-                                      "accuracy-40-N0-standard-mix",
-                                      "accuracy-40-N1-standard-mix",
-                                      ]
+# Define the values of each simulator option to vary, options missing here keep their defaults
+grid = {
+    "accuracy": [0.4],  # 3
+    "cache_not_found_resource": [True],  # 2
+    "neighbor_edge_nodes": [2],  # 3
+    "cache_mode": ["standard"],  # 2
+    "user_distribution": [  # 4
+        #{"user_distribution_id": 0.333, "user_distribution_type": 0.333, "user_distribution_location": 0.334},
+        #{"user_distribution_id": 1, "user_distribution_type": 0, "user_distribution_location": 0},
+        {"user_distribution_id": 0, "user_distribution_type": 1, "user_distribution_location": 0},
+        {"user_distribution_id": 0, "user_distribution_type": 0, "user_distribution_location": 1}],
+}
+
 
+def experiment_label(point):
+    """
+    Returns the label of a point, as the experiment directories in experiments/ are named.
+    """
+    label = f"v3acuracy-{point['accuracy'] * 100}-N{point['neighbor_edge_nodes']}-{point['cache_mode']}-"
+    if point["cache_not_found_resource"]:
+        label += "cache-mode-"
+    if point["user_distribution_id"] == 1:
+        label += "id"
+    elif point["user_distribution_location"] == 1:
+        label += "location"
+    elif point["user_distribution_type"] == 1:
+        label += "type"
+    else:
+        label += "mix"
+    return label
 
-def read_file_and_print(filename):
-    lines = []
-    with open(filename, 'r') as file:
-        for line in file:
-            raw_lines = line.strip()
-            # Split the string by underscores
-            parts = raw_lines.split('_')
-            print(parts)
-            # Join the desired parts using the join() method
-            result = parts[0]
-            lines.append(result)
-    return lines
 
-labels_of_already_done_experiments = labels_of_already_done_experiments + read_file_and_print("./experiments/files.out")
-# Define list of parameters to vary
-accuracy_list = [0.4]  # 3
-cache_not_found_list = [True] # 2
-neighbor_edge_nodes_list = [2]  # 3
-cache_mode_list = ["standard"]  # 2
-user_distributions = [  # 4
-    #{"id": 0.333, "type": 0.333, "location": 0.334},
-    #{"id": 1, "type": 0, "location": 0},
-    {"id": 0, "type": 1, "location": 0},
-    {"id": 0, "type": 0, "location": 1}]
-# Execute experiments for each combination of parameters
-for accuracy in accuracy_list:
-    for cache_not_found in cache_not_found_list:
-        for neighbor_edge_nodes in neighbor_edge_nodes_list:
-            for cache_mode in cache_mode_list:
-                for user_distribution in user_distributions:
-                    label = f"v3acuracy-{accuracy*100}-N{neighbor_edge_nodes}-{cache_mode}-"
-                    if (cache_not_found):
-                        label += "cache-mode-"
-                    if (user_distribution['id'] == 1):
-                        label += "id"
-                    elif (user_distribution['location'] == 1):
-                        label += "location"
-                    elif (user_distribution['type'] == 1):
-                        label += "type"
-                    else:
-                        label += "mix"
-                    if (not label in labels_of_already_done_experiments and not (accuracy == 0 and cache_mode == "cooperative")):
-                        # Define command to run simulation with current parameter settings
-                        command = f"python3 simulator.py --label \"{label}\" --accuracy {accuracy} --cache-not-found-resource {cache_not_found} --neighbor-edge-nodes {neighbor_edge_nodes} --cache-mode \"{cache_mode}\" --replications {replications} --user-distribution-id {user_distribution['id']} --user-distribution-type {user_distribution['type']} --user-distribution-location {user_distribution['location']} --write-in-file True"
-                        # Print current parameter settings
-                        print(command)
-                        # Execute command and print output
-                        subprocess.run(command, shell=True, check=True)
+if __name__ == '__main__':
+    # Execute the replications of each combination of parameters that were not executed yet
+    # and write all the results of the grid, labelled by experiment_label, to experiments/sweep/results.csv
+    sweep = Sweep(grid, replications, exclude=lambda point: point["accuracy"] == 0 and point["cache_mode"] == "cooperative",
+                  label=experiment_label)
+    sweep.run()
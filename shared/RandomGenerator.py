@@ -2,14 +2,35 @@ import numpy as np
 import random
 
 good_seeds = [62505, 175639, 222556, 247986, 306166, 342810, 438166, 478767, 536727, 596506, 644578, 676658, 686266, 757626, 767979, 793834, 811813, 855207, 890460, 890939, 931361, 953584, 975241, 1001473, 1009105, 1037184, 1053646, 1069554, 1095984, 1103844]
+# the seeds of replications past the good seeds repeat them shifted by this offset per lap, above every good seed
+SEED_LAP_OFFSET = 2 ** 21
+
+
+def replication_seed(replication: int) -> int:
+    """
+    Returns the seed of a replication: its good seed, or past the table the good seed of replication % len(good_seeds)
+    plus SEED_LAP_OFFSET for each lap, so any number of replications gets distinct and reproducible seeds.
+    """
+    lap, index = divmod(replication, len(good_seeds))
+    return good_seeds[index] + lap * SEED_LAP_OFFSET
+
+
 class RandomGenerator:
     def __init__(self, replication = 0):
-        self.seed = good_seeds[replication]
+        self.set_replication(replication)
+        self.random: random = random
+        self.np_random: random = np.random
+
+    def set_replication(self, replication: int):
+        """
+        Seeds the shared generators with the good seed of the replication, so each replication draws the same
+        numbers whatever process runs it.
+        """
+        self.replication = replication
+        self.seed = replication_seed(replication)
         np.random.seed(seed=self.seed)
         # read lines
         random.seed(self.seed)
-        self.random: random = random
-        self.np_random: random = np.random
 
 
 random_generator = RandomGenerator()
@@ -2,7 +2,7 @@ import math
 from typing import List
 from shared.RandomGenerator import regular_random
 
-def generate_edge_node_position(dimension, min_distance, edge_nodes):
+def generate_edge_node_position(dimension, min_distance, edge_nodes, spatial_index=None):
     """
     Generates a random (x, y) position for a single edge node,
     ensuring that it is not closer than X from any other edge node.
@@ -11,6 +11,8 @@ def generate_edge_node_position(dimension, min_distance, edge_nodes):
         edge_nodes (list): The list of all edge nodes.
         dimension (int): dimension of the area (square)
         min_distance (int): minimum distance between edge nodes
+        spatial_index (SpatialIndex): the index of the positions of the edge nodes already placed, checked instead of
+            edge_nodes when given. The generated position is added to it.
     Returns:
         tuple: The randomly generated (x, y) position as a tuple.
     """
@@ -19,7 +21,11 @@ def generate_edge_node_position(dimension, min_distance, edge_nodes):
         y = regular_random.randint(0, dimension)
 
         # Check if the generated (x, y) position is farther than min_distance from all other edge nodes
-        if all(distance((x, y), edge_node.get_position()) >= min_distance for edge_node in edge_nodes):
+        if spatial_index is not None:
+            if not spatial_index.any_within((x, y), min_distance):
+                spatial_index.add((x, y))
+                return x, y
+        elif all(distance((x, y), edge_node.get_position()) >= min_distance for edge_node in edge_nodes):
             return x, y
 
 
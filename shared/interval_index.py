@@ -0,0 +1,68 @@
+import bisect
+import math
+from typing import List, Sequence
+
+
+class IntervalIndex:
+    """
+    A list of open intervals (start, end) sorted by start, answering which is the first interval of the list open at
+    a time, start < time < end, in logarithmic time. Intervals can be removed.
+
+    The starts are kept in a sorted list, the intervals starting before a time are a prefix of it, and the ends in a
+    max segment tree, whose descent finds the first interval of the prefix still open.
+
+    Attributes
+    ----------
+    starts : List[float]
+        The starts of the intervals, non-decreasing.
+    """
+
+    def __init__(self, starts: Sequence[float], ends: Sequence[float]):
+        if any(later < earlier for earlier, later in zip(starts, starts[1:])):
+            raise ValueError("the intervals of an IntervalIndex must be sorted by start")
+        self.starts: List[float] = list(starts)
+        self._size = 1
+        while self._size < len(self.starts):
+            self._size *= 2
+        # _tree[1] is the root, the children of node n are 2n and 2n + 1, the leaves start at _size
+        self._tree: List[float] = [-math.inf] * (2 * self._size)
+        self._tree[self._size:self._size + len(ends)] = ends
+        for node in range(self._size - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def first_open_at(self, time: float) -> int:
+        """
+        Returns the index of the first interval open at a time, -1 if none is.
+        """
+        before = bisect.bisect_left(self.starts, time)
+        if before == 0 or self._tree[1] <= time:
+            return -1
+        return self._first_above(1, 0, self._size, before, time)
+
+    def remove(self, index: int):
+        """
+        Removes an interval, its index and the ones of the other intervals do not change.
+        """
+        node = self._size + index
+        self._tree[node] = -math.inf
+        node //= 2
+        while node > 0:
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+            node //= 2
+
+    def _first_above(self, node: int, low: int, high: int, before: int, time: float) -> int:
+        """
+        Returns the first leaf below before, in the subtree of node covering [low, high), ending after time.
+        """
+        if low >= before or self._tree[node] <= time:
+            return -1
+        if high - low == 1:
+            return low
+        middle = (low + high) // 2
+        found = self._first_above(2 * node, low, middle, before, time)
+        if found >= 0:
+            return found
+        return self._first_above(2 * node + 1, middle, high, before, time)
@@ -0,0 +1,85 @@
+import hashlib
+from typing import List
+
+
+def hash_indexes(key: str, number_of_indexes: int, size: int) -> List[int]:
+    """
+    Maps a key to number_of_indexes positions in [0, size) by double hashing.
+    The hash does not depend on the interpreter hash seed, so runs stay reproducible.
+
+    Args:
+        key (str): the key to hash, e.g. a provider id.
+        number_of_indexes (int): how many positions to return.
+        size (int): the size of the indexed structure.
+
+    Returns:
+        List[int]: the positions of the key.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    second = int.from_bytes(digest[8:], "little") | 1
+    return [(first + i * second) % size for i in range(number_of_indexes)]
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter of string keys.
+
+    Attributes
+    ----------
+    size : int
+        The number of bits of the filter.
+    number_of_hashes : int
+        The number of bits set for each key.
+    """
+
+    def __init__(self, size: int, number_of_hashes: int = 3):
+        self.size = size
+        self.number_of_hashes = number_of_hashes
+        self.bits = bytearray((size + 7) // 8)
+
+    def __contains__(self, key: str):
+        return all(self.bits[index >> 3] & (1 << (index & 7))
+                   for index in hash_indexes(key, self.number_of_hashes, self.size))
+
+    def add(self, key: str):
+        for index in hash_indexes(key, self.number_of_hashes, self.size):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def clear(self):
+        self.bits = bytearray(len(self.bits))
+
+
+class CountMinSketch:
+    """
+    A Count-Min Sketch of string keys with small saturating counters.
+
+    Attributes
+    ----------
+    width : int
+        The number of counters of each row.
+    depth : int
+        The number of rows, each key increments one counter per row.
+    max_count : int
+        The value counters saturate at (15 by default, as 4-bit counters).
+    """
+
+    def __init__(self, width: int, depth: int = 4, max_count: int = 15):
+        self.width = width
+        self.depth = depth
+        self.max_count = max_count
+        self.rows = [bytearray(width) for _ in range(depth)]
+
+    def increment(self, key: str):
+        for row, index in zip(self.rows, hash_indexes(key, self.depth, self.width)):
+            if row[index] < self.max_count:
+                row[index] += 1
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.rows, hash_indexes(key, self.depth, self.width)))
+
+    def halve(self):
+        """
+        Ages the sketch by halving every counter.
+        """
+        self.rows = [bytearray(count >> 1 for count in row) for row in self.rows]
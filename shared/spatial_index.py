@@ -0,0 +1,193 @@
+import math
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[float, float]
+Cell = Tuple[int, int]
+
+
+class SpatialIndex:
+    """
+    A uniform grid over a set of 2D points, e.g. the positions of the edge nodes, answering nearest, k-nearest and
+    radius queries without scanning every point.
+
+    Queries return the indexes of the points in the order they were given, and distance ties are won by the lowest
+    index, as a linear scan with a strict comparison would do.
+
+    Attributes
+    ----------
+    points : np.ndarray
+        The indexed points, shape (n, 2).
+    cell_size : float
+        The side of the grid cells.
+    """
+
+    def __init__(self, points: Sequence[Point] = (), cell_size: float = None):
+        self.points = np.array(points, dtype=np.float64).reshape(-1, 2)
+        if cell_size is None:
+            # about one point per cell
+            extent = np.ptp(self.points, axis=0).max() if len(self.points) > 0 else 0.0
+            cell_size = extent / math.ceil(math.sqrt(len(self.points))) if extent > 0 else 1.0
+        self.cell_size = float(cell_size)
+        # python copy of the points for the scalar queries, numpy indexing is slow on single elements
+        self._coordinates: List[Point] = [tuple(point) for point in self.points.tolist()]
+        self._cells: Dict[Cell, List[int]] = {}
+        for index, point in enumerate(self._coordinates):
+            self._cells.setdefault(self._cell(point), []).append(index)
+        # cell -> indexes (as array and as list) of the points that can be the nearest one of a point of the cell
+        self._nearest_candidates: Dict[Cell, Tuple[np.ndarray, List[int]]] = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, point: Point) -> int:
+        """
+        Adds a point to the index and returns its index.
+        """
+        index = len(self.points)
+        self.points = np.vstack((self.points, np.array(point, dtype=np.float64).reshape(1, 2)))
+        self._coordinates.append(tuple(self.points[index].tolist()))
+        self._cells.setdefault(self._cell(point), []).append(index)
+        self._nearest_candidates.clear()
+        return index
+
+    def nearest(self, point: Point) -> int:
+        """
+        Returns the index of the point nearest to the given one, None if the index is empty.
+        """
+        if len(self.points) == 0:
+            return None
+        x, y = float(point[0]), float(point[1])
+        nearest, min_distance = None, math.inf
+        for index in self._candidates(self._cell((x, y)))[1]:
+            px, py = self._coordinates[index]
+            distance = math.sqrt((px - x) ** 2 + (py - y) ** 2)
+            if distance < min_distance:
+                nearest, min_distance = index, distance
+        return nearest
+
+    def nearest_many(self, points: Sequence[Point]) -> np.ndarray:
+        """
+        Batched nearest: returns the index of the point nearest to each of the given ones.
+        The query points are grouped by grid cell and each group is compared with the candidates of its cell at once.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        nearest = np.empty(len(points), dtype=np.int64)
+        if len(points) == 0 or len(self.points) == 0:
+            return nearest
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        unique_cells, cell_of_point = np.unique(cells, axis=0, return_inverse=True)
+        cell_of_point = cell_of_point.reshape(-1)
+        order = np.argsort(cell_of_point, kind="stable")
+        bounds = np.searchsorted(cell_of_point[order], np.arange(len(unique_cells) + 1))
+        for cell_index, cell in enumerate(unique_cells.tolist()):
+            group = order[bounds[cell_index]:bounds[cell_index + 1]]
+            candidates = self._candidates(tuple(cell))[0]
+            differences = points[group, None, :] - self.points[None, candidates, :]
+            distances = np.sqrt(np.square(differences).sum(axis=2))
+            nearest[group] = candidates[np.argmin(distances, axis=1)]
+        return nearest
+
+    def k_nearest(self, point: Point, k: int, skip: Callable[[int], bool] = None) -> List[int]:
+        """
+        Returns the indexes of the k points nearest to the given one, nearest first, without the indexes skip is True for.
+        The grid is searched ring by ring around the cell of the point until no closer point can be found.
+        """
+        if k <= 0:
+            return []
+        x, y = float(point[0]), float(point[1])
+        center = self._cell((x, y))
+        found: List[Tuple[float, int]] = []
+        visited = 0
+        for ring, cells in enumerate(self._rings(center)):
+            for cell in cells:
+                for index in self._cells.get(cell, ()):
+                    visited += 1
+                    if skip is None or not skip(index):
+                        px, py = self._coordinates[index]
+                        found.append((math.sqrt((px - x) ** 2 + (py - y) ** 2), index))
+            if visited == len(self.points):
+                break
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] < self._distance_outside(center, ring, x, y):
+                    break
+        found.sort()
+        return [index for _, index in found[:k]]
+
+    def any_within(self, point: Point, radius: float) -> bool:
+        """
+        Returns True if an indexed point is closer than radius to the given one.
+        """
+        x, y = float(point[0]), float(point[1])
+        center = self._cell((x, y))
+        reach = math.ceil(radius / self.cell_size)
+        for cx in range(center[0] - reach, center[0] + reach + 1):
+            for cy in range(center[1] - reach, center[1] + reach + 1):
+                for index in self._cells.get((cx, cy), ()):
+                    px, py = self._coordinates[index]
+                    if math.sqrt((px - x) ** 2 + (py - y) ** 2) < radius:
+                        return True
+        return False
+
+    def _cell(self, point: Point) -> Cell:
+        return math.floor(point[0] / self.cell_size), math.floor(point[1] / self.cell_size)
+
+    def _rings(self, center: Cell) -> Iterator[List[Cell]]:
+        """
+        Yields the cells at Chebyshev distance 0, 1, 2, ... from the center cell.
+        """
+        cx, cy = center
+        yield [center]
+        ring = 1
+        while True:
+            cells = [(cx + dx, cy - ring) for dx in range(-ring, ring + 1)]
+            cells += [(cx + dx, cy + ring) for dx in range(-ring, ring + 1)]
+            cells += [(cx - ring, cy + dy) for dy in range(-ring + 1, ring)]
+            cells += [(cx + ring, cy + dy) for dy in range(-ring + 1, ring)]
+            yield cells
+            ring += 1
+
+    def _distance_outside(self, center: Cell, ring: int, x: float, y: float) -> float:
+        """
+        Returns a lower bound of the distance from (x, y) to the points out of the rings already searched.
+        """
+        low_x, low_y = (center[0] - ring) * self.cell_size, (center[1] - ring) * self.cell_size
+        high_x, high_y = (center[0] + ring + 1) * self.cell_size, (center[1] + ring + 1) * self.cell_size
+        return min(x - low_x, high_x - x, y - low_y, high_y - y)
+
+    def _candidates(self, cell: Cell) -> Tuple[np.ndarray, List[int]]:
+        """
+        Returns the indexes, ascending, of the points that can be the nearest one (or tied with it) of a point of the
+        cell: the points whose distance from the cell is not larger than the farthest distance from the cell of any
+        point.
+        """
+        candidates = self._nearest_candidates.get(cell)
+        if candidates is None:
+            low = np.array(cell, dtype=np.float64) * self.cell_size
+            high = low + self.cell_size
+            closest = np.maximum(np.maximum(low - self.points, self.points - high), 0)
+            farthest = np.maximum(np.abs(self.points - low), np.abs(self.points - high))
+            min_distances = np.square(closest).sum(axis=1)
+            bound = np.square(farthest).sum(axis=1).min()
+            # the slack keeps points tied up to the floating point rounding
+            indexes = np.flatnonzero(min_distances <= bound * (1 + 1e-9) + 1e-9)
+            candidates = (indexes, indexes.tolist())
+            self._nearest_candidates[cell] = candidates
+        return candidates
+
+
+def index_edge_nodes(edge_nodes) -> SpatialIndex:
+    """
+    Returns the spatial index of the positions of the edge nodes, queries return indexes of edge_nodes.
+    """
+    return SpatialIndex([edge_node.get_position() for edge_node in edge_nodes])
+
+
+def index_cache_workers(cache_workers) -> SpatialIndex:
+    """
+    Returns the spatial index of the positions of the edge nodes of the cache workers, queries return indexes of
+    cache_workers.
+    """
+    return SpatialIndex([cache_worker.edge_node.get_position() for cache_worker in cache_workers])
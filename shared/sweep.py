@@ -0,0 +1,185 @@
+import contextlib
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+from typing import Callable, Dict, List, Tuple
+
+from parameters import parser
+from shared.RandomGenerator import replication_seed
+
+# parameters that do not change the results of a replication, they are not part of its key (a saved scenario
+# reproduces the run that generated it)
+IGNORED_PARAMETERS = {"label", "write_in_file", "replications", "workers", "scenario"}
+
+
+def expand_grid(grid: Dict[str, list]) -> List[Dict[str, object]]:
+    """
+    Expands a declarative grid into the list of its points, in the order of the grid (the last parameter varies first).
+    A value can be a dict of options that vary together, e.g. a user category distribution.
+
+    Args:
+        grid (Dict[str, list]): the values of each parameter, keyed by the simulator option without dashes
+            (e.g. {"accuracy": [0.2, 0.4], "cache_mode": ["standard"]}).
+
+    Returns:
+        List[Dict[str, object]]: one dict of option values per point.
+    """
+    points = []
+    for values in itertools.product(*grid.values()):
+        point = {}
+        for name, value in zip(grid.keys(), values):
+            if isinstance(value, dict):
+                point.update(value)
+            else:
+                point[name] = value
+        points.append(point)
+    return points
+
+
+def point_arguments(point: Dict[str, object]) -> List[str]:
+    """
+    Returns the simulator command line arguments of a point.
+    Boolean options are parsed with bool(), so False is passed as an empty string.
+    """
+    arguments = []
+    for name, value in point.items():
+        if isinstance(value, bool):
+            value = "True" if value else ""
+        arguments += [f"--{name.replace('_', '-')}", str(value)]
+    return arguments
+
+
+def point_label(point: Dict[str, object]) -> str:
+    """
+    Returns the default label of a point: its --label option if set, otherwise its option values joined by dashes.
+    """
+    if "label" in point:
+        return str(point["label"])
+    return "-".join(f"{name}={value}" for name, value in point.items())
+
+
+def resolve_parameters(point: Dict[str, object]) -> Dict[str, object]:
+    """
+    Returns the full parameter set of a point: its values plus the defaults of every other simulator option.
+    """
+    return vars(parser.parse_args(point_arguments(point)))
+
+
+def replication_key(parameters: Dict[str, object], replication: int) -> str:
+    """
+    Hashes the full parameter set and the seed of a replication, the key of its memoized result.
+    """
+    key = {name: value for name, value in parameters.items() if name not in IGNORED_PARAMETERS}
+    key["seed"] = replication_seed(replication)
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+def _run_replication(task: Tuple[str, Dict[str, object], int, str]) -> Tuple[str, Dict[str, object], int, Dict[str, object]]:
+    """
+    Runs a replication of a point in a worker process, the traces already read by the worker are reused.
+    The output of the simulator goes to the log file of the replication.
+    """
+    from models.metrics import MetricsCalculator
+    from parameters import SimulationConfig
+    from simulator import run_replication
+
+    key, point, replication, log_path = task
+    config = SimulationConfig.from_args(point_arguments(point))
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log):
+        metrics = run_replication(replication, MetricsCalculator(write_in_file=False, config=config), config)
+    return key, point, replication, metrics
+
+
+class Sweep:
+    """
+    Runs every point of a parameter grid, with its replications, across a pool of worker processes.
+
+    The result of each replication is stored in results_dir under the hash of its full parameter set and seed, so
+    running a sweep again only computes the replications whose parameters are new or changed.
+
+    Attributes
+    ----------
+    grid : Dict[str, list]
+        The values of each parameter, keyed by the simulator option without dashes.
+    replications : int
+        The number of replications of each point, replication i is seeded with replication_seed(i).
+    workers : int
+        The number of worker processes.
+    results_dir : str
+        The directory of the memoized results and of the simulator logs.
+    exclude : Callable[[Dict[str, object]], bool]
+        Returns True for the points of the grid not to run.
+    label : Callable[[Dict[str, object]], str]
+        Returns the label of a point, written in the label column of results.csv to group its replications
+        (experiments/scripts/compute_stats.py). The label is not part of the key of a result.
+    """
+
+    def __init__(self, grid: Dict[str, list], replications: int = 1, workers: int = None,
+                 results_dir: str = os.path.join("experiments", "sweep"),
+                 exclude: Callable[[Dict[str, object]], bool] = None,
+                 label: Callable[[Dict[str, object]], str] = point_label):
+        self.grid = grid
+        self.replications = replications
+        self.workers = os.cpu_count() if workers is None else workers
+        self.results_dir = results_dir
+        self.exclude = exclude
+        self.label = label
+
+    def run(self) -> List[Dict[str, object]]:
+        """
+        Computes the missing replications and writes every result of the grid to results.csv in results_dir.
+
+        Returns:
+            List[Dict[str, object]]: a row per replication, in grid order, with the label and the values of the point,
+            the replication and its metrics.
+        """
+        os.makedirs(self.results_dir, exist_ok=True)
+        points = [point for point in expand_grid(self.grid) if self.exclude is None or not self.exclude(point)]
+        keys: Dict[Tuple[int, int], str] = {}
+        tasks = []
+        for point_index, point in enumerate(points):
+            parameters = resolve_parameters(point)
+            for replication in range(self.replications):
+                key = replication_key(parameters, replication)
+                keys[(point_index, replication)] = key
+                if not os.path.isfile(self._result_path(key)):
+                    tasks.append((key, point, replication, os.path.join(self.results_dir, f"{key}.log")))
+        print(f"{len(tasks)} replications to run, {len(keys) - len(tasks)} already done")
+
+        if len(tasks) > 0:
+            with multiprocessing.Pool(processes=self.workers) as pool:
+                for done, (key, point, replication, metrics) in enumerate(pool.imap_unordered(_run_replication, tasks), 1):
+                    self._store(key, point, replication, metrics)
+                    print(f"{done}/{len(tasks)} - {point} replication {replication} done")
+
+        rows = []
+        for point_index, point in enumerate(points):
+            label = self.label(point)
+            for replication in range(self.replications):
+                with open(self._result_path(keys[(point_index, replication)])) as file:
+                    result = json.load(file)
+                rows.append({**point, "label": label, "replication": replication, **result["metrics"]})
+        self._write_rows(rows)
+        return rows
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, f"{key}.json")
+
+    def _store(self, key: str, point: Dict[str, object], replication: int, metrics: Dict[str, object]):
+        result = {"point": point, "replication": replication, "seed": replication_seed(replication), "metrics": metrics}
+        # written then renamed, an interrupted sweep never leaves a partial result
+        temporary_path = self._result_path(key) + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(result, file)
+        os.replace(temporary_path, self._result_path(key))
+
+    def _write_rows(self, rows: List[Dict[str, object]]):
+        if len(rows) == 0:
+            return
+        with open(os.path.join(self.results_dir, "results.csv"), "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
@@ -1,75 +1,228 @@
 import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
 from models.cache_manager import CacheManager
 from models.cache_worker import CacheWorker
+from models.enums.prefetcher_type import PrefetcherType
 from models.enums.user_category import UserCategory
-from models.metrics import MetricsCalculator
+from models.metrics import MetricsCalculator, Results
 from models.provider import Provider
+from models.scenario import Scenario, scenario_file, scenario_parameters
 from models.simulation_queue import SIMULATION_QUEUE
-from shared.helper import generate_edge_node_position, pass_time
+from models.simulation_kernel import SimulationKernel
+from models.trace_replay import TraceReplay
+from shared.helper import generate_edge_node_position
+from shared.spatial_index import SpatialIndex, index_edge_nodes
+from shared.RandomGenerator import random_generator
 from models.edge_node import EdgeNode
 from models.request_generator import RequestGenerator
 from models.user import User
 
-from parameters import AREA_DIMENSIONS, CACHE_NOT_FOUND_RESOURCE, EDGE_NODE_MIN_DISTANCE, ACCURACY, MODE, NEIGHBOR_EDGE_NODES, NUMBER_OF_EDGE_NODES, NUMBER_OF_PROVIDERS, NUMBER_OF_USERS, REPLICATIONS, USER_CATEGORY_DISTRIBUTION, WRITE_IN_FILE
+from parameters import SimulationConfig
 
 
-print(f"starting experiment with {ACCURACY} accuracy")
-print(f"Cache resources not found is {CACHE_NOT_FOUND_RESOURCE} and neighbor nodes are {NEIGHBOR_EDGE_NODES}. Mode is {MODE.value}")
-print(f"user distributions: id - {USER_CATEGORY_DISTRIBUTION[UserCategory.ID]}, location  - {USER_CATEGORY_DISTRIBUTION[UserCategory.LOCATION]}, type - {USER_CATEGORY_DISTRIBUTION[UserCategory.TYPE]}")
-if WRITE_IN_FILE:
-    print("*** WILL WRITE RESULTS INTO FILES ***")
-metrics_calculator = MetricsCalculator()
+def run_replication(replication: int, metrics_calculator: MetricsCalculator, config: SimulationConfig) -> dict:
+    """
+    Runs a replication of the experiment, seeded with the good seed of the replication.
 
-for i in range(REPLICATIONS):
+    Args:
+        replication (int): The index of the replication.
+        metrics_calculator (MetricsCalculator): The calculator collecting the metrics of the replication.
+        config (SimulationConfig): The parameters of the simulation.
+
+    Returns:
+        dict: The metrics of the replication to store.
+    """
     # 0. reset everything before the simulation
+    random_generator.set_replication(replication)
     metrics_calculator.reset()
     SIMULATION_QUEUE.reset()
-    # 1. Initialize users
-    users = [User(i) for i in range(NUMBER_OF_USERS)]
+    # a saved scenario replaces the generation of users, providers, requests and edge nodes
+    if config.scenario_path is not None and config.trace_path is not None:
+        raise ValueError("a scenario and a trace cannot be used together, both define the requests")
+    scenario = None
+    if config.scenario_path is not None:
+        parameters = scenario_parameters(config, replication)
+        scenario_path = scenario_file(config.scenario_path, replication)
+        if os.path.isfile(scenario_path):
+            scenario = Scenario.load(scenario_path, parameters)
+            now = datetime.datetime.now()
+            print(f"{now} - Scenario loaded from {scenario_path}")
+    # 1. Initialize users, the requests of a replayed trace come with their positions
+    replay = TraceReplay(config.trace_path) if config.trace_path is not None else None
+    generate = replay is None and scenario is None
+    users = [User(i, config=config) for i in range(config.number_of_users)] if generate else []
     now = datetime.datetime.now()
     print(f"{now} - All users created")
     # 2. Create providers
-    providers = [Provider(i) for i in range(NUMBER_OF_PROVIDERS)]
+    if scenario is None:
+        providers = [Provider(i, config=config) for i in range(config.number_of_providers)]
+    else:
+        providers = scenario.providers(config)
     now = datetime.datetime.now()
     print(f"{now} - All providers created")
 
     # 3. Assign requests to providers to each users (according to user category) for the experiment duration
-    request_generator = RequestGenerator(users, providers)
-    users = request_generator.users
-    for user in users:
-        print(f"user #{user.id} will make {len(user.requests)}")
-    now = datetime.datetime.now()
-    print(f"{now} - All requests assigned")
+    # the requests are streamed from the per-user generators, or from the trace
+    streaming = config.streaming_queue or replay is not None
+    if generate:
+        request_generator = RequestGenerator(users, providers, config=config)
+        users = request_generator.users
+        if not streaming:
+            for user in users:
+                print(f"user #{user.id} will make {len(user.requests)}")
+        now = datetime.datetime.now()
+        print(f"{now} - All requests assigned")
 
     # 4. Initialize Edge Nodes
-    edge_nodes = [EdgeNode(i) for i in range(NUMBER_OF_EDGE_NODES)]
-    for index, edge_node in enumerate(edge_nodes):
-        edge_position = generate_edge_node_position(AREA_DIMENSIONS, EDGE_NODE_MIN_DISTANCE, edge_nodes[:index])
-        edge_node.set_position(edge_position[0], edge_position[1])
+    if scenario is None:
+        edge_nodes = [EdgeNode(i, config=config) for i in range(config.number_of_edge_nodes)]
+        placed_edge_nodes = SpatialIndex(cell_size=max(config.edge_node_min_distance, 1))
+        for edge_node in edge_nodes:
+            edge_position = generate_edge_node_position(
+                config.area_dimensions, config.edge_node_min_distance, None, placed_edge_nodes)
+            edge_node.set_position(edge_position[0], edge_position[1])
+    else:
+        edge_nodes = scenario.edge_nodes(config)
+        scenario.restore_random_state()
     now = datetime.datetime.now()
     print(f"{now} - All edge nodes created")
 
     # 5. Initialize Cache Workers
-    cache_workers = [CacheWorker(i, edge_node, edge_nodes) for i, edge_node in enumerate(edge_nodes)]
+    edge_node_index = index_edge_nodes(edge_nodes)
+    cache_workers = [CacheWorker(i, edge_node, edge_nodes, config=config, spatial_index=edge_node_index)
+                     for i, edge_node in enumerate(edge_nodes)]
     now = datetime.datetime.now()
     print(f"{now} - All cache workers created")
 
-    cache_manager = CacheManager()
-    caching_orders = cache_manager.generate_caching_orders(users, cache_workers)
-    now = datetime.datetime.now()
-    print(f"{now} - Caching orders created")
-    for index, cache_worker_orders in enumerate(caching_orders):
-        cache_workers[index].add_caching_orders(cache_worker_orders)
+    if config.scenario_path is not None and scenario is None:
+        user_requests = request_generator.request_streams() if streaming else [user.requests for user in users]
+        scenario = Scenario.capture(parameters, users, user_requests, providers, edge_nodes, edge_node_index,
+                                    config.experiment_duration)
+        scenario.save(scenario_path)
+        now = datetime.datetime.now()
+        print(f"{now} - Scenario saved to {scenario_path}")
 
-    SIMULATION_QUEUE.sort_queue()
-    now = datetime.datetime.now()
-    print(f"{now} - Simulation Queue sorted")
-    total_number_of_requests = len(SIMULATION_QUEUE.queue)
-    for i, queue_element in enumerate(SIMULATION_QUEUE.queue):
-        pass_time(queue_element.time_epoch, queue_element.user, cache_workers, edge_nodes)
-        response = queue_element.cache_worker.request_data(queue_element.request, queue_element.time_epoch)
+    cache_manager = CacheManager(config=config)
+
+    def stream_simulation_queue():
+        # every call replays the same requests, merged by time from the per-user streams
+        if replay is not None:
+            return replay.queue_elements(providers, cache_workers, edge_node_index)
+        return SIMULATION_QUEUE.merge([
+            cache_manager.queue_elements(user, requests, cache_workers, edge_node_index)
+            for user, requests in zip(users, request_generator.request_streams())])
+
+    # in windowed mode the orders are generated while the kernel runs, a window ahead of it, and with the sketch
+    # prefetchers each cache worker issues its own orders instead of the oracle
+    oracle = config.prefetcher == PrefetcherType.ORACLE
+    windowed = oracle and cache_manager.time_window_size > 0
+    if oracle and not windowed:
+        if scenario is not None:
+            # the orders see the requests in the order of the run that saved the scenario
+            queue_elements = scenario.queue_elements(providers, cache_workers, time_order=streaming)
+            caching_orders = cache_manager.generate_caching_orders(
+                users, cache_workers, queue_elements, edge_node_index)
+        elif streaming:
+            # without prefetching there are no orders to generate, the requests are only streamed once
+            prefetching = cache_manager.accuracy > 0 or cache_manager.mobility_lookahead > 0
+            queue_elements = stream_simulation_queue() if prefetching else []
+            caching_orders = cache_manager.generate_caching_orders(
+                users, cache_workers, queue_elements, edge_node_index)
+        else:
+            caching_orders = cache_manager.generate_caching_orders(users, cache_workers, spatial_index=edge_node_index)
+        now = datetime.datetime.now()
+        print(f"{now} - Caching orders created, {cache_manager.collapsed_orders} redundant orders collapsed, "
+              f"{cache_manager.handover_requests} requests expected after a handover")
+        for index, cache_worker_orders in enumerate(caching_orders):
+            cache_workers[index].add_caching_orders(cache_worker_orders)
+
+    # the windowed orders predict the requests the whole-run orders predict: without streaming those draw in
+    # generation order, not in the time order of the simulation
+    predictions = None
+    if scenario is not None:
+        if windowed and not streaming:
+            predictions = cache_manager.predict_requests(
+                scenario.queue_elements(providers, cache_workers, time_order=False))
+        queue_elements = scenario.queue_elements(providers, cache_workers)
+        total_number_of_requests = len(scenario.request_times)
+    elif streaming:
+        queue_elements = stream_simulation_queue()
+        total_number_of_requests = "the streamed queue"
+    else:
+        if windowed:
+            # the requests are queued without generating their orders
+            predictions = cache_manager.predict_requests(
+                cache_manager.fill_simulation_queue(users, cache_workers, edge_node_index))
+        elif not oracle:
+            for _ in cache_manager.fill_simulation_queue(users, cache_workers, edge_node_index):
+                pass
+        SIMULATION_QUEUE.sort_queue()
+        now = datetime.datetime.now()
+        print(f"{now} - Simulation Queue sorted")
+        queue_elements = SIMULATION_QUEUE.queue
+        total_number_of_requests = len(SIMULATION_QUEUE.queue)
+    kernel = SimulationKernel(cache_workers, edge_nodes)
+    if windowed:
+        queue_elements = cache_manager.rolling_caching_orders(
+            queue_elements, cache_workers, kernel.add_caching_orders, edge_node_index, predictions)
+    for i, (queue_element, response) in enumerate(kernel.run(queue_elements)):
         metrics_calculator.add_request(response, queue_element.time_epoch)
         if i % 10000 == 0:
             print(f'{i} requests made from {total_number_of_requests}')
+    if windowed:
+        now = datetime.datetime.now()
+        print(f"{now} - Caching orders created per window, {cache_manager.collapsed_orders} redundant orders collapsed, "
+              f"{cache_manager.handover_requests} requests expected after a handover")
+
+    if scenario is not None:
+        metrics_calculator.calculate_metrics(cache_workers, providers, handovers=scenario.handovers.tolist())
+    else:
+        metrics_calculator.calculate_metrics(
+            cache_workers, providers, users if replay is None else None, edge_node_index)
+
+    return metrics_calculator.to_store
+
+
+def run_replication_in_worker(replication: int, config: SimulationConfig) -> dict:
+    """
+    Runs a replication in a worker process, the results are written by the main process in replication order.
+    """
+    return run_replication(replication, MetricsCalculator(write_in_file=False, config=config), config)
+
+
+def run_simulation(config: SimulationConfig) -> Results:
+    """
+    Runs the replications of an experiment, in config.workers processes, and writes their results if
+    config.write_in_file.
+
+    Args:
+        config (SimulationConfig): The parameters of the simulation.
+
+    Returns:
+        Results: The metrics of each replication, in replication order.
+    """
+    print(f"starting experiment with {config.accuracy} accuracy")
+    print(f"Cache resources not found is {config.cache_not_found_resource} and neighbor nodes are {config.neighbor_edge_nodes}. Mode is {config.mode.value}")
+    print(f"user distributions: id - {config.user_category_distribution[UserCategory.ID]}, location  - {config.user_category_distribution[UserCategory.LOCATION]}, type - {config.user_category_distribution[UserCategory.TYPE]}")
+    if config.write_in_file:
+        print("*** WILL WRITE RESULTS INTO FILES ***")
+    metrics_calculator = MetricsCalculator(config=config)
+
+    replications: List[dict] = []
+    if config.workers <= 1:
+        for replication in range(config.replications):
+            replications.append(run_replication(replication, metrics_calculator, config).copy())
+    else:
+        with ProcessPoolExecutor(max_workers=config.workers) as executor:
+            for to_store in executor.map(
+                    run_replication_in_worker, range(config.replications), [config] * config.replications):
+                metrics_calculator.to_store = to_store
+                metrics_calculator.write_results()
+                replications.append(to_store)
+    return Results(config, replications)
+
 
-    metrics_calculator.calculate_metrics(cache_workers, providers)
+if __name__ == '__main__':
+    run_simulation(SimulationConfig.from_args())
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import unittest
+from types import SimpleNamespace
+
+from models.admission_filter import TinyLFUAdmissionFilter
+from models.metrics import MetricsCalculator
+from shared.sketches import BloomFilter, CountMinSketch
+
+
+class TestSketches(unittest.TestCase):
+
+    def test_bloom_filter(self):
+        bloom_filter = BloomFilter(1024)
+        bloom_filter.add("a")
+
+        self.assertIn("a", bloom_filter)
+        self.assertNotIn("b", bloom_filter)
+
+        bloom_filter.clear()
+        self.assertNotIn("a", bloom_filter)
+
+    def test_count_min_sketch_saturates_and_halves(self):
+        sketch = CountMinSketch(256)
+        for _ in range(20):
+            sketch.increment("a")
+        sketch.increment("b")
+
+        self.assertEqual(sketch.estimate("a"), 15)
+        self.assertEqual(sketch.estimate("b"), 1)
+
+        sketch.halve()
+        self.assertEqual(sketch.estimate("a"), 7)
+        self.assertEqual(sketch.estimate("b"), 0)
+
+
+class TestTinyLFUAdmissionFilter(unittest.TestCase):
+
+    def test_admits_only_more_popular_candidates(self):
+        admission_filter = TinyLFUAdmissionFilter(width=256)
+        for _ in range(3):
+            admission_filter.record("popular")
+        admission_filter.record("one-hit")
+
+        self.assertEqual(admission_filter.estimate("popular"), 3)
+        self.assertEqual(admission_filter.estimate("one-hit"), 1)
+        self.assertTrue(admission_filter.admit("popular", "one-hit"))
+        self.assertFalse(admission_filter.admit("one-hit", "popular"))
+        self.assertFalse(admission_filter.admit("one-hit", "one-hit"))
+
+    def test_aging(self):
+        admission_filter = TinyLFUAdmissionFilter(width=256, sample_size=10)
+        for _ in range(9):
+            admission_filter.record("a")
+        self.assertEqual(admission_filter.estimate("a"), 9)
+
+        admission_filter.record("b")
+
+        # the sketch is halved, the doorkeeper cleared
+        self.assertEqual(admission_filter.estimate("a"), 4)
+        self.assertEqual(admission_filter.estimate("b"), 0)
+        self.assertEqual(admission_filter.samples, 5)
+
+
+class TestAdmissionMetrics(unittest.TestCase):
+
+    def test_the_admission_counts_are_stored_with_the_metrics(self):
+        cache_workers = [SimpleNamespace(id=i, total_requests=10, cached_requests=5, prefetched_bytes=0,
+                                         admission_filter=object(), admitted_resources=admitted,
+                                         rejected_resources=rejected, get_cache_hit_rate=lambda: 0.5)
+                         for i, (admitted, rejected) in enumerate([(3, 4), (2, 0)])]
+        metrics_calculator = MetricsCalculator(write_in_file=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            metrics_calculator.calculate_cache_worker_metrics(cache_workers)
+
+        self.assertEqual(metrics_calculator.to_store["admitted_resources"], 5)
+        self.assertEqual(metrics_calculator.to_store["rejected_resources"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
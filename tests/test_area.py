@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from models.area import SubareaGrid
+
+
+class TestSubareaGrid(unittest.TestCase):
+
+    def test_grids_closest_to_a_square(self):
+        self.assertEqual((SubareaGrid.divide(10, 4).columns, SubareaGrid.divide(10, 4).rows), (2, 2))
+        self.assertEqual((SubareaGrid.divide(10, 5).columns, SubareaGrid.divide(10, 5).rows), (5, 1))
+        self.assertEqual((SubareaGrid.divide(10, 6).columns, SubareaGrid.divide(10, 6).rows), (3, 2))
+
+    def test_every_position_is_in_the_area_of_its_id(self):
+        for portions in [4, 5, 7, 12, 300]:
+            grid = SubareaGrid.divide(1001, portions)
+            points = np.random.default_rng(portions).uniform(0, 1001, (2000, 2))
+            points[:4] = [(0, 0), (1000.999, 1000.999), (grid.x_edges[1], 0), (0, grid.y_edges[-2])]
+
+            for point, area_id in zip(points.tolist(), grid.area_ids(points).tolist()):
+                area = grid[area_id]
+                self.assertTrue(area.x1 <= point[0] < area.x2 and area.y1 <= point[1] < area.y2)
+            self.assertEqual(len(grid), portions)
+
+    def test_rectangular_partitions(self):
+        grid = SubareaGrid(40, 10, 4, 2)
+
+        self.assertEqual(grid.area_ids([(5, 2), (15, 2), (35, 7), (10, 5)]).tolist(), [0, 1, 7, 5])
+        self.assertEqual(grid.find((39.5, 9.5)).id, 7)
+        # out of the area, in the nearest border subarea
+        self.assertEqual(grid.find((-1, 20)).id, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from models.enums.user_category import UserCategory
+from models.provider import Provider
+from models.request_generator import RequestGenerator
+from models.user import User
+from parameters import SimulationConfig
+from shared.RandomGenerator import random_generator
+
+
+def request_list(requests):
+    return [(request.execution_time, request.provider.index) for request in requests]
+
+
+class TestBatchedRequests(unittest.TestCase):
+
+    def setUp(self):
+        random_generator.set_replication(0)
+        self.config = SimulationConfig(
+            number_of_users=6, number_of_providers=50, experiment_duration=600000, rate_of_event=0.001,
+            batched_requests=True)
+        self.users = [User(i, config=self.config) for i in range(self.config.number_of_users)]
+        self.providers = [Provider(i, config=self.config) for i in range(self.config.number_of_providers)]
+
+    def test_the_stored_and_the_streamed_requests_are_the_same(self):
+        request_generator = RequestGenerator(self.users, self.providers, config=self.config)
+        streams = request_generator.request_streams()
+
+        for user, stream in zip(self.users, streams):
+            requests = request_list(user.requests)
+            self.assertGreater(len(requests), 0)
+            self.assertEqual(request_list(stream), requests)
+            times = [time for time, _ in requests]
+            self.assertTrue(all(0 < later - earlier for earlier, later in zip([0] + times, times)))
+            self.assertLess(times[-1], self.config.experiment_duration)
+
+    def test_providers_follow_the_truncated_zipf_distribution(self):
+        request_generator = RequestGenerator(
+            self.users, self.providers, config=self.config.replace(streaming_queue=True))
+
+        indexes = request_generator.sample_provider_indexes(200000, np.random.default_rng(1))
+
+        self.assertEqual(indexes.min(), 1)
+        self.assertLess(indexes.max(), len(self.providers))
+        frequencies = np.bincount(indexes, minlength=len(self.providers))[1:] / len(indexes)
+        probabilities = np.diff(np.concatenate(([0], request_generator.provider_cdf)))
+        np.testing.assert_allclose(frequencies[:5], probabilities[:5], rtol=0.02)
+
+
+class TestPopularityRankings(unittest.TestCase):
+
+    def test_rankings_are_only_built_for_the_categories_of_the_users(self):
+        random_generator.set_replication(0)
+        config = SimulationConfig(
+            number_of_users=4, number_of_providers=30, experiment_duration=1000, user_category_distribution={
+                UserCategory.ID: 0, UserCategory.TYPE: 1, UserCategory.LOCATION: 0})
+        users = [User(i, config=config) for i in range(config.number_of_users)]
+        providers = [Provider(i, config=config) for i in range(config.number_of_providers)]
+
+        request_generator = RequestGenerator(users, providers, config=config)
+
+        self.assertIsNone(request_generator.popularity[UserCategory.ID.value])
+        self.assertIsNone(request_generator.popularity[UserCategory.LOCATION.value])
+        rankings = request_generator.popularity[UserCategory.TYPE.value]
+        self.assertEqual(rankings.dtype, np.int32)
+        self.assertEqual(rankings.shape, (config.number_of_user_types, len(providers)))
+        for ranking in rankings:
+            self.assertEqual(sorted(ranking.tolist()), list(range(len(providers))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+
+from models.cache import Cache
+from models.enums.cache_replacement_strategy import CacheReplacementStrategy
+from models.resource import Resource
+
+
+class TestCache(unittest.TestCase):
+
+    def test_get_resource_updates_counters(self):
+        cache = Cache(100)
+        cache.add_resource(Resource("a", 10, expiration_time=1000), 0)
+
+        self.assertIsNone(cache.get_resource("b", 1))
+        resource = cache.get_resource("a", 2)
+
+        self.assertEqual(resource.provider_id, "a")
+        self.assertEqual(resource.frequency, 1)
+        self.assertEqual(resource.last_time_retrieved, 2)
+        self.assertEqual(cache.request_received, 2)
+        self.assertEqual(cache.cache_hits, 1)
+        self.assertEqual(cache.current_size_bytes, 10)
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = Cache(30)
+        for time, provider_id in enumerate(["a", "b", "c"]):
+            cache.add_resource(Resource(provider_id, 10, expiration_time=1000), time)
+        cache.get_resource("a", 3)
+
+        cache.add_resource(Resource("d", 10, expiration_time=1000), 4)
+
+        self.assertEqual([resource.provider_id for resource in cache.resources], ["c", "a", "d"])
+        self.assertEqual(cache.current_size_bytes, 30)
+        # "b" was never retrieved
+        self.assertEqual(cache.cache_misses, 1)
+
+    def test_lru_evicts_until_resource_fits(self):
+        cache = Cache(30)
+        for time, provider_id in enumerate(["a", "b", "c"]):
+            cache.add_resource(Resource(provider_id, 10, expiration_time=1000), time)
+
+        cache.add_resource(Resource("d", 25, expiration_time=1000), 3)
+
+        self.assertEqual([resource.provider_id for resource in cache.resources], ["d"])
+        self.assertEqual(cache.current_size_bytes, 25)
+
+    def test_duplicated_provider_returns_oldest_copy(self):
+        cache = Cache(100)
+        first = Resource("a", 10, expiration_time=100)
+        second = Resource("a", 20, expiration_time=200)
+        cache.add_resource(first, 0)
+        cache.add_resource(second, 1)
+
+        self.assertIs(cache.get_resource("a", 2), first)
+        self.assertEqual(cache.current_size_bytes, 30)
+
+        cache.epoch_passed(150)
+
+        self.assertIs(cache.get_resource("a", 150), second)
+        self.assertEqual(cache.current_size_bytes, 20)
+
+    def test_epoch_removes_only_expired_resources(self):
+        cache = Cache(30)
+        cache.add_resource(Resource("a", 10, expiration_time=100), 0)
+        cache.add_resource(Resource("b", 10, expiration_time=50), 1)
+        cache.add_resource(Resource("c", 10, expiration_time=200), 2)
+
+        # a resource is still valid at its expiration time
+        cache.epoch_passed(50)
+        self.assertEqual(cache.current_size_bytes, 30)
+
+        cache.epoch_passed(101)
+        self.assertEqual([resource.provider_id for resource in cache.resources], ["c"])
+        self.assertEqual(cache.current_size_bytes, 10)
+
+    def test_epoch_skips_evicted_resources(self):
+        cache = Cache(20)
+        cache.add_resource(Resource("a", 10, expiration_time=100), 0)
+        cache.add_resource(Resource("b", 10, expiration_time=300), 1)
+        cache.add_resource(Resource("c", 10, expiration_time=300), 2)
+
+        cache.epoch_passed(200)
+
+        self.assertEqual([resource.provider_id for resource in cache.resources], ["b", "c"])
+        self.assertEqual(cache.current_size_bytes, 20)
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = Cache(30, CacheReplacementStrategy.LFU)
+        for time, provider_id in enumerate(["a", "b", "c"]):
+            cache.add_resource(Resource(provider_id, 10, expiration_time=1000), time)
+        cache.get_resource("a", 3)
+        cache.get_resource("b", 4)
+        cache.get_resource("a", 5)
+
+        cache.add_resource(Resource("d", 10, expiration_time=1000), 6)
+        self.assertEqual(sorted(resource.provider_id for resource in cache.resources), ["a", "b", "d"])
+
+        # "b" and "d" share the lowest frequency once "d" is retrieved, "b" was stored first
+        cache.get_resource("d", 7)
+        cache.add_resource(Resource("e", 10, expiration_time=1000), 8)
+        self.assertEqual(sorted(resource.provider_id for resource in cache.resources), ["a", "d", "e"])
+        self.assertEqual(cache.current_size_bytes, 30)
+
+    def test_lfu_breaks_ties_on_storage_time(self):
+        cache = Cache(30, CacheReplacementStrategy.LFU)
+        cache.add_resource(Resource("a", 10, expiration_time=1000), 5)
+        cache.add_resource(Resource("b", 10, expiration_time=1000), 2)
+        cache.add_resource(Resource("c", 10, expiration_time=1000), 2)
+
+        cache.add_resource(Resource("d", 10, expiration_time=1000), 6)
+
+        self.assertEqual(sorted(resource.provider_id for resource in cache.resources), ["a", "c", "d"])
+
+    def test_lfu_after_expiration(self):
+        cache = Cache(30, CacheReplacementStrategy.LFU)
+        cache.add_resource(Resource("a", 10, expiration_time=10), 0)
+        cache.add_resource(Resource("b", 10, expiration_time=1000), 1)
+        cache.add_resource(Resource("c", 10, expiration_time=1000), 2)
+        cache.get_resource("b", 3)
+        cache.get_resource("c", 4)
+
+        cache.epoch_passed(20)
+        cache.add_resource(Resource("d", 10, expiration_time=1000), 20)
+        cache.add_resource(Resource("e", 10, expiration_time=1000), 21)
+
+        self.assertEqual(sorted(resource.provider_id for resource in cache.resources), ["b", "c", "e"])
+
+    def test_resource_bigger_than_cache_is_not_stored(self):
+        cache = Cache(10)
+        cache.add_resource(Resource("a", 11, expiration_time=1000), 0)
+
+        self.assertEqual(cache.resources, [])
+        self.assertEqual(cache.current_size_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
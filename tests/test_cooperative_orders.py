@@ -0,0 +1,133 @@
+import random
+import unittest
+
+from models.cache_manager import CacheManager
+from models.cache_worker import CacheWorker
+from models.caching_order import CachingOrder
+from models.cooperative_order_index import CooperativeOrderIndex
+from models.edge_node import EdgeNode
+from models.enums.order_type import OrderType
+from models.provider import Provider
+from shared.interval_index import IntervalIndex
+
+
+def is_redundant(order, caching_orders):
+    """
+    The linear scan the redundant orders were removed with, the reference of CacheManager.remove_redundant_cache_orders.
+    """
+    for caching_order in caching_orders:
+        if order.provider.id == caching_order.provider.id and order.request_execution_time > caching_order.execution_time and order.request_execution_time < caching_order.expiration_time and not order.is_cooperator_pointer:
+            return True
+    return False
+
+
+class TestIntervalIndex(unittest.TestCase):
+
+    def test_first_open_at_matches_a_linear_scan(self):
+        generator = random.Random(3)
+        starts = sorted(generator.randint(0, 1000) for _ in range(200))
+        ends = [start + generator.randint(0, 100) for start in starts]
+        index = IntervalIndex(starts, ends)
+        removed = set(generator.sample(range(200), 50))
+        for position in removed:
+            index.remove(position)
+
+        for time in range(-5, 1110, 7):
+            expected = next((position for position in range(200) if position not in removed
+                             and starts[position] < time < ends[position]), -1)
+            self.assertEqual(index.first_open_at(time), expected)
+
+    def test_unsorted_starts_are_rejected(self):
+        with self.assertRaises(ValueError):
+            IntervalIndex([2, 1], [3, 3])
+
+
+class TestCooperativeOrders(unittest.TestCase):
+
+    def setUp(self):
+        self.edge_nodes = [EdgeNode(i, cache_size=100) for i in range(4)]
+        for edge_node in self.edge_nodes:
+            edge_node.set_position(edge_node.id * 100, 0)
+        self.cache_workers = [CacheWorker(i, edge_node, self.edge_nodes, neighbor_edge_nodes=0)
+                              for i, edge_node in enumerate(self.edge_nodes)]
+        self.providers = [Provider(i) for i in range(3)]
+
+    def random_orders(self, generator):
+        caching_orders_per_cache_worker = []
+        for cache_worker in self.cache_workers:
+            orders = []
+            for _ in range(60):
+                request_time = generator.randint(0, 2000)
+                execution_time = max(request_time - generator.randint(1, 300), 0)
+                orders.append(CachingOrder(
+                    cache_worker.id, execution_time, request_time + generator.randint(0, 400),
+                    generator.choice(self.providers), request_execution_time=request_time))
+            caching_orders_per_cache_worker.append(sorted(orders, key=lambda order: order.execution_time))
+        return caching_orders_per_cache_worker
+
+    def cooperate(self, caching_orders_per_cache_worker, indexed):
+        cache_manager = CacheManager(accuracy=1)
+        order_index = CooperativeOrderIndex(caching_orders_per_cache_worker) if indexed else None
+        for cache_worker_index, cache_worker_orders in enumerate(caching_orders_per_cache_worker):
+            for order in cache_worker_orders:
+                cache_manager.check_cooperative_cache_order(
+                    order, caching_orders_per_cache_worker, cache_worker_index, self.cache_workers, order_index)
+        return [[(order.type, order.cooperator_edge_node, order.expiration_time, order.is_cooperator_pointer)
+                 for order in cache_worker_orders] for cache_worker_orders in caching_orders_per_cache_worker]
+
+    def test_the_index_finds_the_first_order_of_the_first_other_cache_worker(self):
+        provider = self.providers[0]
+        # (cache worker, execution time, expiration time), per cache worker in execution order
+        orders = [CachingOrder(cache_worker_id, execution_time, expiration_time, provider)
+                  for cache_worker_id, execution_time, expiration_time in
+                  [(1, 5, 8), (1, 10, 50), (1, 12, 60), (2, 0, 100), (3, 1, 100)]]
+        orders.append(CachingOrder(3, 2, 100, self.providers[1]))
+        order_index = CooperativeOrderIndex(
+            [[order for order in orders if order.cache_worker_id == cache_worker_id] for cache_worker_id in range(4)])
+
+        def find(cache_worker_index, time):
+            found = order_index.find(CachingOrder(cache_worker_index, 0, 100, provider, request_execution_time=time),
+                                     cache_worker_index)
+            return None if found is None else (found[0], found[1].execution_time)
+
+        self.assertEqual(find(0, 20), (1, 10))
+        self.assertEqual(find(0, 7), (1, 5))
+        self.assertEqual(find(0, 9), (2, 0))
+        self.assertEqual(find(1, 20), (2, 0))
+        self.assertEqual(find(2, 55), (1, 12))
+        self.assertIsNone(find(0, 150))
+        order_index.remove(orders[1])
+        self.assertEqual(find(0, 20), (1, 12))
+        order_index.remove(orders[2])
+        order_index.remove(orders[3])
+        self.assertEqual(find(0, 20), (3, 1))
+
+    def test_the_index_finds_the_same_cooperators_as_the_scan(self):
+        for seed in range(5):
+            scanned = self.cooperate(self.random_orders(random.Random(seed)), False)
+            indexed = self.cooperate(self.random_orders(random.Random(seed)), True)
+
+            self.assertEqual(indexed, scanned)
+            self.assertTrue(any(order[0] == OrderType.COOPERATIVE for orders in indexed for order in orders))
+
+    def test_the_sweep_removes_the_same_redundant_orders_as_the_scan(self):
+        cache_manager = CacheManager(accuracy=1)
+        for seed in range(5):
+            caching_orders_per_cache_worker = self.random_orders(random.Random(seed))
+            self.cooperate(caching_orders_per_cache_worker, True)
+            cache_manager.collapsed_orders = 0
+            redundant_orders = 0
+            for cache_worker_orders in caching_orders_per_cache_worker:
+                scanned = []
+                for order in cache_worker_orders:
+                    if not is_redundant(order, scanned):
+                        scanned.append(order)
+                redundant_orders += len(cache_worker_orders) - len(scanned)
+
+                self.assertEqual(cache_manager.remove_redundant_cache_orders(cache_worker_orders), scanned)
+            self.assertEqual(cache_manager.collapsed_orders, redundant_orders)
+            self.assertGreater(redundant_orders, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
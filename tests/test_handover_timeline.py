@@ -0,0 +1,101 @@
+import random
+import unittest
+
+import numpy as np
+
+from models.cache_manager import CacheManager
+from models.cache_worker import CacheWorker
+from models.edge_node import EdgeNode
+from models.enums.cache_manager_node import CacheManagerMode
+from models.handover_timeline import HandoverTimeline
+from models.provider import Provider
+from models.queue_element import QueueElement
+from models.request import Request
+from models.trajectory import Trajectory
+from models.user import User
+from shared.spatial_index import SpatialIndex
+
+
+class TestHandoverTimeline(unittest.TestCase):
+
+    def test_handovers_on_a_straight_path(self):
+        spatial_index = SpatialIndex([(0, 0), (10, 0), (20, 0)])
+        trajectory = Trajectory((0.0, 1.0), [(20.0, 1.0), (0.0, 1.0)], speed=1)
+        timeline = HandoverTimeline(trajectory, spatial_index)
+
+        self.assertEqual(timeline.cache_worker_at(1), 0)
+        self.assertEqual(timeline.cache_worker_at(12), 1)
+        self.assertEqual(timeline.cache_worker_at(19), 2)
+        self.assertEqual(timeline.enter_times[:3], [0.0, 5.0, 15.0])
+        self.assertEqual(timeline.cache_worker_indexes[:3], [0, 1, 2])
+        # 20 ms to the first waypoint, then a 40 ms loop with 4 handovers
+        self.assertEqual(timeline.handovers(20), 2)
+        self.assertEqual(timeline.handovers(60), 6)
+        self.assertEqual(timeline.handovers(100), 10)
+        self.assertEqual(timeline.cache_worker_at(72), 1)
+
+    def test_next_handover_within_the_horizon(self):
+        spatial_index = SpatialIndex([(0, 0), (10, 0), (20, 0)])
+        trajectory = Trajectory((0.0, 1.0), [(20.0, 1.0), (0.0, 1.0)], speed=1)
+        timeline = HandoverTimeline(trajectory, spatial_index)
+
+        self.assertEqual(timeline.next_handover(1, 10), (5.0, 1))
+        self.assertIsNone(timeline.next_handover(16, 5))
+        self.assertEqual(timeline.next_handover(16, 10), (25.0, 1))
+        # the handovers after the end of the path are the ones of the loop
+        self.assertIsNone(timeline.next_handover(58, 6))
+        self.assertEqual(timeline.next_handover(58, 7), (65.0, 1))
+        self.assertEqual(timeline.next_handover(98, 7), (105.0, 1))
+
+    def test_the_timeline_matches_the_nearest_cache_worker(self):
+        generator = random.Random(3)
+        spatial_index = SpatialIndex([(generator.randint(0, 1000), generator.randint(0, 1000)) for _ in range(40)])
+        waypoints = [(float(generator.randint(0, 999)), float(generator.randint(0, 999))) for _ in range(5)]
+        trajectory = Trajectory((500.0, 500.0), waypoints, speed=2)
+        timeline = HandoverTimeline(trajectory, spatial_index)
+
+        for time in np.linspace(0, 3 * trajectory.times[-1], 5000).round():
+            self.assertEqual(timeline.cache_worker_at(time), spatial_index.nearest(trajectory.position_at(time)))
+
+
+class TestMobilityLookahead(unittest.TestCase):
+
+    def setUp(self):
+        edge_nodes = [EdgeNode(i, cache_size=100) for i in range(2)]
+        for edge_node in edge_nodes:
+            edge_node.set_position(edge_node.id * 100, 0)
+        self.cache_workers = [CacheWorker(i, edge_node, edge_nodes, neighbor_edge_nodes=0)
+                              for i, edge_node in enumerate(edge_nodes)]
+        self.user = User(0, start_position=(0.0, 0.0), speed=0.3, waypoints=1)
+        # the user crosses the bisector of the two edge nodes, x = 50, at 50 / 0.3 = 166.67 ms
+        self.user.trajectory = Trajectory((0.0, 0.0), [(100.0, 0.0), (0.0, 0.0)], speed=0.3)
+        self.request = Request(100, Provider(0))
+
+    def caching_orders(self, mobility_lookahead, user):
+        cache_manager = CacheManager(accuracy=1, average_pre_request_time=10, std_pre_request_time=0,
+                                     mode=CacheManagerMode.STANDARD_ONLY, mobility_lookahead=mobility_lookahead)
+        queue_elements = [QueueElement(self.request, user, self.request.execution_time, self.cache_workers[0])]
+        caching_orders = cache_manager.generate_caching_orders([], self.cache_workers, queue_elements)
+        return cache_manager, [[(order.execution_time, order.request_execution_time, order.provider)
+                                for order in orders] for orders in caching_orders]
+
+    def test_the_next_cache_worker_expects_the_request_at_the_handover(self):
+        cache_manager, caching_orders = self.caching_orders(100, self.user)
+
+        self.assertEqual(caching_orders[1], [(157, 167, self.request.provider)])
+        self.assertEqual(caching_orders[0], [(90, 100, self.request.provider)])
+        self.assertEqual(cache_manager.handover_requests, 1)
+
+    def test_no_request_is_expected_beyond_the_lookahead_or_without_a_user(self):
+        _, without_lookahead = self.caching_orders(0, self.user)
+        _, short_lookahead = self.caching_orders(50, self.user)
+        cache_manager, user_id = self.caching_orders(100, self.user.id)
+
+        self.assertEqual(without_lookahead, [[(90, 100, self.request.provider)], []])
+        self.assertEqual(short_lookahead, without_lookahead)
+        self.assertEqual(user_id, without_lookahead)
+        self.assertEqual(cache_manager.handover_requests, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from models.enums.cache_manager_node import CacheManagerMode
+from models.enums.cache_replacement_strategy import CacheReplacementStrategy
+from models.enums.prefetcher_type import PrefetcherType
+from parameters import SimulationConfig
+
+
+class TestSimulationConfig(unittest.TestCase):
+
+    def test_defaults_are_the_command_line_defaults(self):
+        config = SimulationConfig()
+
+        self.assertEqual(config.number_of_users, 500)
+        self.assertEqual(config.replacement_strategy, CacheReplacementStrategy.LRU)
+        self.assertEqual(config.mode, CacheManagerMode.STANDARD_ONLY)
+
+    def test_from_args_converts_the_options(self):
+        config = SimulationConfig.from_args(["--cache-mode", "cooperative", "--replacement-strategy", "GDSF"])
+
+        self.assertEqual(config.mode, CacheManagerMode.COOPERATIVE)
+        self.assertEqual(config.replacement_strategy, CacheReplacementStrategy.GDSF)
+
+    def test_overrides(self):
+        config = SimulationConfig(accuracy=0.4)
+        other = config.replace(accuracy=0.1)
+
+        self.assertEqual(config.accuracy, 0.4)
+        self.assertEqual(other.accuracy, 0.1)
+        with self.assertRaises(TypeError):
+            SimulationConfig(acuracy=0.4)
+
+    def test_the_mobility_lookahead_needs_the_oracle_prefetcher(self):
+        config = SimulationConfig(mobility_lookahead=5000)
+
+        with self.assertRaises(ValueError):
+            SimulationConfig.from_args(["--prefetcher", "sketch", "--mobility-lookahead", "5000"])
+        with self.assertRaises(ValueError):
+            config.replace(prefetcher=PrefetcherType.SKETCH)
+        self.assertEqual(config.replace(mobility_lookahead=0, prefetcher=PrefetcherType.SKETCH).mobility_lookahead, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
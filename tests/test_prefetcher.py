@@ -0,0 +1,57 @@
+import unittest
+
+from models.cache_worker import CacheWorker
+from models.edge_node import EdgeNode
+from models.enums.prefetcher_type import PrefetcherType
+from models.prefetcher import SketchPrefetcher
+from models.provider import Provider
+from models.request import Request
+from models.resource import Resource
+
+
+class TestSketchPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.providers = [Provider(i) for i in range(6)]
+
+    def test_the_most_requested_providers_are_prefetched(self):
+        prefetcher = SketchPrefetcher(top_k=2, interval=100, width=64)
+        for provider, requests in zip(self.providers, [1, 9, 2, 7, 1, 3]):
+            for _ in range(requests):
+                prefetcher.record(provider)
+
+        self.assertEqual(prefetcher.top_providers(), [self.providers[1], self.providers[3]])
+        self.assertLessEqual(len(prefetcher.candidates), 8)
+
+    def test_aging_halves_the_estimates(self):
+        prefetcher = SketchPrefetcher(top_k=1, interval=100, width=64, sample_size=8)
+        for _ in range(7):
+            prefetcher.record(self.providers[0])
+        prefetcher.record(self.providers[1])
+
+        self.assertEqual(prefetcher.candidates[self.providers[0].id][0], 3)
+        self.assertEqual(prefetcher.sketch.estimate(self.providers[0].id), 3)
+        self.assertEqual(prefetcher.samples, 4)
+
+    def test_prefetches_are_due_once_per_interval(self):
+        prefetcher = SketchPrefetcher(top_k=1, interval=100)
+
+        self.assertEqual([prefetcher.due(time) for time in [10, 50, 110, 150, 209, 210]],
+                         [False, False, True, False, False, True])
+
+    def test_the_cache_worker_orders_the_providers_it_does_not_store(self):
+        edge_node = EdgeNode(0, cache_size=1e9)
+        edge_node.set_position(0, 0)
+        cache_worker = CacheWorker(0, edge_node, [edge_node], neighbor_edge_nodes=0, prefetcher=PrefetcherType.SKETCH)
+        cache_worker.prefetcher = SketchPrefetcher(top_k=2, interval=100, width=64)
+        edge_node.cache.add_resource(Resource(self.providers[1].id, 10, 0, 10000), 0)
+        for time, provider in enumerate([self.providers[0], self.providers[1], self.providers[0]]):
+            cache_worker.request_data(Request(time, provider), time)
+
+        cache_worker.request_data(Request(150, self.providers[2]), 150)
+
+        self.assertEqual([order.provider for order in cache_worker.pending_orders], [self.providers[0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,215 @@
+import random
+import unittest
+
+from models.cache import Cache
+from models.enums.cache_replacement_strategy import CacheReplacementStrategy
+from models.enums.gdsf_cost import GDSFCost
+from models.replacement_policies.frequency_buckets import FrequencyBuckets
+from models.replacement_policies.gdsf_policy import GDSFPolicy
+from models.resource import Resource
+
+
+def stored_providers(cache: Cache):
+    return sorted(resource.provider_id for resource in cache.resources)
+
+
+def request(cache: Cache, provider_id: str, time: int, size: int = 10):
+    """
+    Retrieves the provider resource from the cache, storing it if it is not found.
+    """
+    if cache.get_resource(provider_id, time) is None:
+        cache.add_resource(Resource(provider_id, size, expiration_time=100000), time)
+
+
+def hot_hits_after_scans(strategy: CacheReplacementStrategy) -> int:
+    """
+    Interleaves a hot set of 4 resources, requested twice in a row, with scans of 10 one-hit wonders
+    in a cache holding 10 resources, and returns how many hot resources are still cached at the end.
+    """
+    cache = Cache(100, strategy)
+    time = 0
+    for _ in range(3):
+        for _ in range(2):
+            for provider_id in ["h0", "h1", "h2", "h3"]:
+                request(cache, provider_id, time)
+                time += 1
+        for scanned in range(10):
+            request(cache, f"scan-{time}-{scanned}", time)
+            time += 1
+    hits = cache.cache_hits
+    for provider_id in ["h0", "h1", "h2", "h3"]:
+        cache.get_resource(provider_id, time)
+    return cache.cache_hits - hits
+
+
+class TestReplacementPolicies(unittest.TestCase):
+
+    def test_every_strategy_respects_cache_size(self):
+        for strategy in CacheReplacementStrategy:
+            cache = Cache(50, strategy)
+            for time in range(200):
+                request(cache, str(time % 13), time, size=5 + time % 7)
+                self.assertLessEqual(cache.current_size_bytes, cache.max_size_bytes, strategy)
+                self.assertEqual(cache.current_size_bytes, sum(resource.size for resource in cache.resources))
+
+    def test_every_strategy_handles_expired_resources(self):
+        for strategy in CacheReplacementStrategy:
+            cache = Cache(30, strategy)
+            cache.add_resource(Resource("a", 10, expiration_time=10), 0)
+            cache.add_resource(Resource("b", 10, expiration_time=1000), 1)
+            cache.get_resource("a", 2)
+            cache.epoch_passed(20)
+            for time, provider_id in enumerate(["c", "d", "e"], start=20):
+                cache.add_resource(Resource(provider_id, 10, expiration_time=1000), time)
+
+            self.assertNotIn("a", stored_providers(cache), strategy)
+            self.assertEqual(cache.current_size_bytes, 30, strategy)
+
+    def test_victim_is_the_next_evicted_resource(self):
+        # S3-FIFO is left out: reinsertions may make evict go past the head of its queues
+        for strategy in [CacheReplacementStrategy.LRU, CacheReplacementStrategy.LFU, CacheReplacementStrategy.ARC,
+                         CacheReplacementStrategy.TWO_QUEUE, CacheReplacementStrategy.LIRS,
+                         CacheReplacementStrategy.GDSF]:
+            cache = Cache(50, strategy)
+            for time in range(100):
+                request(cache, str(time % 9), time)
+            incoming = Resource("incoming", 10, expiration_time=100000)
+            victim = cache.get_eviction_candidate(incoming)
+
+            self.assertIs(cache.replacement_policy.evict(incoming), victim, strategy)
+
+    def test_scan_resistant_strategies_keep_hot_resources(self):
+        for strategy in [CacheReplacementStrategy.ARC, CacheReplacementStrategy.TWO_QUEUE,
+                         CacheReplacementStrategy.S3_FIFO, CacheReplacementStrategy.LIRS]:
+            self.assertEqual(hot_hits_after_scans(strategy), 4, strategy)
+
+    def test_lru_loses_hot_resources_on_scan(self):
+        self.assertEqual(hot_hits_after_scans(CacheReplacementStrategy.LRU), 0)
+
+    def test_arc_ghost_hit_goes_to_frequency_list(self):
+        cache = Cache(20, CacheReplacementStrategy.ARC)
+        request(cache, "a", 0)
+        request(cache, "b", 1)
+        # "b" moves to T2, so "a" is remembered in B1 when evicted
+        request(cache, "b", 2)
+        request(cache, "c", 3)
+        request(cache, "a", 4)
+
+        self.assertGreater(cache.replacement_policy.target_t1_bytes, 0)
+        self.assertIn("a", stored_providers(cache))
+
+    def test_two_queue_promotes_only_remembered_providers(self):
+        cache = Cache(40, CacheReplacementStrategy.TWO_QUEUE)
+        for time, provider_id in enumerate(["a", "b", "c", "d", "e"]):
+            request(cache, provider_id, time)
+        # "a" left A1in and is remembered in A1out, storing it again puts it in Am
+        request(cache, "a", 5)
+        for time, provider_id in enumerate(["f", "g", "h", "i"], start=6):
+            request(cache, provider_id, time)
+
+        self.assertIn("a", stored_providers(cache))
+
+    def test_s3_fifo_evicts_one_hit_wonders_first(self):
+        cache = Cache(100, CacheReplacementStrategy.S3_FIFO)
+        for time in range(10):
+            request(cache, str(time), time)
+        cache.get_resource("0", 10)
+        request(cache, "new", 11)
+
+        self.assertIn("0", stored_providers(cache))
+        self.assertNotIn("1", stored_providers(cache))
+
+    def test_lirs_evicts_hir_resources(self):
+        cache = Cache(100, CacheReplacementStrategy.LIRS)
+        # 9 LIR resources fill the LIR set (99 bytes), the tenth is HIR
+        for time in range(10):
+            request(cache, str(time), time)
+        request(cache, "new", 10)
+
+        self.assertEqual(stored_providers(cache), [str(i) for i in range(9)] + ["new"])
+
+    def test_gdsf_keeps_small_resources_over_a_big_one(self):
+        cache = Cache(100, CacheReplacementStrategy.GDSF)
+        cache.replacement_policy.cost = GDSFCost.TIME_TAKEN
+        for time in range(5):
+            cache.add_resource(Resource(str(time), 10, expiration_time=1000, application_latency=100), time)
+        cache.add_resource(Resource("big", 50, expiration_time=1000, application_latency=100), 5)
+
+        cache.add_resource(Resource("new", 10, expiration_time=1000, application_latency=100), 6)
+
+        self.assertEqual(stored_providers(cache), ["0", "1", "2", "3", "4", "new"])
+        # the clock is inflated to the priority of the evicted resource
+        self.assertEqual(cache.replacement_policy.inflation, 100 / 50)
+
+    def test_gdsf_cost(self):
+        slow = Resource("slow", 10, application_latency=500)
+        big = Resource("big", 40, application_latency=20)
+        by_latency = GDSFPolicy(100, GDSFCost.TIME_TAKEN)
+        by_bytes = GDSFPolicy(100, GDSFCost.BYTES)
+
+        self.assertGreater(by_latency.get_priority(slow), by_latency.get_priority(big))
+        self.assertEqual(by_bytes.get_priority(slow), by_bytes.get_priority(big))
+
+        slow.frequency = 1
+        self.assertEqual(by_bytes.get_priority(slow), 2)
+
+    def test_gdsf_frequency_protects_resources(self):
+        cache = Cache(30, CacheReplacementStrategy.GDSF)
+        for time, provider_id in enumerate(["a", "b", "c"]):
+            cache.add_resource(Resource(provider_id, 10, expiration_time=1000, application_latency=10), time)
+        cache.get_resource("a", 3)
+        cache.get_resource("b", 4)
+
+        cache.add_resource(Resource("d", 10, expiration_time=1000, application_latency=10), 5)
+
+        self.assertEqual(stored_providers(cache), ["a", "b", "d"])
+
+    def test_frequency_buckets_track_the_lowest_frequency_through_bumps_and_evictions(self):
+        buckets = FrequencyBuckets()
+        resources = {provider_id: Resource(provider_id, 10, expiration_time=1000) for provider_id in "abc"}
+        for time, resource in enumerate(resources.values()):
+            resource.storage_time = time
+            buckets.add(resource)
+        for provider_id, bumps in [("a", 3), ("b", 1), ("c", 2)]:
+            for _ in range(bumps):
+                resources[provider_id].frequency += 1
+                buckets.touch(resources[provider_id])
+
+        evicted = []
+        while len(buckets) > 0:
+            victim = buckets.victim()
+            evicted.append((victim.provider_id, buckets._min_frequency))
+            buckets.remove(victim)
+
+        self.assertEqual(evicted, [("b", 1), ("c", 2), ("a", 3)])
+        self.assertIsNone(buckets._min_frequency)
+        self.assertEqual(buckets._next, {})
+
+    def test_frequency_buckets_match_a_scan_of_the_frequencies(self):
+        generator = random.Random(7)
+        buckets = FrequencyBuckets()
+        stored = []
+        for time in range(2000):
+            action = generator.random()
+            if action < 0.4 or len(stored) == 0:
+                resource = Resource(str(time), 10, expiration_time=100000)
+                resource.storage_time = time
+                buckets.add(resource)
+                stored.append(resource)
+            elif action < 0.8:
+                resource = generator.choice(stored)
+                resource.frequency += 1
+                buckets.touch(resource)
+            else:
+                resource = stored.pop(generator.randrange(len(stored))) if action < 0.9 else buckets.victim()
+                if resource in stored:
+                    stored.remove(resource)
+                buckets.remove(resource)
+            if len(stored) > 0:
+                expected = min(stored, key=lambda stored_resource: (stored_resource.frequency,
+                                                                    stored_resource.storage_time))
+                self.assertIs(buckets.victim(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
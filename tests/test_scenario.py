@@ -0,0 +1,63 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from models.metrics import MetricsCalculator
+from models.scenario import Scenario, scenario_file, scenario_parameters
+from parameters import SimulationConfig
+from simulator import run_replication
+
+
+class TestScenario(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = SimulationConfig(
+            number_of_users=8, experiment_duration=300000, number_of_edge_nodes=6, number_of_providers=50,
+            accuracy=0.4, scenario_path=self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_replication(self, config):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_replication(0, MetricsCalculator(write_in_file=False, config=config), config).copy()
+
+    def test_a_loaded_scenario_reproduces_the_generated_run(self):
+        generated = self.run_replication(self.config.replace(scenario_path=None))
+        saved = self.run_replication(self.config)
+        path = scenario_file(self.directory.name, 0)
+        self.assertTrue(os.path.isfile(path))
+        loaded = self.run_replication(self.config)
+
+        self.assertEqual(saved, generated)
+        self.assertEqual(loaded, generated)
+        scenario = Scenario.load(path)
+        self.assertEqual(len(scenario.edge_node_positions), 6)
+        self.assertEqual(len(scenario.provider_ids), 50)
+        self.assertEqual(len(scenario.request_positions), len(scenario.request_times))
+
+    def test_time_order_keeps_the_generation_order_of_ties(self):
+        self.run_replication(self.config)
+        scenario = Scenario.load(scenario_file(self.directory.name, 0))
+        providers = scenario.providers(self.config)
+        edge_nodes = scenario.edge_nodes(self.config)
+
+        times = [queue_element.time_epoch for queue_element in scenario.queue_elements(providers, edge_nodes)]
+
+        self.assertEqual(times, sorted(scenario.request_times.tolist()))
+
+    def test_a_scenario_of_other_parameters_is_rejected(self):
+        self.run_replication(self.config)
+        other = self.config.replace(number_of_users=9)
+
+        with self.assertRaisesRegex(ValueError, "number_of_users"):
+            Scenario.load(scenario_file(self.directory.name, 0), scenario_parameters(other, 0))
+        with self.assertRaises(ValueError):
+            self.run_replication(other)
+
+
+if __name__ == '__main__':
+    unittest.main()
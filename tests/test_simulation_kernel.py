@@ -0,0 +1,137 @@
+import random
+import unittest
+from types import SimpleNamespace
+
+from models.cache_manager import CacheManager
+from models.cache_worker import CacheWorker
+from models.caching_order import CachingOrder
+from models.edge_node import EdgeNode
+from models.enums.event_type import EventType
+from models.enums.order_type import OrderType
+from models.event import Event
+from models.provider import Provider
+from models.queue_element import QueueElement
+from models.request import Request
+from models.resource import Resource
+from models.simulation_kernel import SimulationKernel
+from shared.RandomGenerator import random_generator
+
+
+def cached_providers(edge_node):
+    return [resource.provider_id for resource in edge_node.cache.resources]
+
+
+class TestSimulationKernel(unittest.TestCase):
+
+    def setUp(self):
+        self.edge_node = EdgeNode(0, cache_size=100)
+        self.edge_node.x, self.edge_node.y = (0, 0)
+        self.cache_worker = CacheWorker(0, self.edge_node, [self.edge_node], neighbor_edge_nodes=0)
+        self.kernel = SimulationKernel([self.cache_worker], [self.edge_node])
+
+    def queue_element(self, provider_id, time_epoch):
+        request = Request(time_epoch, SimpleNamespace(id=provider_id))
+        return QueueElement(request, None, time_epoch, self.cache_worker)
+
+    def test_events_at_the_same_time_follow_the_priorities(self):
+        events = [
+            Event(5, EventType.RESOURCE_EXPIRY, None, 0),
+            Event(5, EventType.CACHING_ORDER_EXECUTION, None, 1),
+            Event(5, EventType.REQUEST_ARRIVAL, None, 2),
+            Event(5, EventType.COOPERATIVE_ORDER_EXPIRY, None, 3),
+            Event(4, EventType.RESOURCE_EXPIRY, None, 4),
+        ]
+
+        self.assertEqual([event.sequence for event in sorted(events)], [4, 3, 2, 1, 0])
+
+    def test_resources_expire_after_the_requests_at_their_expiration_time(self):
+        self.edge_node.cache.add_resource(Resource("a", 10, expiration_time=1000), 0)
+        self.edge_node.cache.add_resource(Resource("b", 10, expiration_time=10), 0)
+        stored = []
+
+        for queue_element, response in self.kernel.run([self.queue_element("a", 10), self.queue_element("a", 11)]):
+            self.assertEqual(response.resource.provider_id, "a")
+            stored.append(cached_providers(self.edge_node))
+
+        self.assertEqual(stored, [["b", "a"], ["a"]])
+        self.assertEqual(self.cache_worker.cached_requests, 2)
+
+    def test_requests_are_consumed_lazily(self):
+        self.edge_node.cache.add_resource(Resource("a", 10, expiration_time=1000), 0)
+        queue_elements = iter([self.queue_element("a", time_epoch) for time_epoch in range(3)])
+
+        run = self.kernel.run(queue_elements)
+        next(run)
+
+        self.assertEqual(len(list(queue_elements)), 2)
+
+    def test_cooperative_orders_are_retired_at_their_expiration_time(self):
+        orders = [
+            CachingOrder(0, 0, expiration_time, SimpleNamespace(id=str(expiration_time)), type=OrderType.COOPERATIVE)
+            for expiration_time in [30, 10, 20]]
+        self.cache_worker.add_caching_orders(orders)
+
+        self.assertEqual(self.cache_worker.next_cooperative_order_expiration(), 10)
+        self.cache_worker.remove_expired_cooperative_orders(20)
+
+        self.assertEqual([order.expiration_time for order in self.cache_worker.cooperative_orders], [30])
+        self.assertEqual(self.cache_worker.next_cooperative_order_expiration(), 30)
+
+    def test_standard_orders_are_merged_by_execution_time(self):
+        batches = [[40, 10, 30], [50, 60], [30, 5, 45], []]
+        added = []
+        for batch_index, batch in enumerate(batches):
+            orders = [CachingOrder(0, execution_time, 100, SimpleNamespace(id=f"{batch_index}-{execution_time}"))
+                      for execution_time in batch]
+            self.cache_worker.add_caching_orders(orders)
+            added += orders
+
+        self.assertEqual(list(self.cache_worker.pending_orders), sorted(added, key=lambda x: x.execution_time))
+        self.assertEqual([order.provider.id for order in self.cache_worker.pending_orders][2:4], ["0-30", "2-30"])
+
+    def test_rolling_caching_orders_are_dispatched_a_window_ahead(self):
+        cache_manager = CacheManager(accuracy=1, average_pre_request_time=1, std_pre_request_time=0, time_window_size=10)
+        dispatched = []
+
+        def dispatch(caching_orders_per_cache_worker):
+            dispatched.append([order.request_execution_time for order in caching_orders_per_cache_worker[0]])
+            self.kernel.add_caching_orders(caching_orders_per_cache_worker)
+        queue_elements = [QueueElement(Request(time_epoch, Provider(i)), None, time_epoch, self.cache_worker)
+                          for i, time_epoch in enumerate([5, 15, 16, 25])]
+
+        run = self.kernel.run(cache_manager.rolling_caching_orders(queue_elements, [self.cache_worker], dispatch))
+        next(run)
+        self.assertEqual(dispatched, [[5], [15, 16]])
+        self.assertEqual(len(list(run)), 3)
+        self.assertEqual(dispatched, [[5], [15, 16], [25]])
+
+    def test_a_window_covering_the_run_predicts_the_requests_of_the_whole_run(self):
+        generator = random.Random(5)
+        providers = [Provider(i) for i in range(20)]
+        # generation order, user by user, the simulation reads them in time order
+        queue_elements = [QueueElement(Request(time_epoch, generator.choice(providers)), None, time_epoch,
+                                       self.cache_worker)
+                          for time_epoch in [generator.randint(0, 5000) for _ in range(200)]]
+        cache_manager = CacheManager(accuracy=0.5, average_pre_request_time=100, std_pre_request_time=50,
+                                     time_window_size=10000)
+
+        random_generator.set_replication(0)
+        whole_run = cache_manager.generate_caching_orders([], [self.cache_worker], queue_elements)
+        random_generator.set_replication(0)
+        predictions = cache_manager.predict_requests(queue_elements)
+        windowed = []
+        time_ordered = sorted(queue_elements, key=lambda queue_element: queue_element.time_epoch)
+        for _ in cache_manager.rolling_caching_orders(time_ordered, [self.cache_worker], windowed.append,
+                                                      predictions=predictions):
+            pass
+
+        def orders(caching_orders_per_cache_worker):
+            return [[(order.execution_time, order.request_execution_time, order.provider.id) for order in orders]
+                    for orders in caching_orders_per_cache_worker]
+        self.assertEqual(len(windowed), 1)
+        self.assertEqual(orders(windowed[0]), orders(whole_run))
+        self.assertLess(len(whole_run[0]), len(queue_elements))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from models.queue_element import QueueElement
+from models.simulation_queue import SimulationQueue
+
+
+def queue_element(user, time_epoch):
+    return QueueElement(None, user, time_epoch, None)
+
+
+class TestSimulationQueue(unittest.TestCase):
+
+    def test_merge_matches_the_sorted_queue(self):
+        streams = [
+            [queue_element(0, time_epoch) for time_epoch in [1, 5, 9]],
+            [queue_element(1, time_epoch) for time_epoch in [2, 5, 6]],
+            [],
+            [queue_element(3, time_epoch) for time_epoch in [1, 10]],
+        ]
+        simulation_queue = SimulationQueue()
+        simulation_queue.reset()
+        for stream in streams:
+            for element in stream:
+                simulation_queue.add_element(element)
+        simulation_queue.sort_queue()
+
+        merged = list(simulation_queue.merge(streams))
+
+        self.assertEqual(merged, simulation_queue.queue)
+        simulation_queue.reset()
+
+    def test_merge_is_lazy(self):
+        streams = [iter([queue_element(user, time_epoch) for time_epoch in range(3)]) for user in range(2)]
+
+        merged = SimulationQueue().merge(streams)
+        next(merged)
+
+        self.assertEqual([len(list(stream)) for stream in streams], [2, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
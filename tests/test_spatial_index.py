@@ -0,0 +1,57 @@
+import math
+import random
+import unittest
+
+from shared.spatial_index import SpatialIndex
+
+
+def linear_nearest(points, point):
+    distances = [math.sqrt((x - point[0]) ** 2 + (y - point[1]) ** 2) for x, y in points]
+    return distances.index(min(distances))
+
+
+def linear_k_nearest(points, point, k, skip):
+    indexes = [index for index in range(len(points)) if not skip(index)]
+    return sorted(indexes, key=lambda index: math.sqrt(
+        (points[index][0] - point[0]) ** 2 + (points[index][1] - point[1]) ** 2))[:k]
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.points = [(generator.randint(0, 1000), generator.randint(0, 1000)) for _ in range(300)]
+        self.queries = [(generator.uniform(-100, 1100), generator.uniform(-100, 1100)) for _ in range(500)]
+        self.index = SpatialIndex(self.points)
+
+    def test_nearest_matches_a_linear_scan(self):
+        expected = [linear_nearest(self.points, query) for query in self.queries]
+
+        self.assertEqual([self.index.nearest(query) for query in self.queries], expected)
+        self.assertEqual(self.index.nearest_many(self.queries).tolist(), expected)
+
+    def test_k_nearest_matches_a_stable_sort(self):
+        for index, point in enumerate(self.points[:50]):
+            def skip(other):
+                return other == index
+            self.assertEqual(self.index.k_nearest(point, 5, skip), linear_k_nearest(self.points, point, 5, skip))
+
+    def test_ties_are_won_by_the_lowest_index(self):
+        index = SpatialIndex([(10, 0), (0, 10), (-10, 0), (0, -10), (0, 0)])
+
+        self.assertEqual(index.nearest((0, 5)), 1)
+        self.assertEqual(index.nearest_many([(5, 5), (-5, -5)]).tolist(), [0, 2])
+        self.assertEqual(index.k_nearest((0, 0), 3, lambda other: other == 4), [0, 1, 2])
+
+    def test_any_within(self):
+        index = SpatialIndex(cell_size=10)
+        index.add((0, 0))
+        index.add((100, 100))
+
+        self.assertTrue(index.any_within((7, 7), 10))
+        self.assertFalse(index.any_within((50, 50), 10))
+        self.assertFalse(index.any_within((10, 0), 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+
+from shared.RandomGenerator import good_seeds, random_generator, replication_seed
+from shared.sweep import Sweep, expand_grid, point_arguments, point_label, replication_key, resolve_parameters
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_expand_grid_merges_options_that_vary_together(self):
+        grid = {
+            "accuracy": [0.2, 0.4],
+            "user_distribution": [
+                {"user_distribution_id": 1, "user_distribution_type": 0},
+                {"user_distribution_id": 0, "user_distribution_type": 1}],
+        }
+
+        points = expand_grid(grid)
+
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points[1], {"accuracy": 0.2, "user_distribution_id": 0, "user_distribution_type": 1})
+
+    def test_false_booleans_are_passed_as_empty_strings(self):
+        arguments = point_arguments({"cache_not_found_resource": False, "neighbor_edge_nodes": 2})
+
+        self.assertEqual(arguments, ["--cache-not-found-resource", "", "--neighbor-edge-nodes", "2"])
+        self.assertFalse(resolve_parameters({"cache_not_found_resource": False})["cache_not_found_resource"])
+
+    def test_replication_key_depends_on_the_full_parameter_set_and_seed(self):
+        parameters = resolve_parameters({"accuracy": 0.4})
+        labelled = resolve_parameters({"accuracy": 0.4, "label": "other"})
+        defaults = resolve_parameters({})
+
+        self.assertEqual(replication_key(parameters, 0), replication_key(labelled, 0))
+        self.assertNotEqual(replication_key(parameters, 0), replication_key(parameters, 1))
+        self.assertNotEqual(replication_key(parameters, 0), replication_key(defaults, 0))
+        self.assertEqual(replication_key(resolve_parameters({"accuracy": 0.2}), 0), replication_key(defaults, 0))
+
+    def test_the_results_are_labelled_by_point(self):
+        grid = {"accuracy": [0.2, 0.4], "neighbor_edge_nodes": [1]}
+        with tempfile.TemporaryDirectory() as results_dir:
+            # memoized results, the sweep has nothing to run
+            for point in expand_grid(grid):
+                key = replication_key(resolve_parameters(point), 0)
+                with open(os.path.join(results_dir, f"{key}.json"), "w") as file:
+                    json.dump({"metrics": {"hit_rate": point["accuracy"]}}, file)
+
+            rows = Sweep(grid, results_dir=results_dir, label=lambda point: f"N{point['neighbor_edge_nodes']}").run()
+            default_rows = Sweep(grid, results_dir=results_dir).run()
+            with open(os.path.join(results_dir, "results.csv")) as file:
+                header = file.readline().strip().split(",")
+
+        self.assertEqual([(row["label"], row["hit_rate"]) for row in rows], [("N1", 0.2), ("N1", 0.4)])
+        self.assertEqual([row["label"] for row in default_rows],
+                         ["accuracy=0.2-neighbor_edge_nodes=1", "accuracy=0.4-neighbor_edge_nodes=1"])
+        self.assertIn("label", header)
+        self.assertEqual(point_label({"label": "baseline", "accuracy": 0.2}), "baseline")
+
+    def test_replications_past_the_good_seeds_are_seeded(self):
+        parameters = resolve_parameters({})
+
+        self.assertEqual(replication_seed(29), good_seeds[29])
+        self.assertNotIn(replication_seed(30), good_seeds)
+        self.assertEqual(len({replication_seed(replication) for replication in range(90)}), 90)
+        self.assertNotEqual(replication_key(parameters, 30), replication_key(parameters, 0))
+        random_generator.set_replication(30)
+        self.assertEqual(random_generator.seed, replication_seed(30))
+        random_generator.set_replication(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from models.cache_worker import CacheWorker
+from models.edge_node import EdgeNode
+from models.provider import Provider
+from models.trace_replay import TraceReplay
+from shared.spatial_index import index_edge_nodes
+
+
+class TestTraceReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.edge_nodes = [EdgeNode(i, cache_size=100) for i in range(2)]
+        self.edge_nodes[0].set_position(0, 0)
+        self.edge_nodes[1].set_position(100, 0)
+        self.cache_workers = [CacheWorker(i, edge_node, self.edge_nodes, neighbor_edge_nodes=0)
+                              for i, edge_node in enumerate(self.edge_nodes)]
+        self.providers = [Provider(i) for i in range(3)]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_trace(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(text)
+        return path
+
+    def replay(self, path, chunk_size=2):
+        return TraceReplay(path, chunk_size).queue_elements(
+            self.providers, self.cache_workers, index_edge_nodes(self.edge_nodes))
+
+    def test_jsonl_and_csv_records(self):
+        jsonl = self.write_trace("trace.jsonl", '{"time": 5, "user": 1, "provider": 2, "x": 90, "y": 3}\n'
+                                                '{"time": 7, "user": 2, "provider": 0, "edge_node": 0}\n'
+                                                '\n'
+                                                '{"time": 7, "user": 1, "provider": 1, "x": 10.5, "y": 0}\n')
+        csv = self.write_trace("trace.csv", "time,user,provider,x,y,edge_node\n"
+                                            "5,1,2,90,3,\n"
+                                            "7,2,0,,,0\n"
+                                            "7,1,1,10.5,0,\n")
+
+        for path in [jsonl, csv]:
+            queue_elements = list(self.replay(path))
+            self.assertEqual([queue_element.time_epoch for queue_element in queue_elements], [5, 7, 7])
+            self.assertEqual([queue_element.request.provider.index for queue_element in queue_elements], [2, 0, 1])
+            self.assertEqual([queue_element.cache_worker.id for queue_element in queue_elements], [1, 0, 0])
+
+    def test_the_trace_is_read_lazily(self):
+        path = self.write_trace("trace.jsonl", '{"time": 1, "provider": 0, "edge_node": 0}\n'
+                                               '{"time": 2, "provider": 0, "edge_node": 0}\n'
+                                               'not json\n')
+
+        queue_elements = self.replay(path)
+
+        self.assertEqual(next(queue_elements).time_epoch, 1)
+        self.assertEqual(next(queue_elements).time_epoch, 2)
+        with self.assertRaises(ValueError):
+            next(queue_elements)
+
+    def test_invalid_records(self):
+        unsorted = self.write_trace("unsorted.jsonl", '{"time": 5, "provider": 0, "edge_node": 0}\n'
+                                                      '{"time": 4, "provider": 0, "edge_node": 0}\n')
+        unknown_provider = self.write_trace("provider.jsonl", '{"time": 5, "provider": 3, "edge_node": 0}\n')
+        no_location = self.write_trace("location.jsonl", '{"time": 5, "provider": 0}\n')
+
+        for path in [unsorted, unknown_provider, no_location]:
+            with self.assertRaises(ValueError):
+                list(self.replay(path))
+        with self.assertRaises(ValueError):
+            TraceReplay(os.path.join(self.directory.name, "trace.txt"))
+
+    def test_missing_and_non_numeric_fields_name_their_line(self):
+        missing = self.write_trace("missing.jsonl", '{"time": 5, "provider": 0, "edge_node": 0}\n'
+                                                    '{"time": 6, "edge_node": 0}\n')
+        non_numeric = self.write_trace("non_numeric.csv", "time,provider,edge_node\n"
+                                                          "5,0,0\n"
+                                                          "soon,0,0\n")
+        position = self.write_trace("position.jsonl", '{"time": 5, "provider": 0, "x": "left", "y": 0}\n')
+
+        with self.assertRaisesRegex(ValueError, "missing.jsonl:2: missing 'provider'"):
+            list(self.replay(missing))
+        with self.assertRaisesRegex(ValueError, "non_numeric.csv:3: 'time' is not a number"):
+            list(self.replay(non_numeric))
+        with self.assertRaisesRegex(ValueError, "position.jsonl:1: 'x' is not a number"):
+            list(self.replay(position))
+
+
+if __name__ == '__main__':
+    unittest.main()
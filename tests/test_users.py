@@ -2,6 +2,7 @@ import unittest
 from models.cache_worker import CacheWorker
 from models.edge_node import EdgeNode
 
+from models.trajectory import Trajectory
 from models.user import User
 from parameters import AREA_DIMENSIONS, EDGE_NODE_MIN_DISTANCE
 from shared.helper import distance, generate_edge_node_position
@@ -33,6 +34,20 @@ class TestUserMobility(unittest.TestCase):
             self.assertGreater(error_tolerance, squared_error[0])
             self.assertGreater(error_tolerance, squared_error[1])
 
+    def test_vectorized_positions_follow_the_waypoint_loop(self):
+        user = User(id=0, start_position=(0.0, 0.0), speed=1)
+        user.waypoints = [(3.0, 4.0), (3.0, 0.0)]
+        user.trajectory = Trajectory(user.start_position, user.waypoints, user.speed)
+        times = [0, 5, 7, 9, 12, 14, 19]
+
+        positions = user.get_positions_at_times(times)
+
+        expected = [(0, 0), (3, 4), (3, 2), (3, 0), (3, 3), (3, 3), (3, 2)]
+        for time, position, expected_position in zip(times, positions, expected):
+            self.assertAlmostEqual(position[0], expected_position[0])
+            self.assertAlmostEqual(position[1], expected_position[1])
+            self.assertEqual(tuple(position), user.get_position_at_time(time))
+
     def test_user_predicted_and_real_edge(self):
         edge_nodes = [EdgeNode(i) for i in range(10)]
         for index, edge_node in enumerate(edge_nodes):